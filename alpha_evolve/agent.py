@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple, Optional, Protocol, Set, runtime_checkable
+from typing import Iterable, Iterator, List, Tuple, Optional, Protocol, Set, runtime_checkable
 
 
 @dataclass
@@ -56,19 +56,11 @@ class AlphaEvolveAgent:
         self._inline_citations = bool(inline_citations)
 
     def ask(self, query: str) -> Tuple[str, List[Evidence], float]:
-        evidence = self.retriever.search(query, k=6)
         best: Optional[Draft] = None
-
-        for step in range(self.max_iters):
-            # generate multiple candidate drafts (ideas)
-            candidates: List[Draft] = []
-            for i in range(self.ideas_per_iter):
-                draft = self._propose(query, evidence, variant=i)
-                score = self.verifier.score(query, draft)
-                draft.confidence = score
-                candidates.append(draft)
-                if best is None or score > best.confidence:
-                    best = draft
+        for step, candidates in enumerate(self._iterations(query)):
+            for d in candidates:
+                if best is None or d.confidence > best.confidence:
+                    best = d
             # early accept if any candidate meets threshold
             for d in candidates:
                 if d.confidence >= self.accept_threshold:
@@ -78,8 +70,47 @@ class AlphaEvolveAgent:
                     if self.memory:
                         self.memory.remember(query, d.answer, True)
                     return d.answer, d.citations, d.confidence
+        assert best is not None
+        if self.memory:
+            self.memory.remember(query, best.answer, False)
+        refusal = self._refusal(query, best)
+        return refusal, best.citations, best.confidence
+
+    def ask_trajectory(self, query: str) -> List[List[Draft]]:
+        """Run every iteration without early acceptance and return the scored candidates.
+
+        Refinement does not depend on the threshold, so ``resolve`` can replay
+        ``ask`` for any threshold from this one trajectory.
+        """
+        return list(self._iterations(query))
+
+    def resolve(self, query: str, trajectory: List[List[Draft]], threshold: float) -> Tuple[str, List[Evidence], float]:
+        """Return what ``ask`` would have returned with ``accept_threshold=threshold``."""
+        best: Optional[Draft] = None
+        for candidates in trajectory:
+            for d in candidates:
+                if best is None or d.confidence > best.confidence:
+                    best = d
+            for d in candidates:
+                if d.confidence >= threshold:
+                    return d.answer, d.citations, d.confidence
+        assert best is not None
+        return self._refusal(query, best), best.citations, best.confidence
+
+    def _iterations(self, query: str) -> Iterator[List[Draft]]:
+        """Yield the scored candidate drafts of each iteration, refining in between."""
+        evidence = self.retriever.search(query, k=6)
+
+        for step in range(self.max_iters):
+            # generate multiple candidate drafts (ideas)
+            candidates: List[Draft] = []
+            for i in range(self.ideas_per_iter):
+                draft = self._propose(query, evidence, variant=i)
+                draft.confidence = self.verifier.score(query, draft)
+                candidates.append(draft)
+            yield candidates
             # refine: focus on top-evidence citations and expand for missing terms
-            candidates.sort(key=lambda d: d.confidence, reverse=True)
+            candidates = sorted(candidates, key=lambda d: d.confidence, reverse=True)
             top = candidates[0]
             evidence = sorted(top.citations, key=lambda e: e.score, reverse=True)[:4]
             # attempt to expand retrieval using missing terms
@@ -99,11 +130,6 @@ class AlphaEvolveAgent:
                 self._trace_log.append(
                     f"Iter {step+1}: top={top.confidence:.2f} candidates=[{scores}] missing=[{miss}]"
                 )
-        assert best is not None
-        if self.memory:
-            self.memory.remember(query, best.answer, False)
-        refusal = self._refusal(query, best)
-        return refusal, best.citations, best.confidence
 
     def _propose(self, query: str, evidence: Iterable[Evidence], variant: int = 0) -> Draft:
         cites = list(evidence)[:4]
@@ -0,0 +1,413 @@
+"""Performance benchmarks for the retriever and the agent.
+
+Generates synthetic corpora (Zipfian vocabulary) at one or more scales and
+measures index build time, peak memory, ``search`` latency percentiles,
+``ask`` latency per phase and eval throughput. Results are written as JSON
+and can be compared against a saved baseline:
+
+    python -m alpha_evolve.bench --docs 1000,10000 --out bench.json
+    python -m alpha_evolve.bench --docs 1000,10000 --baseline bench.json
+
+The exit status is 1 when any metric regressed beyond ``--tolerance`` and 2
+when the baseline was run with different parameters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .agent import AlphaEvolveAgent, Draft, Evidence, Retriever
+from .eval import evaluate
+from .memory import RingMemory
+from .retrieval import SimpleFSRetriever
+from .verifier import KeywordCoverageVerifier
+
+_DOCS_PER_DIR = 1000
+_MANIFEST = ".bench.json"
+
+# top-level metric name -> True when larger values are better
+_HIGHER_IS_BETTER = {"eval_qps": True, "impact_topk_overlap": True, "impact_rank_identical": True}
+
+
+def _word(rank: int) -> str:
+    """Deterministic alphabetic token for a vocabulary rank (at least 3 letters)."""
+    letters = []
+    n = rank
+    while True:
+        n, r = divmod(n, 26)
+        letters.append(chr(ord("a") + r))
+        if n == 0 and len(letters) >= 3:
+            break
+    return "".join(reversed(letters))
+
+
+class ZipfVocabulary:
+    """Vocabulary whose rank-r word is drawn with probability proportional to 1/r**s."""
+
+    def __init__(self, size: int, s: float = 1.1) -> None:
+        self.words = [_word(r) for r in range(size)]
+        self._cum = list(itertools.accumulate(1.0 / (r + 1) ** s for r in range(size)))
+
+    def sample(self, rng: random.Random, k: int) -> List[str]:
+        return rng.choices(self.words, cum_weights=self._cum, k=k)
+
+
+def generate_corpus(
+    dest: Path,
+    docs: int,
+    *,
+    vocab: ZipfVocabulary,
+    doc_len: int = 120,
+    seed: int = 0,
+) -> Path:
+    """Write ``docs`` synthetic .txt documents under ``dest`` and return it.
+
+    Files are spread over subdirectories of 1000 documents. A manifest records
+    the parameters, so an existing corpus with the same parameters is reused.
+    """
+    dest = Path(dest)
+    params = {"docs": docs, "vocab": len(vocab.words), "doc_len": doc_len, "seed": seed}
+    manifest = dest / _MANIFEST
+    if manifest.exists() and json.loads(manifest.read_text(encoding="utf-8")) == params:
+        return dest
+    rng = random.Random(seed)
+    for i in range(docs):
+        sub = dest / f"{i // _DOCS_PER_DIR:05d}"
+        if i % _DOCS_PER_DIR == 0:
+            sub.mkdir(parents=True, exist_ok=True)
+        n = rng.randint(max(1, doc_len // 2), max(1, doc_len * 3 // 2))
+        words = vocab.sample(rng, n)
+        title, body = words[:8], words[8:]
+        (sub / f"doc{i:07d}.txt").write_text(" ".join(title) + "\n" + " ".join(body) + "\n", encoding="utf-8")
+    manifest.write_text(json.dumps(params), encoding="utf-8")
+    return dest
+
+
+def _percentiles(samples_s: Sequence[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p90/p99, min and mean, in milliseconds."""
+    if not samples_s:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "min": 0.0, "mean": 0.0}
+    ordered = sorted(samples_s)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[idx] * 1000.0
+
+    return {
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "min": ordered[0] * 1000.0,
+        "mean": sum(ordered) / len(ordered) * 1000.0,
+    }
+
+
+class _TimedRetriever(Retriever):
+    def __init__(self, inner: Retriever) -> None:
+        self.inner = inner
+        self.elapsed = 0.0
+
+    def search(self, query: str, k: int = 5) -> List[Evidence]:
+        t0 = time.perf_counter()
+        try:
+            return self.inner.search(query, k=k)
+        finally:
+            self.elapsed += time.perf_counter() - t0
+
+
+class _TimedVerifier(KeywordCoverageVerifier):
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+    def score(self, query: str, draft: Draft) -> float:
+        t0 = time.perf_counter()
+        try:
+            return super().score(query, draft)
+        finally:
+            self.elapsed += time.perf_counter() - t0
+
+    def analyze(self, query: str, draft: Draft) -> Tuple[float, Set[str], Set[str]]:
+        t0 = time.perf_counter()
+        before = self.elapsed
+        try:
+            return super().analyze(query, draft)
+        finally:
+            # analyze() calls score(); count that time once
+            self.elapsed = before + (time.perf_counter() - t0)
+
+
+def _queries(rng: random.Random, vocab: ZipfVocabulary, n: int) -> List[str]:
+    return [" ".join(vocab.sample(rng, rng.randint(2, 4))) for _ in range(n)]
+
+
+def _questions(rng: random.Random, vocab: ZipfVocabulary, n: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for i in range(n):
+        if i % 2 == 0:
+            rows.append({"question": " ".join(vocab.sample(rng, 4)), "should_refuse": False})
+        else:
+            # tokens outside the generated vocabulary have no evidence
+            rows.append({"question": f"what about qq{i}x zz{i}y", "should_refuse": True})
+    return rows
+
+
+def bench_scale(
+    corpus: Path,
+    vocab: ZipfVocabulary,
+    *,
+    queries: int = 200,
+    asks: int = 50,
+    eval_questions: int = 50,
+    trace_memory: bool = True,
+    seed: int = 0,
+    impact_bits: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run every measurement against one generated corpus.
+
+    With ``impact_bits`` an impact-ordered index is built as well; its build
+    time, search latency and ranking agreement with the exact BM25 ranking
+    (mean top-k overlap, share of identical rankings) are reported.
+
+    ``build_s`` is always timed without tracemalloc, which slows allocation
+    severalfold; with ``trace_memory`` a second build measures ``peak_mb``.
+    """
+    t0 = time.perf_counter()
+    retriever = SimpleFSRetriever(corpus)
+    build_s = time.perf_counter() - t0
+    peak_mb = 0.0
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            SimpleFSRetriever(corpus)
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    rng = random.Random(seed + 1)
+    search_queries = _queries(rng, vocab, queries)
+    search_s: List[float] = []
+    rankings: List[List[str]] = []
+    for q in search_queries:
+        t0 = time.perf_counter()
+        hits = retriever.search(q, k=6)
+        search_s.append(time.perf_counter() - t0)
+        rankings.append([e.source for e in hits])
+
+    impact_metrics: Dict[str, Any] = {}
+    if impact_bits is not None:
+        t0 = time.perf_counter()
+        impact_retriever = SimpleFSRetriever(corpus, impact=True, impact_bits=impact_bits)
+        impact_metrics["impact_build_s"] = time.perf_counter() - t0
+        impact_s: List[float] = []
+        overlap = 0.0
+        identical = 0
+        for q, exact in zip(search_queries, rankings):
+            t0 = time.perf_counter()
+            hits = impact_retriever.search(q, k=6)
+            impact_s.append(time.perf_counter() - t0)
+            ranked = [e.source for e in hits]
+            overlap += len(set(ranked) & set(exact)) / max(1, len(exact))
+            identical += 1 if ranked == exact else 0
+        n_q = max(1, len(search_queries))
+        impact_metrics["impact_search_ms"] = _percentiles(impact_s)
+        impact_metrics["impact_topk_overlap"] = overlap / n_q
+        impact_metrics["impact_rank_identical"] = identical / n_q
+        del impact_retriever
+
+    timed_retriever = _TimedRetriever(retriever)
+    verifier = _TimedVerifier()
+    agent = AlphaEvolveAgent(timed_retriever, verifier, RingMemory(maxlen=128), max_iters=3, ideas_per_iter=2)
+    ask_s: List[float] = []
+    for q in _queries(rng, vocab, asks):
+        t0 = time.perf_counter()
+        agent.ask(q)
+        ask_s.append(time.perf_counter() - t0)
+    total = sum(ask_s)
+    n = max(1, len(ask_s))
+    phases = {
+        "retrieve": timed_retriever.elapsed / n * 1000.0,
+        "verify": verifier.elapsed / n * 1000.0,
+        "synthesize": max(0.0, total - timed_retriever.elapsed - verifier.elapsed) / n * 1000.0,
+    }
+
+    data = _questions(rng, vocab, eval_questions)
+    t0 = time.perf_counter()
+    evaluate(agent, data, threshold=0.7)
+    eval_s = time.perf_counter() - t0
+
+    return {
+        "docs": retriever._num_docs,
+        "terms": len(retriever._df),
+        "build_s": build_s,
+        "peak_mb": peak_mb,
+        "search_ms": _percentiles(search_s),
+        "ask_ms": _percentiles(ask_s),
+        "ask_phase_ms": phases,
+        "eval_qps": len(data) / eval_s if eval_s > 0 else 0.0,
+        **impact_metrics,
+    }
+
+
+def _flatten(obj: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in obj.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Return the metrics of ``current`` that regressed beyond ``tolerance`` vs ``baseline``.
+
+    Only scales present in both results are compared; ``docs``/``terms`` are
+    descriptive and skipped. Raises ``ValueError`` when the runs used
+    different ``params`` (corpus, workload or measurement settings).
+    """
+    cur_params, base_params = current.get("params", {}), baseline.get("params", {})
+    differing = sorted(k for k in set(cur_params) | set(base_params) if cur_params.get(k) != base_params.get(k))
+    if differing:
+        detail = ", ".join(f"{k}={base_params.get(k)!r}->{cur_params.get(k)!r}" for k in differing)
+        raise ValueError(f"baseline was run with different params: {detail}")
+    regressions: List[Dict[str, Any]] = []
+    base_scales = baseline.get("scales", {})
+    for scale, metrics in current.get("scales", {}).items():
+        if scale not in base_scales:
+            continue
+        cur = _flatten(metrics)
+        base = _flatten(base_scales[scale])
+        for name, value in sorted(cur.items()):
+            if name in ("docs", "terms") or name not in base:
+                continue
+            ref = base[name]
+            if ref <= 0:
+                continue
+            if _HIGHER_IS_BETTER.get(name.split(".")[0], False):
+                regressed = value < ref * (1.0 - tolerance)
+            else:
+                regressed = value > ref * (1.0 + tolerance)
+            if regressed:
+                regressions.append({"scale": scale, "metric": name, "baseline": ref, "current": value})
+    return regressions
+
+
+def _parse_scales(text: str) -> List[int]:
+    try:
+        scales = [int(float(x.strip())) for x in text.split(",") if x.strip()]
+    except ValueError:
+        raise SystemExit("--docs must be a comma-separated list of document counts, e.g., 1000,10000")
+    if not scales or any(n <= 0 for n in scales):
+        raise SystemExit("--docs must list positive document counts")
+    return scales
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="alpha-evolve-bench", description="Benchmark the Alpha Evolve retriever and agent")
+    p.add_argument("--docs", default="1000", help="Comma-separated corpus sizes, e.g. 1000,10000,100000,1000000")
+    p.add_argument("--vocab", type=int, default=50000, help="Vocabulary size")
+    p.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of the vocabulary distribution")
+    p.add_argument("--doc-len", type=int, default=120, help="Mean document length in tokens")
+    p.add_argument("--queries", type=int, default=200, help="Search queries timed per scale")
+    p.add_argument("--asks", type=int, default=50, help="Agent questions timed per scale")
+    p.add_argument("--eval-questions", type=int, default=50, help="Questions in the throughput eval per scale")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-memory", action="store_true", help="Skip the traced second build (no peak_mb)")
+    p.add_argument(
+        "--impact-bits",
+        type=int,
+        default=None,
+        help="Also benchmark the impact-ordered index at this quantization and report its ranking agreement",
+    )
+    p.add_argument("--corpus-dir", type=Path, default=None, help="Keep generated corpora here and reuse them")
+    p.add_argument("--out", type=Path, default=None, help="Write JSON results to this path")
+    p.add_argument("--baseline", type=Path, default=None, help="Compare against a previous --out file")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression vs baseline (0.25 = 25%%)")
+
+    args = p.parse_args(argv)
+    scales = _parse_scales(args.docs)
+
+    vocab = ZipfVocabulary(args.vocab, s=args.zipf)
+    result: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "params": {
+            "vocab": args.vocab,
+            "zipf": args.zipf,
+            "doc_len": args.doc_len,
+            "queries": args.queries,
+            "asks": args.asks,
+            "eval_questions": args.eval_questions,
+            "seed": args.seed,
+            "trace_memory": not args.no_memory,
+            "impact_bits": args.impact_bits,
+        },
+        "scales": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="alpha-evolve-bench-") as tmp:
+        root = args.corpus_dir or Path(tmp)
+        for docs in scales:
+            corpus = generate_corpus(root / f"docs-{docs}", docs, vocab=vocab, doc_len=args.doc_len, seed=args.seed)
+            metrics = bench_scale(
+                corpus,
+                vocab,
+                queries=args.queries,
+                asks=args.asks,
+                eval_questions=args.eval_questions,
+                trace_memory=not args.no_memory,
+                seed=args.seed,
+                impact_bits=args.impact_bits,
+            )
+            result["scales"][str(docs)] = metrics
+            print(
+                f"docs={docs}\tbuild={metrics['build_s']:.3f}s\tpeak={metrics['peak_mb']:.1f}MB"
+                f"\tsearch_p50={metrics['search_ms']['p50']:.3f}ms\tsearch_p99={metrics['search_ms']['p99']:.3f}ms"
+                f"\task_p50={metrics['ask_ms']['p50']:.3f}ms\teval={metrics['eval_qps']:.1f}q/s",
+                file=sys.stderr,
+            )
+            if args.impact_bits is not None:
+                print(
+                    f"docs={docs}\timpact_build={metrics['impact_build_s']:.3f}s"
+                    f"\timpact_search_p50={metrics['impact_search_ms']['p50']:.3f}ms"
+                    f"\toverlap@6={metrics['impact_topk_overlap']:.3f}\tidentical={metrics['impact_rank_identical']:.3f}",
+                    file=sys.stderr,
+                )
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text, encoding="utf-8")
+        print(str(args.out))
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        try:
+            regressions = compare(result, baseline, args.tolerance)
+        except ValueError as exc:
+            print(f"alpha-evolve-bench: cannot compare: {exc}", file=sys.stderr)
+            return 2
+        for r in regressions:
+            print(
+                f"REGRESSION docs={r['scale']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g}",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
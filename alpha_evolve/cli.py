@@ -4,14 +4,20 @@ import argparse
 from pathlib import Path
 from typing import Optional
 
-from .agent import AlphaEvolveAgent
+from .agent import AlphaEvolveAgent, Retriever
 from .retrieval import SimpleFSRetriever
 from .verifier import KeywordCoverageVerifier
 from .memory import RingMemory
 
 
-def build_agent(corpus: Path, *, max_iters: int = 3, accept_threshold: float = 0.7, ideas: int = 2, trace: bool = False, inline_citations: bool = True) -> AlphaEvolveAgent:
-    retriever = SimpleFSRetriever(corpus)
+def build_agent(corpus: Path, *, max_iters: int = 3, accept_threshold: float = 0.7, ideas: int = 2, trace: bool = False, inline_citations: bool = True, impact: bool = False, notes_db: Optional[Path] = None) -> AlphaEvolveAgent:
+    retriever: Retriever
+    if notes_db is not None:
+        from .notes import QuickCaptureRetriever
+
+        retriever = QuickCaptureRetriever(notes_db)
+    else:
+        retriever = SimpleFSRetriever(corpus, impact=impact)
     verifier = KeywordCoverageVerifier()
     memory = RingMemory(maxlen=128)
     return AlphaEvolveAgent(
@@ -36,6 +42,8 @@ def main(argv: Optional[list[str]] = None) -> int:
     parser.add_argument("--demo", action="store_true", help="Use a built-in demo question if no query provided")
     parser.add_argument("--no-inline-citations", action="store_true", help="Disable inline [n] markers in the answer text")
     parser.add_argument("--trace", action="store_true", help="Print per-iteration trace diagnostics")
+    parser.add_argument("--impact", action="store_true", help="Use the impact-ordered (quantized BM25) index")
+    parser.add_argument("--notes-db", type=Path, default=None, help="Answer from the notes of a QuickCapture database instead of --corpus")
 
     args = parser.parse_args(argv)
 
@@ -47,6 +55,8 @@ def main(argv: Optional[list[str]] = None) -> int:
         ideas=args.ideas,
         trace=args.trace,
         inline_citations=not args.no_inline_citations,
+        impact=args.impact,
+        notes_db=args.notes_db,
     )
 
     if args.demo and not args.query:
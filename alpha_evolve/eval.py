@@ -1,35 +1,67 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
-from .agent import AlphaEvolveAgent, Draft
+from .agent import AlphaEvolveAgent, Analyzer, Draft, Evidence
 from .cli import build_agent
 from .verifier import KeywordCoverageVerifier
 
 
-def _load_dataset(p: Path) -> List[Dict[str, Any]]:
+_BUILTIN_DATASET: List[Dict[str, Any]] = [
+    {
+        "question": "What is alpha evolve?",
+        "should_refuse": False,
+    },
+    {
+        "question": "How to grow mangoes on Mars with lasers?",
+        "should_refuse": True,
+    },
+]
+
+
+def _iter_dataset(p: Path) -> Iterator[Dict[str, Any]]:
+    """Yield dataset rows one line at a time."""
     if not p.exists():
         # built-in tiny dataset
-        return [
-            {
-                "question": "What is alpha evolve?",
-                "should_refuse": False,
-            },
-            {
-                "question": "How to grow mangoes on Mars with lasers?",
-                "should_refuse": True,
-            },
-        ]
-    rows: List[Dict[str, Any]] = []
-    for line in p.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        rows.append(json.loads(line))
-    return rows
+        yield from (dict(row) for row in _BUILTIN_DATASET)
+        return
+    with p.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
+
+
+def _load_dataset(p: Path) -> List[Dict[str, Any]]:
+    return list(_iter_dataset(p))
+
+
+def _dataset_identity(p: Optional[Path]) -> Optional[Dict[str, Any]]:
+    """Size and SHA-256 of a dataset file, so a checkpoint is only resumed on the same data."""
+    if p is None or not p.exists():
+        return None
+    digest = hashlib.sha256()
+    with p.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"path": str(p), "size": p.stat().st_size, "sha256": digest.hexdigest()}
+
+
+def _same_dataset(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]) -> bool:
+    def key(d: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, Any]]:
+        return None if d is None else (d.get("size"), d.get("sha256"))
+
+    return key(a) == key(b)
 
 
 def _terms(text: str) -> set[str]:
@@ -52,112 +84,565 @@ def _wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, fl
     return low, high
 
 
-def evaluate(
+def _example(
+    analyzer: Optional[Analyzer],
+    q: str,
+    should_refuse: bool,
+    answer: Tuple[str, List[Evidence], float],
+    threshold: float,
+) -> Dict[str, Any]:
+    """Build the example record for one answered question."""
+    ans, cites, score = answer
+    accepted = score >= threshold
+
+    # coverage of query terms (proxy for support)
+    covered: Set[str]
+    missing: Set[str]
+    if analyzer is not None:
+        draft = Draft(answer=ans, citations=cites, confidence=score)
+        cov, covered, missing = analyzer.analyze(q, draft)
+    else:
+        covered = _terms(q).intersection(_terms(ans + " " + " ".join(c.snippet for c in cites)))
+        missing = _terms(q) - covered
+        cov = min(1.0, len(covered) / max(1, len(covered) + len(missing)))
+
+    return {
+        "question": q,
+        "accepted": accepted,
+        "should_refuse": should_refuse,
+        "score": score,
+        "coverage": cov,
+        "covered_terms": sorted(list(covered)),
+        "missing_terms": sorted(list(missing)),
+        "answer": ans,
+        "citations": [
+            {
+                "source": c.source,
+                "snippet": c.snippet,
+                "score": c.score,
+            }
+            for c in cites
+        ],
+    }
+
+
+def _question(row: Dict[str, Any]) -> Tuple[str, bool]:
+    q = str(row.get("question") or row.get("query") or "")
+    return q, bool(row.get("should_refuse", False))
+
+
+def _evaluate_row(
     agent: AlphaEvolveAgent,
-    data: Iterable[Dict[str, Any]],
+    analyzer: Optional[Analyzer],
+    row: Dict[str, Any],
     threshold: float,
 ) -> Dict[str, Any]:
-    total = 0
-    accepts = 0
-    refusals = 0
-    sum_score = 0.0
-    sum_cov = 0.0
+    """Ask one dataset question and return its example record."""
+    q, should_refuse = _question(row)
+    return _example(analyzer, q, should_refuse, agent.ask(q), threshold)
+
+
+def _sweep_row(
+    agent: AlphaEvolveAgent,
+    analyzer: Optional[Analyzer],
+    row: Dict[str, Any],
+    thresholds: Sequence[float],
+) -> List[Dict[str, Any]]:
+    """Run one question once and return its example record for every threshold."""
+    q, should_refuse = _question(row)
+    trajectory = agent.ask_trajectory(q)
     examples: List[Dict[str, Any]] = []
-    # Confusion matrix counts vs should_refuse ground truth
-    tp_accept = 0  # accepted when should_refuse=False
-    fp_accept = 0  # accepted when should_refuse=True (bad)
-    tn_refuse = 0  # refused when should_refuse=True
-    fn_refuse = 0  # refused when should_refuse=False (over-conservative)
-
-    analyzer = agent.verifier if isinstance(agent.verifier, KeywordCoverageVerifier) else None
-
-    for row in data:
-        total += 1
-        q = str(row.get("question") or row.get("query") or "")
-        should_refuse = bool(row.get("should_refuse", False))
-        ans, cites, score = agent.ask(q)
-
-        accepted = score >= threshold
-        accepts += 1 if accepted else 0
-        refusals += 0 if accepted else 1
-        sum_score += score
+    # neighbouring thresholds usually resolve to the same draft; analyze it once
+    seen: Dict[Tuple[str, int, bool], Dict[str, Any]] = {}
+    for th in thresholds:
+        answer = agent.resolve(q, trajectory, th)
+        key = (answer[0], id(answer[1]), answer[2] >= th)
+        ex = seen.get(key)
+        if ex is None:
+            ex = seen[key] = _example(analyzer, q, should_refuse, answer, th)
+        examples.append(ex)
+    return examples
+
+
+class _Tally:
+    """Running counters behind one evaluation report.
+
+    Examples must be added in dataset order: float sums are order-sensitive,
+    and adding in order is what keeps parallel reports identical to serial ones.
+    """
+
+    _COUNTERS = (
+        "total",
+        "accepts",
+        "refusals",
+        "sum_score",
+        "sum_cov",
+        "tp_accept",
+        "fp_accept",
+        "tn_refuse",
+        "fn_refuse",
+    )
+
+    def __init__(self, keep_examples: bool = True) -> None:
+        self.total = 0
+        self.accepts = 0
+        self.refusals = 0
+        self.sum_score = 0.0
+        self.sum_cov = 0.0
+        # Confusion matrix counts vs should_refuse ground truth
+        self.tp_accept = 0  # accepted when should_refuse=False
+        self.fp_accept = 0  # accepted when should_refuse=True (bad)
+        self.tn_refuse = 0  # refused when should_refuse=True
+        self.fn_refuse = 0  # refused when should_refuse=False (over-conservative)
+        self.examples: Optional[List[Dict[str, Any]]] = [] if keep_examples else None
+
+    def state(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._COUNTERS}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        for name in self._COUNTERS:
+            setattr(self, name, state[name])
+
+    def add(self, example: Dict[str, Any]) -> None:
+        accepted = bool(example["accepted"])
+        should_refuse = bool(example["should_refuse"])
+        self.total += 1
+        self.accepts += 1 if accepted else 0
+        self.refusals += 0 if accepted else 1
+        self.sum_score += example["score"]
         # update confusion matrix
         if accepted and not should_refuse:
-            tp_accept += 1
+            self.tp_accept += 1
         elif accepted and should_refuse:
-            fp_accept += 1
+            self.fp_accept += 1
         elif (not accepted) and should_refuse:
-            tn_refuse += 1
+            self.tn_refuse += 1
         else:
-            fn_refuse += 1
+            self.fn_refuse += 1
+        self.sum_cov += example["coverage"]
+        if self.examples is not None:
+            self.examples.append(example)
 
-        # coverage of query terms (proxy for support)
-        if analyzer is not None:
-            draft = Draft(answer=ans, citations=cites, confidence=score)
-            cov, covered, missing = analyzer.analyze(q, draft)
-        else:
-            covered = _terms(q).intersection(_terms(ans + " " + " ".join(c.snippet for c in cites)))
-            missing = _terms(q) - covered
-            cov = min(1.0, len(covered) / max(1, len(covered) + len(missing)))
-        sum_cov += cov
+    def report(self) -> Dict[str, Any]:
+        total = self.total
+        tp_accept, fp_accept = self.tp_accept, self.fp_accept
+        # precision/recall (accept-as-positive)
+        precision_den = tp_accept + fp_accept
+        recall_den = tp_accept + self.fn_refuse
+        precision = (tp_accept / precision_den) if precision_den else 0.0
+        recall = (tp_accept / recall_den) if recall_den else 0.0
+        # false acceptance rate among negatives (hallucination rate)
+        total_neg = fp_accept + self.tn_refuse
+        far = (fp_accept / total_neg) if total_neg else 0.0
 
-        examples.append(
-            {
-                "question": q,
-                "accepted": accepted,
-                "should_refuse": should_refuse,
-                "score": score,
-                "coverage": cov,
-                "covered_terms": sorted(list(covered)),
-                "missing_terms": sorted(list(missing)),
-                "answer": ans,
-                "citations": [
-                    {
-                        "source": c.source,
-                        "snippet": c.snippet,
-                        "score": c.score,
-                    }
-                    for c in cites
-                ],
-            }
-        )
-
-    # precision/recall (accept-as-positive)
-    precision_den = tp_accept + fp_accept
-    recall_den = tp_accept + fn_refuse
-    precision = (tp_accept / precision_den) if precision_den else 0.0
-    recall = (tp_accept / recall_den) if recall_den else 0.0
-    # false acceptance rate among negatives (hallucination rate)
-    total_neg = fp_accept + tn_refuse
-    far = (fp_accept / total_neg) if total_neg else 0.0
-
-    # 95% Wilson intervals
-    precision_ci = _wilson_interval(tp_accept, precision_den)
-    recall_ci = _wilson_interval(tp_accept, recall_den)
-    far_ci = _wilson_interval(fp_accept, total_neg)
+        # 95% Wilson intervals
+        precision_ci = _wilson_interval(tp_accept, precision_den)
+        recall_ci = _wilson_interval(tp_accept, recall_den)
+        far_ci = _wilson_interval(fp_accept, total_neg)
 
-    return {
-        "total": total,
-        "accept_rate": accepts / total if total else 0.0,
-        "refusal_rate": refusals / total if total else 0.0,
-        "avg_score": sum_score / total if total else 0.0,
-        "avg_query_coverage": sum_cov / total if total else 0.0,
-        "precision_accept": precision,
-        "precision_accept_ci": list(precision_ci),
-        "recall_accept": recall,
-        "recall_accept_ci": list(recall_ci),
-        "false_accept_rate": far,
-        "false_accept_rate_ci": list(far_ci),
-        "confusion": {
-            "tp_accept": tp_accept,
-            "fp_accept": fp_accept,
-            "tn_refuse": tn_refuse,
-            "fn_refuse": fn_refuse,
-            "total_positives": recall_den,
-            "total_negatives": total_neg,
-        },
-        "examples": examples,
-    }
+        report: Dict[str, Any] = {
+            "total": total,
+            "accept_rate": self.accepts / total if total else 0.0,
+            "refusal_rate": self.refusals / total if total else 0.0,
+            "avg_score": self.sum_score / total if total else 0.0,
+            "avg_query_coverage": self.sum_cov / total if total else 0.0,
+            "precision_accept": precision,
+            "precision_accept_ci": list(precision_ci),
+            "recall_accept": recall,
+            "recall_accept_ci": list(recall_ci),
+            "false_accept_rate": far,
+            "false_accept_rate_ci": list(far_ci),
+            "confusion": {
+                "tp_accept": tp_accept,
+                "fp_accept": fp_accept,
+                "tn_refuse": self.tn_refuse,
+                "fn_refuse": self.fn_refuse,
+                "total_positives": recall_den,
+                "total_negatives": total_neg,
+            },
+        }
+        if self.examples is not None:
+            report["examples"] = self.examples
+        return report
+
+
+class _Run:
+    """Tallies for one or more thresholds, optionally streaming examples to JSONL.
+
+    With ``examples_out`` every example is appended to that file as soon as
+    its row completes (one line per row and threshold, tagged with ``index``
+    and ``threshold``) instead of being kept in memory. A checkpoint next to
+    it (``<examples_out>.ckpt``) records the rows done, the counters and the
+    file offset every ``checkpoint_every`` rows, so ``resume=True`` continues
+    an interrupted run from the last checkpointed row. The checkpoint also
+    records the identity of ``dataset`` (the file the rows come from) and
+    resuming refuses a different dataset or an examples file shorter than
+    the checkpoint. A run without ``resume`` removes any old checkpoint.
+    """
+
+    def __init__(
+        self,
+        thresholds: Sequence[float],
+        examples_out: Optional[Path] = None,
+        *,
+        resume: bool = False,
+        checkpoint_every: int = 100,
+        dataset: Optional[Path] = None,
+    ) -> None:
+        self.thresholds = [float(th) for th in thresholds]
+        self.tallies = [_Tally(keep_examples=examples_out is None) for _ in self.thresholds]
+        self.done = 0
+        self.examples_out = Path(examples_out) if examples_out is not None else None
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self._out: Optional[BinaryIO] = None
+        self.dataset: Optional[Dict[str, Any]] = None
+        if self.examples_out is not None:
+            self.dataset = _dataset_identity(dataset)
+            self._open(resume)
+
+    @property
+    def checkpoint_path(self) -> Path:
+        assert self.examples_out is not None
+        return self.examples_out.with_name(self.examples_out.name + ".ckpt")
+
+    def _open(self, resume: bool) -> None:
+        assert self.examples_out is not None
+        self.examples_out.parent.mkdir(parents=True, exist_ok=True)
+        offset = 0
+        if not resume:
+            # a stale checkpoint would otherwise describe this run's fresh file
+            self.checkpoint_path.unlink(missing_ok=True)
+        elif self.checkpoint_path.exists():
+            ckpt = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+            if ckpt.get("thresholds") != self.thresholds:
+                raise ValueError(
+                    f"checkpoint {self.checkpoint_path} was written for thresholds "
+                    f"{ckpt.get('thresholds')}, not {self.thresholds}"
+                )
+            if not _same_dataset(ckpt.get("dataset"), self.dataset):
+                raise ValueError(f"checkpoint {self.checkpoint_path} was written for a different dataset")
+            size = self.examples_out.stat().st_size if self.examples_out.exists() else 0
+            if int(ckpt["offset"]) > size:
+                raise ValueError(
+                    f"{self.examples_out} is shorter ({size} bytes) than its checkpoint offset {ckpt['offset']}"
+                )
+            self.done = int(ckpt["rows_done"])
+            offset = int(ckpt["offset"])
+            for tally, state in zip(self.tallies, ckpt["tallies"]):
+                tally.restore(state)
+        out = self.examples_out.open("ab")
+        # drop anything written after the last checkpoint
+        out.truncate(offset)
+        out.seek(offset)
+        self._out = out
+
+    def pending(self, data: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Return the rows of ``data`` not yet covered by a resumed checkpoint."""
+        return islice(iter(data), self.done, None)
+
+    def add_row(self, per_threshold: Sequence[Dict[str, Any]]) -> None:
+        index = self.done
+        for th, tally, ex in zip(self.thresholds, self.tallies, per_threshold):
+            tally.add(ex)
+            if self._out is not None:
+                line = json.dumps({"index": index, "threshold": th, **ex})
+                self._out.write(line.encode("utf-8") + b"\n")
+        self.done += 1
+        if self._out is not None and self.done % self.checkpoint_every == 0:
+            self._checkpoint(complete=False)
+
+    def _checkpoint(self, complete: bool) -> None:
+        assert self._out is not None
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        ckpt = {
+            "thresholds": self.thresholds,
+            "dataset": self.dataset,
+            "rows_done": self.done,
+            "offset": self._out.tell(),
+            "complete": complete,
+            "tallies": [t.state() for t in self.tallies],
+        }
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        tmp.write_text(json.dumps(ckpt), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+
+    def abort(self) -> None:
+        """Close the examples file, leaving the last checkpoint as the resume point."""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def reports(self) -> List[Dict[str, Any]]:
+        if self._out is not None:
+            self._checkpoint(complete=True)
+            self.abort()
+        reports = [t.report() for t in self.tallies]
+        if self.examples_out is not None:
+            for rpt in reports:
+                rpt["examples_path"] = str(self.examples_out)
+        return reports
+
+
+def _analyzer_for(agent: AlphaEvolveAgent) -> Optional[Analyzer]:
+    return agent.verifier if isinstance(agent.verifier, KeywordCoverageVerifier) else None
+
+
+def evaluate(
+    agent: AlphaEvolveAgent,
+    data: Iterable[Dict[str, Any]],
+    threshold: float,
+    *,
+    progress: Optional[Callable[[int], None]] = None,
+    examples_out: Optional[Path] = None,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+    dataset: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Evaluate ``agent`` on ``data``.
+
+    ``data`` is consumed lazily. With ``examples_out`` the per-example records
+    are streamed to a JSONL file and left out of the report; see ``_Run`` for
+    the checkpoint/``resume`` behaviour and ``dataset`` (the file ``data`` is
+    read from).
+    """
+    run = _Run([threshold], examples_out, resume=resume, checkpoint_every=checkpoint_every, dataset=dataset)
+    analyzer = _analyzer_for(agent)
+    try:
+        for row in run.pending(data):
+            run.add_row([_evaluate_row(agent, analyzer, row, threshold)])
+            if progress is not None:
+                progress(run.done)
+    except BaseException:
+        run.abort()
+        raise
+    return run.reports()[0]
+
+
+def evaluate_sweep(
+    agent: AlphaEvolveAgent,
+    data: Iterable[Dict[str, Any]],
+    thresholds: Sequence[float],
+    *,
+    progress: Optional[Callable[[int], None]] = None,
+    examples_out: Optional[Path] = None,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+    dataset: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Evaluate every threshold in one pass over ``data``.
+
+    Each question is run once for the full ``max_iters`` and the outcome for
+    each threshold is replayed from the recorded score trajectory. Reports
+    match ``evaluate`` on an agent built with ``accept_threshold=threshold``.
+    """
+    run = _Run(thresholds, examples_out, resume=resume, checkpoint_every=checkpoint_every, dataset=dataset)
+    analyzer = _analyzer_for(agent)
+    try:
+        for row in run.pending(data):
+            run.add_row(_sweep_row(agent, analyzer, row, thresholds))
+            if progress is not None:
+                progress(run.done)
+    except BaseException:
+        run.abort()
+        raise
+    return run.reports()
+
+
+# Per-process agent for parallel runs, built once by the pool initializer.
+_worker_agent: Optional[AlphaEvolveAgent] = None
+
+
+def _init_worker(corpus: str, max_iters: int, ideas: int, threshold: float) -> None:
+    global _worker_agent
+    _worker_agent = build_agent(Path(corpus), max_iters=max_iters, ideas=ideas, accept_threshold=threshold)
+
+
+def _evaluate_chunk(
+    start: int, rows: List[Dict[str, Any]], thresholds: List[float]
+) -> Tuple[int, List[List[Dict[str, Any]]]]:
+    agent = _worker_agent
+    assert agent is not None, "worker used before _init_worker"
+    analyzer = _analyzer_for(agent)
+    if len(thresholds) == 1:
+        return start, [[_evaluate_row(agent, analyzer, row, thresholds[0])] for row in rows]
+    return start, [_sweep_row(agent, analyzer, row, thresholds) for row in rows]
+
+
+def _chunks(data: Iterable[Dict[str, Any]], size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    it = iter(data)
+    start = 0
+    while True:
+        rows = list(islice(it, size))
+        if not rows:
+            return
+        yield start, rows
+        start += len(rows)
+
+
+def _evaluate_pool(
+    run: _Run,
+    data: Iterable[Dict[str, Any]],
+    *,
+    corpus: Path,
+    max_iters: int,
+    ideas: int,
+    workers: int,
+    chunk_size: int,
+    progress: Optional[Callable[[int], None]],
+) -> List[Dict[str, Any]]:
+    chunks = _chunks(run.pending(data), max(1, int(chunk_size)))
+    try:
+        _drain_pool(run, chunks, corpus, max_iters, ideas, workers, progress)
+    except BaseException:
+        run.abort()
+        raise
+    return run.reports()
+
+
+def _drain_pool(
+    run: _Run,
+    chunks: Iterator[Tuple[int, List[Dict[str, Any]]]],
+    corpus: Path,
+    max_iters: int,
+    ideas: int,
+    workers: int,
+    progress: Optional[Callable[[int], None]],
+) -> None:
+    pending: Dict[int, List[List[Dict[str, Any]]]] = {}
+    next_start = 0
+    max_in_flight = 2 * max(1, int(workers))
+    with ProcessPoolExecutor(
+        max_workers=max(1, int(workers)),
+        initializer=_init_worker,
+        initargs=(str(corpus), max_iters, ideas, run.thresholds[0]),
+    ) as pool:
+        in_flight: Set[Future] = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                nxt = next(chunks, None)
+                if nxt is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(_evaluate_chunk, nxt[0], nxt[1], run.thresholds))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                start, rows = fut.result()
+                pending[start] = rows
+            # fold finished chunks in dataset order
+            while next_start in pending:
+                rows = pending.pop(next_start)
+                for per_threshold in rows:
+                    run.add_row(per_threshold)
+                next_start += len(rows)
+                if progress is not None:
+                    progress(run.done)
+
+
+def evaluate_parallel(
+    data: Iterable[Dict[str, Any]],
+    threshold: float,
+    *,
+    corpus: Path,
+    max_iters: int = 3,
+    ideas: int = 2,
+    workers: int = 2,
+    chunk_size: int = 32,
+    progress: Optional[Callable[[int], None]] = None,
+    examples_out: Optional[Path] = None,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+    dataset: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Evaluate ``data`` on a pool of ``workers`` processes.
+
+    Each worker builds its own agent once. Rows are sent in contiguous chunks
+    (at most two per worker in flight) and merged back in dataset order, so the
+    report is identical to ``evaluate`` on a single agent.
+    """
+    run = _Run([threshold], examples_out, resume=resume, checkpoint_every=checkpoint_every, dataset=dataset)
+    return _evaluate_pool(
+        run,
+        data,
+        corpus=corpus,
+        max_iters=max_iters,
+        ideas=ideas,
+        workers=workers,
+        chunk_size=chunk_size,
+        progress=progress,
+    )[0]
+
+
+def evaluate_sweep_parallel(
+    data: Iterable[Dict[str, Any]],
+    thresholds: Sequence[float],
+    *,
+    corpus: Path,
+    max_iters: int = 3,
+    ideas: int = 2,
+    workers: int = 2,
+    chunk_size: int = 32,
+    progress: Optional[Callable[[int], None]] = None,
+    examples_out: Optional[Path] = None,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+    dataset: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """``evaluate_sweep`` on a process pool; see ``evaluate_parallel``."""
+    if not thresholds:
+        return []
+    run = _Run(thresholds, examples_out, resume=resume, checkpoint_every=checkpoint_every, dataset=dataset)
+    return _evaluate_pool(
+        run,
+        data,
+        corpus=corpus,
+        max_iters=max_iters,
+        ideas=ideas,
+        workers=workers,
+        chunk_size=chunk_size,
+        progress=progress,
+    )
+
+
+class _Progress:
+    """Prints processed count and throughput to stderr, at most once per interval."""
+
+    def __init__(self, total: Optional[int] = None, interval: float = 1.0) -> None:
+        self.total = total
+        self.interval = interval
+        self.start = time.perf_counter()
+        self._last = self.start
+        self._done = 0
+
+    def __call__(self, done: int) -> None:
+        self._done = done
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._print(now)
+
+    def finish(self) -> None:
+        self._print(time.perf_counter())
+
+    def _print(self, now: float) -> None:
+        elapsed = now - self.start
+        rate = self._done / elapsed if elapsed > 0 else 0.0
+        of = f"/{self.total}" if self.total is not None else ""
+        print(f"[eval] {self._done}{of} questions, {rate:.1f} q/s", file=sys.stderr, flush=True)
+
+
+def _write_report(obj: Dict[str, Any], out: Optional[Path]) -> None:
+    if out:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        # json.dump encodes incrementally rather than building one large string
+        with out.open("w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+        print(str(out))
+    else:
+        print(json.dumps(obj, indent=2))
 
 
 def main(argv: List[str] | None = None) -> int:
@@ -173,23 +658,60 @@ def main(argv: List[str] | None = None) -> int:
         default=None,
         help="Comma-separated thresholds (e.g., '0.5,0.6,0.7,0.8,0.9') to run a sweep",
     )
+    p.add_argument("--workers", type=int, default=1, help="Evaluate on N worker processes (1 = in-process)")
+    p.add_argument("--chunk-size", type=int, default=32, help="Questions per work unit when --workers > 1")
+    p.add_argument("--progress", action="store_true", help="Report progress and throughput (questions/s) on stderr")
+    p.add_argument(
+        "--examples-out",
+        type=Path,
+        default=None,
+        help="Stream per-example records to this JSONL file instead of keeping them in the report",
+    )
+    p.add_argument("--resume", action="store_true", help="Resume from the --examples-out checkpoint of an interrupted run")
+    p.add_argument("--checkpoint-every", type=int, default=100, help="Rows between checkpoints when streaming examples")
     p.add_argument("--out", type=Path, default=None, help="Write JSON report to this path")
 
     args = p.parse_args(argv)
+    if args.workers < 1:
+        raise SystemExit("--workers must be >= 1")
+    if args.resume and args.examples_out is None:
+        raise SystemExit("--resume requires --examples-out")
 
-    data = _load_dataset(args.dataset)
+    data = _iter_dataset(args.dataset)
+
+    progress = _Progress() if args.progress else None
+    run_opts: Dict[str, Any] = {
+        "progress": progress,
+        "examples_out": args.examples_out,
+        "resume": args.resume,
+        "checkpoint_every": args.checkpoint_every,
+        "dataset": args.dataset,
+    }
+    pool_opts: Dict[str, Any] = {
+        "corpus": args.corpus,
+        "max_iters": args.iters,
+        "ideas": args.ideas,
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        **run_opts,
+    }
 
     if args.sweep:
-        # Parse thresholds and run evaluate per threshold with a fresh agent
+        # Parse thresholds; every question runs once and is replayed per threshold
         try:
             thresholds = [float(x.strip()) for x in args.sweep.split(",") if x.strip()]
         except ValueError:
             raise SystemExit("--sweep must be a comma-separated list of floats, e.g., 0.5,0.6,0.7")
+        if args.workers > 1:
+            reports = evaluate_sweep_parallel(data, thresholds, **pool_opts)
+        else:
+            agent = build_agent(args.corpus, max_iters=args.iters, ideas=args.ideas)
+            reports = evaluate_sweep(agent, data, thresholds, **run_opts)
+        if progress is not None:
+            progress.finish()
         sweep_reports: List[Dict[str, Any]] = []
         print("threshold\tprecision\tprecision_ci\trecall\trecall_ci\tFAR\tFAR_ci\taccept_rate\trefusal_rate")
-        for th in thresholds:
-            agent = build_agent(args.corpus, max_iters=args.iters, ideas=args.ideas, accept_threshold=th)
-            rpt = evaluate(agent, data, threshold=th)
+        for th, rpt in zip(thresholds, reports):
             sweep_reports.append({"threshold": th, **rpt})
             print(
                 f"{th:.2f}\t{rpt['precision_accept']:.3f}\t{tuple(rpt['precision_accept_ci'])}"
@@ -197,24 +719,16 @@ def main(argv: List[str] | None = None) -> int:
                 f"\t{rpt['false_accept_rate']:.3f}\t{tuple(rpt['false_accept_rate_ci'])}"
                 f"\t{rpt['accept_rate']:.3f}\t{rpt['refusal_rate']:.3f}"
             )
-        out_obj = {"sweep": sweep_reports}
-        text = json.dumps(out_obj, indent=2)
-        if args.out:
-            args.out.parent.mkdir(parents=True, exist_ok=True)
-            args.out.write_text(text, encoding="utf-8")
-            print(str(args.out))
-        else:
-            print(text)
+        _write_report({"sweep": sweep_reports}, args.out)
     else:
-        agent = build_agent(args.corpus, max_iters=args.iters, ideas=args.ideas, accept_threshold=args.threshold)
-        report = evaluate(agent, data, threshold=args.threshold)
-        text = json.dumps(report, indent=2)
-        if args.out:
-            args.out.parent.mkdir(parents=True, exist_ok=True)
-            args.out.write_text(text, encoding="utf-8")
-            print(str(args.out))
+        if args.workers > 1:
+            report = evaluate_parallel(data, args.threshold, **pool_opts)
         else:
-            print(text)
+            agent = build_agent(args.corpus, max_iters=args.iters, ideas=args.ideas, accept_threshold=args.threshold)
+            report = evaluate(agent, data, threshold=args.threshold, **run_opts)
+        if progress is not None:
+            progress.finish()
+        _write_report(report, args.out)
     return 0
 
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import heapq
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from quickcapture.db import Database, note_content_sql
+
+from .agent import Evidence, Retriever
+from .retrieval import _B, _K1, _terms
+
+# rows read per round trip while (re)indexing
+_FETCH_CHUNK = 500
+
+
+class QuickCaptureRetriever(Retriever):
+    """BM25 keyword retriever over the notes of a QuickCapture database.
+
+    Each note is one document (title and content); evidence sources are
+    ``note:<id>``. Term statistics are kept in memory and updated
+    incrementally: before every search the retriever reads the database's
+    ``note_changes`` log (enabled on first use, see
+    ``Database.enable_change_log``) past the last sequence number it applied
+    and re-indexes only the notes inserted, edited or deleted since then. If
+    the log no longer reaches back that far (e.g. the file was replaced), the
+    index is rebuilt from scratch.
+
+    With ``prune`` (the default) applied entries are deleted from the log, so
+    it only holds the writes since the last search. Several retrievers over
+    one store should leave pruning to one of them: the others would find the
+    log cut past their position and rebuild.
+    """
+
+    def __init__(self, db: Union[Database, Path, str], *, prune: bool = True) -> None:
+        self.db = db if isinstance(db, Database) else Database(Path(db))
+        self.prune = bool(prune)
+        self._docs: Dict[int, Tuple[int, str]] = {}  # note id -> (length, snippet)
+        self._tf: Dict[int, Dict[str, int]] = {}  # note id -> term -> freq
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> note id -> freq
+        self._total_len = 0
+        self._seq = 0  # last applied note_changes.seq
+        self.db.enable_change_log()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Index every note from scratch."""
+        self._docs, self._tf, self._postings = {}, {}, {}
+        self._total_len = 0
+        with self.db.transaction() as conn:
+            self._seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM note_changes").fetchone()[0]
+            cur = conn.execute(f"SELECT id, title, {note_content_sql()} FROM notes")
+            cur.row_factory = None
+            while True:
+                rows = cur.fetchmany(_FETCH_CHUNK)
+                if not rows:
+                    break
+                for note_id, title, content in rows:
+                    self._add(note_id, title, content)
+            if self.prune:
+                Database.prune_change_log(conn, self._seq)
+
+    def refresh(self) -> int:
+        """Apply note changes logged since the last refresh; return how many notes were re-read."""
+        with self.db.transaction() as conn:
+            first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM note_changes").fetchone()
+            if last is None or last == self._seq:
+                return 0
+            if last < self._seq or first > self._seq + 1:
+                # the log was reset or pruned past our watermark
+                self.rebuild()
+                return len(self._docs)
+            cur = conn.execute(
+                f"SELECT c.note_id, n.title, {note_content_sql('n.')} "
+                "FROM (SELECT DISTINCT note_id FROM note_changes WHERE seq > ? AND seq <= ?) c "
+                "LEFT JOIN notes n ON n.id = c.note_id",
+                (self._seq, last),
+            )
+            cur.row_factory = None
+            changed = 0
+            for note_id, title, content in cur:
+                self._remove(note_id)
+                if title is not None:  # deleted notes have no row any more
+                    self._add(note_id, title, content)
+                changed += 1
+            self._seq = last
+            if self.prune:
+                Database.prune_change_log(conn, last)
+        return changed
+
+    def _add(self, note_id: int, title: str, content: Optional[str]) -> None:
+        text = f"{title}\n{content}" if content else title
+        toks = _terms(text)
+        if not toks:
+            return
+        tfd: Dict[str, int] = {}
+        for t in toks:
+            tfd[t] = tfd.get(t, 0) + 1
+        self._docs[note_id] = (len(toks), " ".join(text.split())[:280])
+        self._tf[note_id] = tfd
+        self._total_len += len(toks)
+        for t, tf in tfd.items():
+            self._postings.setdefault(t, {})[note_id] = tf
+
+    def _remove(self, note_id: int) -> None:
+        doc = self._docs.pop(note_id, None)
+        if doc is None:
+            return
+        self._total_len -= doc[0]
+        for t in self._tf.pop(note_id):
+            postings = self._postings[t]
+            del postings[note_id]
+            if not postings:
+                del self._postings[t]
+
+    def search(self, query: str, k: int = 5) -> List[Evidence]:
+        self.refresh()
+        num_docs = len(self._docs)
+        if num_docs == 0:
+            return []
+        q_terms = [t for t in _terms(query) if t in self._postings]
+        if not q_terms:
+            return []
+        avgdl = self._total_len / num_docs
+        scores: Dict[int, float] = {}
+        for t in q_terms:
+            postings = self._postings[t]
+            df = len(postings)
+            idf = math.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+            for note_id, tf in postings.items():
+                dl = self._docs[note_id][0]
+                denom = tf + _K1 * (1 - _B + _B * (dl / (avgdl or 1.0)))
+                scores[note_id] = scores.get(note_id, 0.0) + idf * (tf * (_K1 + 1)) / denom
+        # best first; among equal scores the newer note wins
+        ranked = heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], -x[0]))
+        return [
+            Evidence(source=f"note:{note_id}", snippet=self._docs[note_id][1], score=float(score))
+            for note_id, score in ranked
+        ]
@@ -1,22 +1,42 @@
 from __future__ import annotations
 
+import heapq
 import math
 import os
+from array import array
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 from .agent import Evidence, Retriever
 
+# BM25 parameters
+_K1 = 1.5
+_B = 0.75
+
 
 def _terms(text: str) -> List[str]:
     return [t for t in text.lower().split() if t.isalnum() and len(t) > 2]
 
 
 class SimpleFSRetriever(Retriever):
-    """BM25-like keyword retriever over .txt files in a directory (stdlib only)."""
+    """BM25-like keyword retriever over .txt files in a directory (stdlib only).
+
+    With ``impact=True`` the index stores, per term, postings of quantized BM25
+    contributions (``impact_bits`` bits, uniform over the largest contribution)
+    sorted by impact. Queries then only sum integers, highest impacts first,
+    and stop as soon as the remaining postings can no longer change the
+    top-k or its order. Scores are the dequantized sums, which are lower
+    bounds of the full sum when evaluation stopped early.
+    """
 
-    def __init__(self, corpus_dir: Path) -> None:
+    def __init__(self, corpus_dir: Path, *, impact: bool = False, impact_bits: int = 12, early_termination: bool = True) -> None:
+        if not 1 <= int(impact_bits) <= 16:
+            raise ValueError("impact_bits must be between 1 and 16")
         self.corpus_dir = Path(corpus_dir)
+        self.impact = bool(impact)
+        self.impact_bits = int(impact_bits)
+        self.early_termination = bool(early_termination)
         # index structures
         self._docs: Dict[str, Tuple[int, str]] = {}  # doc_id -> (length, first_line_snippet)
         self._tf: Dict[str, Dict[str, int]] = {}  # doc_id -> term -> freq
@@ -24,7 +44,13 @@ class SimpleFSRetriever(Retriever):
         self._num_docs: int = 0
         self._avgdl: float = 0.0
         self._idf: Dict[str, float] = {}
+        # impact mode: doc index -> doc_id; term -> (impacts, doc indexes, segments)
+        self._doc_ids: List[str] = []
+        self._postings: Dict[str, Tuple[array, array, List[Tuple[int, int, int]]]] = {}
+        self._impact_scale: float = 0.0
         self._build_index()
+        if self.impact:
+            self._build_impacts()
 
     def _build_index(self) -> None:
         if not self.corpus_dir.exists():
@@ -60,14 +86,54 @@ class SimpleFSRetriever(Retriever):
                 # BM25+ style idf with 0.5 correction for stability
                 self._idf[t] = math.log(1.0 + (self._num_docs - df + 0.5) / (df + 0.5))
 
+    def _bm25(self, term: str, tf: int, dl: int) -> float:
+        denom = tf + _K1 * (1 - _B + _B * (dl / (self._avgdl or 1.0)))
+        return self._idf.get(term, 0.0) * (tf * (_K1 + 1)) / denom
+
+    def _build_impacts(self) -> None:
+        """Quantize every (term, doc) BM25 contribution and sort postings by impact."""
+        self._doc_ids = list(self._docs)
+        contribs: Dict[str, List[Tuple[float, int]]] = {}
+        max_contrib = 0.0
+        for idx, doc_id in enumerate(self._doc_ids):
+            dl = self._docs[doc_id][0]
+            for t, tf in self._tf[doc_id].items():
+                c = self._bm25(t, tf, dl)
+                contribs.setdefault(t, []).append((c, idx))
+                if c > max_contrib:
+                    max_contrib = c
+        levels = (1 << self.impact_bits) - 1
+        self._impact_scale = max_contrib / levels if max_contrib > 0 else 1.0
+        typecode = "B" if self.impact_bits <= 8 else "H"
+        for t, plist in contribs.items():
+            # every posting keeps at least level 1 so no match is dropped
+            quantized = sorted(
+                ((max(1, min(levels, int(round(c / self._impact_scale)))), idx) for c, idx in plist),
+                key=lambda x: (-x[0], x[1]),
+            )
+            impacts = array(typecode, (q for q, _ in quantized))
+            docs = array("I", (idx for _, idx in quantized))
+            # runs of equal impact: (impact, start, end)
+            segments: List[Tuple[int, int, int]] = []
+            start = 0
+            for i in range(1, len(impacts) + 1):
+                if i == len(impacts) or impacts[i] != impacts[start]:
+                    segments.append((impacts[start], start, i))
+                    start = i
+            self._postings[t] = (impacts, docs, segments)
+        # the per-document term frequencies are not needed to answer queries any more
+        self._tf = {}
+
     def search(self, query: str, k: int = 5) -> List[Evidence]:
         if self._num_docs == 0:
             return []
         q_terms = [t for t in _terms(query) if t in self._df]
         if not q_terms:
             return []
-        k1 = 1.5
-        b = 0.75
+        if self.impact:
+            return self._search_impact(q_terms, k)
+        k1 = _K1
+        b = _B
         scores: Dict[str, float] = {}
         for doc_id, (dl, _snippet) in self._docs.items():
             tfd = self._tf.get(doc_id, {})
@@ -88,3 +154,48 @@ class SimpleFSRetriever(Retriever):
             snippet = self._docs[doc_id][1]
             results.append(Evidence(source=doc_id, snippet=snippet, score=float(score)))
         return results
+
+    def _search_impact(self, q_terms: List[str], k: int) -> List[Evidence]:
+        """Score-at-a-time evaluation over impact-ordered postings."""
+        qtf = Counter(q_terms)
+        terms = list(qtf)
+        # all segments of all query terms, highest impact first
+        order = sorted(
+            ((seg[0] * qtf[t], ti, si) for ti, t in enumerate(terms) for si, seg in enumerate(self._postings[t][2])),
+            key=lambda x: (-x[0], x[1], x[2]),
+        )
+        # remaining[ti]: weighted impact of the next unprocessed segment of term ti
+        remaining = [self._postings[t][2][0][0] * qtf[t] for t in terms]
+        bound = sum(remaining)
+        next_check = bound
+        acc: Dict[int, int] = {}
+        for weight, ti, si in order:
+            t = terms[ti]
+            _impacts, docs, segments = self._postings[t]
+            _impact, start, end = segments[si]
+            get = acc.get
+            for idx in docs[start:end]:
+                acc[idx] = get(idx, 0) + weight
+            remaining[ti] = segments[si + 1][0] * qtf[t] if si + 1 < len(segments) else 0
+            bound = sum(remaining)
+            # checking costs O(len(acc)); only do it each time the bound halves
+            if self.early_termination and k > 0 and bound * 2 <= next_check and len(acc) > k:
+                next_check = bound
+                if self._topk_settled(acc, k, bound):
+                    break
+        ranked = heapq.nsmallest(k, acc.items(), key=lambda x: (-x[1], x[0]))
+        results: List[Evidence] = []
+        for idx, score in ranked:
+            doc_id = self._doc_ids[idx]
+            results.append(Evidence(source=doc_id, snippet=self._docs[doc_id][1], score=score * self._impact_scale))
+        return results
+
+    @staticmethod
+    def _topk_settled(acc: Dict[int, int], k: int, bound: int) -> bool:
+        """True when no doc gaining up to ``bound`` more can change the top-k or its order."""
+        scores = heapq.nlargest(k + 1, acc.values())
+        # unseen docs can reach at most `bound`, seen ones their score + bound
+        rest = scores[k] if len(scores) > k else 0
+        if scores[k - 1] <= rest + bound:
+            return False
+        return all(scores[i] > scores[i + 1] + bound for i in range(min(k, len(scores)) - 1))
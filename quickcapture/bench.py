@@ -0,0 +1,227 @@
+"""Startup benchmark for the QuickCapture CLI.
+
+Runs each command as a fresh ``python -m quickcapture`` process against a
+seeded temporary database and reports wall time percentiles, plus the
+module import time and count recorded by ``python -X importtime``. The
+interpreter's own start (``python -c pass``) is measured as a reference.
+Results are written as JSON and can be compared against a saved baseline:
+
+    python -m quickcapture.bench --out startup.json
+    python -m quickcapture.bench --baseline startup.json
+
+The exit status is 1 when any metric regressed beyond ``--tolerance`` and 2
+when the baseline was run with different parameters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .services import import_items, init_db
+
+# name -> arguments after `--db PATH`
+COMMANDS: Dict[str, List[str]] = {
+    "add-note": ["add-note", "benchmark note", "--content", "captured from the startup benchmark"],
+    "add-task": ["add-task", "benchmark task", "--due", "2030-01-01"],
+    "complete-task": ["complete-task", "1"],
+    "list": ["list", "--limit", "20"],
+    "search": ["search", "benchmark"],
+    "stats": ["stats", "--days", "30"],
+    "export": ["export", "--format", "ndjson", "--since", "2999-01-01"],
+}
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # measure with bytecode caches, as an installed package would run
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    root = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def _percentiles(samples_s: Sequence[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p90/p99, min and mean, in milliseconds."""
+    if not samples_s:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "min": 0.0, "mean": 0.0}
+    ordered = sorted(samples_s)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[idx] * 1000.0
+
+    return {
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "min": ordered[0] * 1000.0,
+        "mean": sum(ordered) / len(ordered) * 1000.0,
+    }
+
+
+def _flatten(obj: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in obj.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def _wall(cmd: List[str], env: Dict[str, str], runs: int) -> Dict[str, float]:
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)  # warm caches
+    samples: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        samples.append(time.perf_counter() - start)
+    return _percentiles(samples)
+
+
+def import_profile(cmd: List[str], env: Dict[str, str]) -> Dict[str, float]:
+    """Total import time (ms) and module count reported by ``-X importtime``."""
+    proc = subprocess.run(
+        [cmd[0], "-X", "importtime"] + cmd[1:],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Sum the top-level cumulative times of ``-X importtime`` output.
+
+    Nested imports are indented under the module that triggered them and
+    already included in its cumulative time, so only the least indented
+    entries are added up; every entry counts as one module.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        entries.append((len(name) - len(name.lstrip()), int(cumulative), name.strip()))
+    if not entries:
+        return {"import_ms": 0.0, "modules": 0}
+    top = min(depth for depth, _, _ in entries)
+    total_us = sum(cum for depth, cum, _ in entries if depth == top)
+    return {"import_ms": total_us / 1000.0, "modules": len(entries)}
+
+
+def _seed(db_path: Path, items: int) -> None:
+    lines = []
+    for i in range(items):
+        kind = "note" if i % 2 else "task"
+        lines.append(json.dumps({"type": kind, "title": f"seed {kind} {i}", "content": f"benchmark seed {i}"}))
+    import_items(init_db(db_path), io.StringIO("\n".join(lines) + "\n"), "ndjson")
+
+
+def bench_commands(db_path: Path, *, runs: int, commands: Sequence[str]) -> Dict[str, Any]:
+    env = _child_env()
+    base = [sys.executable]
+    result: Dict[str, Any] = {"interpreter_ms": _wall(base + ["-c", "pass"], env, runs), "commands": {}}
+    for name in commands:
+        cmd = base + ["-m", "quickcapture", "--db", str(db_path)] + COMMANDS[name]
+        metrics: Dict[str, Any] = {"wall_ms": _wall(cmd, env, runs)}
+        metrics.update(import_profile(cmd, env))
+        result["commands"][name] = metrics
+    return result
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Return the command metrics of ``current`` that grew beyond ``tolerance`` vs ``baseline``.
+
+    The interpreter reference is descriptive and not compared. Raises
+    ``ValueError`` when the runs used different ``params`` (runs, items).
+    """
+    cur_params, base_params = current.get("params", {}), baseline.get("params", {})
+    differing = sorted(k for k in set(cur_params) | set(base_params) if cur_params.get(k) != base_params.get(k))
+    if differing:
+        detail = ", ".join(f"{k}={base_params.get(k)!r}->{cur_params.get(k)!r}" for k in differing)
+        raise ValueError(f"baseline was run with different params: {detail}")
+    cur, base = _flatten(current.get("commands", {})), _flatten(baseline.get("commands", {}))
+    regressions: List[Dict[str, Any]] = []
+    for name, value in sorted(cur.items()):
+        ref = base.get(name)
+        if ref is not None and ref > 0 and value > ref * (1.0 + tolerance):
+            regressions.append({"metric": name, "baseline": ref, "current": value})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="quickcapture-bench", description="Benchmark QuickCapture CLI startup")
+    p.add_argument("--runs", type=int, default=20, help="Timed runs per command")
+    p.add_argument("--items", type=int, default=1000, help="Notes and tasks seeded into the benchmark database")
+    p.add_argument(
+        "--commands",
+        default=",".join(COMMANDS),
+        help=f"Comma-separated subset of: {', '.join(COMMANDS)}",
+    )
+    p.add_argument("--out", type=Path, default=None, help="Write JSON results to this path")
+    p.add_argument("--baseline", type=Path, default=None, help="Compare against a previous --out file")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression vs baseline (0.25 = 25%%)")
+
+    args = p.parse_args(argv)
+    commands = [c.strip() for c in args.commands.split(",") if c.strip()]
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown or not commands:
+        p.error(f"unknown command(s): {', '.join(unknown) or '-'}")
+    if args.runs < 1:
+        p.error("--runs must be at least 1")
+
+    result: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "params": {"runs": args.runs, "items": args.items},
+    }
+    with tempfile.TemporaryDirectory(prefix="quickcapture-bench-") as tmp:
+        db_path = Path(tmp) / "bench.db"
+        _seed(db_path, args.items)
+        result.update(bench_commands(db_path, runs=args.runs, commands=commands))
+
+    print(f"interpreter\twall_p50={result['interpreter_ms']['p50']:.1f}ms", file=sys.stderr)
+    for name, metrics in result["commands"].items():
+        print(
+            f"{name}\twall_p50={metrics['wall_ms']['p50']:.1f}ms\twall_min={metrics['wall_ms']['min']:.1f}ms"
+            f"\timports={metrics['import_ms']:.1f}ms ({metrics['modules']} modules)",
+            file=sys.stderr,
+        )
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text, encoding="utf-8")
+        print(str(args.out))
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        try:
+            found = compare(result, baseline, args.tolerance)
+        except ValueError as exc:
+            print(f"quickcapture-bench: cannot compare: {exc}", file=sys.stderr)
+            return 2
+        for r in found:
+            print(f"REGRESSION {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g}", file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -1,23 +1,55 @@
 from __future__ import annotations
 
 import argparse
-import logging
+import os
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, TYPE_CHECKING
 
+from .db import default_db_path, default_socket_path
 from .services import (
     add_note,
     add_task,
+    archive_tasks,
+    BULK_ACTIONS,
+    bulk_tasks,
     complete_task,
-    export_all_json,
+    daily_counts,
+    EXPORT_FORMATS,
+    export_stream,
+    IMPORT_FORMATS,
+    import_items,
     init_db,
     list_notes,
     list_tasks,
+    search,
+    stats,
 )
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from .client import DaemonClient
+
+# set by `python -m quickcapture`, which prints INFO messages to stderr
+_log_to_stderr = False
+
+
+def _info(msg: str, *args: object) -> None:
+    """Log without importing ``logging`` (about 12 ms of a 70 ms start).
+
+    Under ``python -m quickcapture`` the line is written in the format
+    ``logging.basicConfig`` would use; ``tests/test_cli.py`` checks it
+    against ``logging.Formatter``. Embedding applications that set up
+    logging have imported it already and get a regular log record.
+    """
+    if _log_to_stderr:
+        now = time.time()
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        print(f"{stamp},{int(now % 1 * 1000):03d} INFO {__name__}: {msg % args}", file=sys.stderr)
+    elif "logging" in sys.modules:
+        sys.modules["logging"].getLogger(__name__).info(msg, *args)
 
 
 def _parse_date(value: str) -> datetime:
@@ -27,9 +59,26 @@ def _parse_date(value: str) -> datetime:
         raise argparse.ArgumentTypeError(f"Invalid date format (use YYYY-MM-DD or ISO8601): {value}") from exc
 
 
+def _parse_cursor(value: str) -> Tuple[str, int]:
+    created_at, sep, item_id = value.rpartition(",")
+    try:
+        if not sep:
+            raise ValueError(value)
+        datetime.fromisoformat(created_at)
+        return created_at, int(item_id)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid cursor (use CREATED_AT,ID as printed by list): {value}") from exc
+
+
+def _cursor(created_at: datetime, item_id: Optional[int]) -> str:
+    return f"{created_at.isoformat()},{item_id}"
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="quickcapture", description="Capture notes and tasks into SQLite.")
     parser.add_argument("--db", type=Path, default=None, help="Path to SQLite DB (defaults to ~/.quickcapture/quickcapture.db)")
+    parser.add_argument("--socket", type=Path, default=None, help="Daemon socket (defaults to the DB path plus .sock)")
+    parser.add_argument("--no-daemon", action="store_true", help="Open the database directly even if a daemon is running")
 
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -44,37 +93,171 @@ def build_parser() -> argparse.ArgumentParser:
     p_list = sub.add_parser("list", help="List notes and tasks")
     p_list.add_argument("--type", choices=["notes", "tasks", "all"], default="all")
     p_list.add_argument("--completed", choices=["true", "false"], default=None, help="For tasks: filter by completion")
+    p_list.add_argument("--limit", type=int, default=None, help="Show at most N items of each type")
+    p_list.add_argument(
+        "--after",
+        type=_parse_cursor,
+        default=None,
+        help="Continue after this CREATED_AT,ID cursor (printed to stderr when --limit cuts a page); "
+        "needs --type notes or --type tasks",
+    )
+
+    p_list.add_argument("--include-archived", action="store_true", help="Also list archived tasks")
+    p_list.add_argument(
+        "--preview",
+        type=int,
+        default=80,
+        help="Characters of note content to show (default: 80; 0 shows whole notes)",
+    )
 
     p_complete = sub.add_parser("complete-task", help="Mark a task completed")
     p_complete.add_argument("id", type=int)
 
-    p_export = sub.add_parser("export", help="Export all items to JSON")
+    p_bulk = sub.add_parser("bulk", help="Complete, reopen, reschedule or delete many tasks at once")
+    p_bulk.add_argument("action", choices=BULK_ACTIONS)
+    p_bulk.add_argument("ids", nargs="*", type=int, help="Task ids (combined with any filters below)")
+    p_bulk.add_argument("--completed", choices=["true", "false"], default=None, help="Only completed or only open tasks")
+    p_bulk.add_argument("--overdue", action="store_true", help="Only open tasks due before now (or --due-before)")
+    p_bulk.add_argument("--due-before", type=_parse_date, default=None, help="Only tasks due before this date")
+    p_bulk.add_argument("--created-before", type=_parse_date, default=None, help="Only tasks created before this time (naive values are UTC)")
+    p_bulk.add_argument("--title", default=None, help="Only tasks whose title contains this text (case-insensitive)")
+    p_bulk.add_argument("--due", type=_parse_date, default=None, help="New due date for reschedule")
+    p_bulk.add_argument("--clear-due", action="store_true", help="Reschedule: remove the due date")
+
+    p_export = sub.add_parser("export", help="Export all items to JSON or NDJSON")
     p_export.add_argument("--out", type=Path, default=None, help="Output file (defaults to stdout)")
+    p_export.add_argument("--format", choices=EXPORT_FORMATS, default="json", help="json (one document) or ndjson (one record per line)")
+    p_export.add_argument(
+        "--since",
+        type=_parse_date,
+        default=None,
+        help="Only notes created and tasks created or completed after this time (naive values are UTC)",
+    )
+    p_export.add_argument("--include-archived", action="store_true", help="Also export archived tasks")
+
+    p_search = sub.add_parser("search", help="Full-text search over notes and tasks")
+    p_search.add_argument("query", help="Words to find (all must match; a trailing * matches a prefix)")
+    p_search.add_argument("--type", choices=["notes", "tasks", "all"], default="all")
+    p_search.add_argument("--limit", type=int, default=20)
+    p_search.add_argument("--include-archived", action="store_true", help="Also search archived tasks")
+
+    p_import = sub.add_parser("import", help="Bulk-import notes and tasks from JSON, NDJSON or CSV")
+    p_import.add_argument("file", help="Input file (use - for stdin); accepts the output of export")
+    p_import.add_argument("--format", choices=IMPORT_FORMATS, default="auto", help="Input format (default: detect)")
+    p_import.add_argument("--upsert", action="store_true", help="Keep record ids and replace existing rows with the same id")
+    p_import.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany batch")
+
+    p_archive = sub.add_parser("archive", help="Move old completed tasks out of the hot table")
+    p_archive.add_argument("--older-than", type=int, default=30, help="Archive tasks completed more than N days ago")
+    p_archive.add_argument("--before", type=_parse_date, default=None, help="Archive tasks completed before this time instead")
+    p_archive.add_argument("--batch-size", type=int, default=1000, help="Tasks moved per statement")
+
+    p_backup = sub.add_parser("backup", help="Snapshot the database while it is in use")
+    p_backup.add_argument("dest", type=Path, help="Snapshot file (gzipped when it ends in .gz)")
+    p_backup.add_argument("--gzip", action="store_true", help="Compress the snapshot whatever its name")
+    p_backup.add_argument("--pages", type=int, default=1024, help="Pages copied per step")
+    p_backup.add_argument("--sleep", type=float, default=0.01, help="Seconds to pause between steps")
+    p_backup.add_argument("--progress", action="store_true", help="Report progress on stderr")
+    p_backup.add_argument(
+        "--wal",
+        action="store_true",
+        help="Switch the store to WAL journaling first, so writes during the backup cannot restart it",
+    )
+
+    p_restore = sub.add_parser("restore", help="Replace the database with a snapshot made by backup")
+    p_restore.add_argument("src", type=Path, help="Snapshot file (plain or gzipped)")
+    p_restore.add_argument("--pages", type=int, default=1024, help="Pages copied per step")
+    p_restore.add_argument("--progress", action="store_true", help="Report progress on stderr")
+
+    p_stats = sub.add_parser("stats", help="Count notes and open, done and overdue tasks")
+    p_stats.add_argument("--days", type=int, default=0, help="Also show per-day activity for the last N days (UTC)")
+    p_stats.add_argument("--json", action="store_true", help="Print the counts as JSON")
+    p_stats.add_argument(
+        "--counters",
+        choices=["on", "off"],
+        default=None,
+        help="Turn trigger-maintained totals on (constant-time counts) or off before counting",
+    )
+
+    p_daemon = sub.add_parser("daemon", help="Serve requests on a Unix socket with the database kept open")
+    p_daemon.set_defaults(no_daemon=True)
 
     return parser
 
 
-def main(argv: Optional[list[str]] = None) -> int:
+# commands a running daemon can answer
+_DAEMON_COMMANDS = {"add-note", "add-task", "list", "complete-task", "bulk", "search"}
+
+
+def _daemon_client(args: argparse.Namespace) -> Optional[DaemonClient]:
+    """Connect to a running daemon for this command, or return None to use the DB directly."""
+    if args.no_daemon or args.cmd not in _DAEMON_COMMANDS:
+        return None
+    path = args.socket or default_socket_path(args.db or default_db_path())
+    if not os.path.exists(path):
+        return None  # checked first so direct runs never import the client
+    from .client import DaemonClient
+
+    return DaemonClient.connect(path)
+
+
+def _progress_printer(label: str):
+    """Progress callback printing whole-percent changes to stderr."""
+    last = [-1]
+
+    def report(copied: int, total: int) -> None:
+        pct = copied * 100 // total if total else 100
+        if pct != last[0]:
+            last[0] = pct
+            print(f"{label}: {pct}% ({copied}/{total} pages)", file=sys.stderr)
+
+    return report
+
+
+def main(argv: Optional[list[str]] = None, *, log_to_stderr: bool = False) -> int:
+    global _log_to_stderr
+    _log_to_stderr = log_to_stderr
     argv = list(argv) if argv is not None else sys.argv[1:]
     parser = build_parser()
     args = parser.parse_args(argv)
+    try:
+        return _run(parser, args)
+    except BrokenPipeError:
+        # the reader went away (e.g. `list | head`); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    remote = _daemon_client(args)
+    try:
+        return _dispatch(parser, args, remote)
+    finally:
+        if remote is not None:
+            remote.close()
+
 
+def _dispatch(parser: argparse.ArgumentParser, args: argparse.Namespace, remote: Optional[DaemonClient]) -> int:
     db = init_db(args.db)
 
     if args.cmd == "add-note":
-        note_id = add_note(db, args.title, args.content)
-        logger.info("Added note %s", note_id)
+        note_id = remote.add_note(args.title, args.content) if remote else add_note(db, args.title, args.content)
+        _info("Added note %s", note_id)
         print(note_id)
         return 0
 
     if args.cmd == "add-task":
-        task_id = add_task(db, args.title, args.due)
-        logger.info("Added task %s", task_id)
+        task_id = remote.add_task(args.title, args.due) if remote else add_task(db, args.title, args.due)
+        _info("Added task %s", task_id)
         print(task_id)
         return 0
 
     if args.cmd == "list":
         t = args.type
+        if args.after is not None and t == "all":
+            # notes and tasks page independently; one cursor cannot continue both
+            parser.error("--after needs --type notes or --type tasks")
         completed_opt = None
         if args.completed == "true":
             completed_opt = True
@@ -82,29 +265,165 @@ def main(argv: Optional[list[str]] = None) -> int:
             completed_opt = False
 
         if t in ("all", "notes"):
-            for n in list_notes(db):
-                print(f"NOTE #{n.id}: {n.title} -- {n.content or ''} ({n.created_at.isoformat()})")
+            shown = 0
+            preview = args.preview if args.preview > 0 else None
+            notes = (remote.list_notes if remote else partial(list_notes, db))(
+                limit=args.limit, before=args.after, preview=preview
+            )
+            for n in notes:
+                text = (n.content or "") if n.preview is None else n.preview + "…"
+                print(f"NOTE #{n.id}: {n.title} -- {text} ({n.created_at.isoformat()})")
+                shown += 1
+                if shown == args.limit:
+                    print(f"more notes: --type notes --after '{_cursor(n.created_at, n.id)}'", file=sys.stderr)
 
         if t in ("all", "tasks"):
-            for k in list_tasks(db, completed=completed_opt):
+            shown = 0
+            tasks = (remote.list_tasks if remote else partial(list_tasks, db))(
+                completed=completed_opt, limit=args.limit, before=args.after, include_archived=args.include_archived
+            )
+            for k in tasks:
                 status = "done" if k.completed_at else "open"
                 due = k.due_at.date().isoformat() if k.due_at else "-"
                 print(f"TASK #{k.id} [{status}] (due {due}): {k.title}")
+                shown += 1
+                if shown == args.limit:
+                    print(f"more tasks: --type tasks --after '{_cursor(k.created_at, k.id)}'", file=sys.stderr)
         return 0
 
     if args.cmd == "complete-task":
-        ok = complete_task(db, args.id)
+        ok = remote.complete_task(args.id) if remote else complete_task(db, args.id)
         print("OK" if ok else "NOT-CHANGED")
         return 0 if ok else 1
 
+    if args.cmd == "bulk":
+        if args.action == "reschedule" and (args.due is None) == (not args.clear_due):
+            parser.error("bulk reschedule needs exactly one of --due or --clear-due")
+        filters = (args.ids, args.completed, args.overdue, args.due_before, args.created_before, args.title)
+        if not any(filters):
+            parser.error("bulk needs task ids or at least one filter")
+        changed = (remote.bulk_tasks if remote else partial(bulk_tasks, db))(
+            args.action,
+            ids=args.ids or None,
+            due_at=args.due,
+            completed=None if args.completed is None else args.completed == "true",
+            overdue=args.overdue,
+            due_before=args.due_before,
+            created_before=args.created_before,
+            title=args.title,
+        )
+        _info("Bulk %s changed %d tasks", args.action, changed)
+        print(changed)
+        return 0
+
     if args.cmd == "export":
-        content = export_all_json(db)
         if args.out:
             args.out.parent.mkdir(parents=True, exist_ok=True)
-            args.out.write_text(content, encoding="utf-8")
+            # write next to the target and swap it in, so a failed run keeps the old file
+            tmp = args.out.with_name(args.out.name + ".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as fp:
+                    counts = export_stream(db, fp, args.format, since=args.since, include_archived=args.include_archived)
+                os.replace(tmp, args.out)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            _info("Exported %d notes and %d tasks", counts["notes"], counts["tasks"])
             print(str(args.out))
         else:
-            print(content)
+            export_stream(db, sys.stdout, args.format, since=args.since, include_archived=args.include_archived)
+            if args.format == "json":
+                print()
+        return 0
+
+    if args.cmd == "search":
+        hits = (remote.search if remote else partial(search, db))(
+            args.query, limit=args.limit, kind=args.type, include_archived=args.include_archived
+        )
+        for hit in hits:
+            if hit.kind == "note":
+                print(f"NOTE #{hit.id}: {hit.title} -- {hit.snippet}")
+            else:
+                print(f"TASK #{hit.id}: {hit.snippet}")
+        return 0
+
+    if args.cmd == "archive":
+        before = args.before or datetime.now(timezone.utc) - timedelta(days=args.older_than)
+        moved = archive_tasks(db, before, batch_size=args.batch_size)
+        _info("Archived %d tasks completed before %s", moved, before.isoformat())
+        print(moved)
+        return 0
+
+    if args.cmd == "backup":
+        compress = True if args.gzip else None
+        progress = _progress_printer("backup") if args.progress else None
+        with db.connect() as conn:
+            mode = conn.execute("PRAGMA journal_mode=WAL" if args.wal else "PRAGMA journal_mode").fetchone()[0]
+        if mode != "wal":
+            print(
+                f"quickcapture: warning: the store uses journal_mode={mode}; writes during the backup "
+                "restart it (--wal switches the store to WAL)",
+                file=sys.stderr,
+            )
+        pages = db.backup(args.dest, pages=args.pages, pause=args.sleep, compress=compress, progress=progress)
+        _info("Backed up %d pages to %s", pages, args.dest)
+        print(str(args.dest))
+        return 0
+
+    if args.cmd == "restore":
+        progress = _progress_printer("restore") if args.progress else None
+        try:
+            pages = db.restore(args.src, pages=args.pages, progress=progress)
+        except (OSError, ValueError) as exc:
+            print(f"quickcapture: {exc}", file=sys.stderr)
+            return 1
+        _info("Restored %d pages from %s", pages, args.src)
+        print("OK")
+        return 0
+
+    if args.cmd == "stats":
+        if args.counters == "on":
+            db.enable_counters()
+        elif args.counters == "off":
+            db.disable_counters()
+        counts = stats(db)
+        days = daily_counts(db, args.days)
+        if args.json:
+            import json
+
+            print(json.dumps({**counts, "days": days} if args.days > 0 else counts, indent=2))
+            return 0
+        print(f"notes: {counts['notes']}")
+        print(f"tasks: {counts['tasks']} (open {counts['open']}, done {counts['done']}, overdue {counts['overdue']})")
+        print(f"archived tasks: {counts['archived']}")
+        for d in days:
+            print(f"{d['day']}  notes {d['notes']}  tasks {d['tasks_created']}  done {d['tasks_completed']}")
+        return 0
+
+    if args.cmd == "daemon":
+        try:
+            from .daemon import serve
+        except ImportError as exc:
+            parser.error(str(exc))
+        path = args.socket or default_socket_path(db.path)
+        try:
+            serve(db.path, path, ready=lambda: _info("Serving %s on %s", db.path, path))
+        except RuntimeError as exc:
+            print(f"quickcapture: {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.cmd == "import":
+        start = time.perf_counter()
+        if args.file == "-":
+            counts = import_items(db, sys.stdin, args.format, batch_size=args.batch_size, upsert=args.upsert)
+        else:
+            with open(args.file, encoding="utf-8", newline="") as fp:
+                counts = import_items(db, fp, args.format, batch_size=args.batch_size, upsert=args.upsert)
+        elapsed = time.perf_counter() - start
+        rows = counts["notes"] + counts["tasks"]
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        print(f"Imported {counts['notes']} notes and {counts['tasks']} tasks in {elapsed:.2f}s ({rate:.0f} rows/s)")
         return 0
 
     parser.print_help()
@@ -0,0 +1,201 @@
+"""Client for ``quickcapture daemon``.
+
+The daemon speaks newline-delimited JSON over a Unix domain socket. Each
+request is one object with an ``op`` and its arguments::
+
+    {"op": "add_note", "title": "Meeting", "content": "Discuss roadmap"}
+
+and is answered with ``{"ok": true, "result": ...}`` or
+``{"ok": false, "type": "ValueError", "error": "..."}``. Listing ops
+(``list_notes``, ``list_tasks``) first send their rows as
+``{"ok": true, "items": [...]}`` pages, then the final result (the row
+count). Timestamps travel as ISO-8601 strings. A connection can carry any
+number of requests. Notes listed with a ``preview`` length carry a
+``preview`` instead of their ``content`` when it is longer; the
+``note_content`` op returns the full text.
+
+This module only needs ``_socket`` and ``json`` so the CLI stays quick to
+start when it talks to a running daemon.
+"""
+
+from __future__ import annotations
+
+import _socket  # not `socket`: building its enums costs ~5 ms of CLI startup
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import Note, SearchHit, Task
+
+
+class DaemonError(RuntimeError):
+    """The daemon rejected a request or failed while serving it."""
+
+
+def _iso(value: Union[datetime, str, None]) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class DaemonClient:
+    """Connection to a running daemon with the same calls as ``services``.
+
+    Methods mirror the service functions without their ``db`` argument and
+    return the same types. ``connect`` returns ``None`` instead of raising
+    when no daemon listens on the socket, so callers can fall back to
+    opening the database themselves.
+    """
+
+    def __init__(self, sock: _socket.socket) -> None:
+        self._sock = sock
+        self._buf = b""
+
+    @classmethod
+    def connect(cls, path: Path, timeout: Optional[float] = 30.0) -> Optional["DaemonClient"]:
+        if not hasattr(_socket, "AF_UNIX") or not os.path.exists(path):
+            return None
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            # stale socket file or nobody listening
+            sock.close()
+            return None
+        return cls(sock)
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _send(self, op: str, args: Dict[str, Any]) -> None:
+        self._sock.sendall((json.dumps({"op": op, **args}) + "\n").encode("utf-8"))
+
+    def _readline(self) -> bytes:
+        end = self._buf.find(b"\n")
+        if end < 0:
+            parts = [self._buf]
+            while True:
+                chunk = self._sock.recv(65536)
+                if not chunk:
+                    raise DaemonError("daemon closed the connection")
+                parts.append(chunk)
+                if b"\n" in chunk:
+                    break
+            self._buf = b"".join(parts)
+            end = self._buf.find(b"\n")
+        line, self._buf = self._buf[: end + 1], self._buf[end + 1 :]
+        return line
+
+    def _reply(self) -> Dict[str, Any]:
+        reply = json.loads(self._readline())
+        if not reply.get("ok"):
+            if reply.get("type") == "ValueError":
+                raise ValueError(reply.get("error"))
+            raise DaemonError(f"{reply.get('type')}: {reply.get('error')}")
+        return reply
+
+    def call(self, op: str, **args: Any) -> Any:
+        """Send one request and return its result."""
+        self._send(op, args)
+        return self._reply()["result"]
+
+    def stream(self, op: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Send a listing request and yield its records page by page.
+
+        The generator must be exhausted before the next request on this
+        connection.
+        """
+        self._send(op, args)
+        while True:
+            reply = self._reply()
+            if "items" not in reply:
+                return
+            yield from reply["items"]
+
+    def ping(self) -> bool:
+        return self.call("ping") == "pong"
+
+    def add_note(self, title: str, content: Optional[str] = None) -> int:
+        return int(self.call("add_note", title=title, content=content))
+
+    def add_task(self, title: str, due_at: Optional[datetime] = None) -> int:
+        return int(self.call("add_task", title=title, due_at=_iso(due_at)))
+
+    def complete_task(self, task_id: int) -> bool:
+        return bool(self.call("complete_task", id=int(task_id)))
+
+    def note_content(self, note_id: int) -> Optional[str]:
+        return self.call("note_content", id=int(note_id))
+
+    def bulk_tasks(
+        self,
+        action: str,
+        *,
+        ids: Optional[Iterable[int]] = None,
+        due_at: Optional[datetime] = None,
+        completed: Optional[bool] = None,
+        overdue: bool = False,
+        due_before: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        title: Optional[str] = None,
+    ) -> int:
+        return int(
+            self.call(
+                "bulk_tasks",
+                action=action,
+                ids=None if ids is None else [int(i) for i in ids],
+                due_at=_iso(due_at),
+                completed=completed,
+                overdue=overdue,
+                due_before=_iso(due_before),
+                created_before=_iso(created_before),
+                title=title,
+            )
+        )
+
+    def list_notes(
+        self,
+        *,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[Union[datetime, str], int]] = None,
+        preview: Optional[int] = None,
+    ) -> Iterator[Note]:
+        """Like ``services.list_notes``.
+
+        Reading ``content`` of a previewed note takes a request, so do it
+        only once the listing is exhausted.
+        """
+        cursor = None if before is None else [_iso(before[0]), int(before[1])]
+        for r in self.stream("list_notes", limit=limit, before=cursor, preview=preview):
+            if "preview" in r:
+                yield Note(r["title"], self.note_content, r["id"], r["created_at"], r["preview"])
+            else:
+                yield Note(r["title"], r["content"], r["id"], r["created_at"])
+
+    def list_tasks(
+        self,
+        completed: Optional[bool] = None,
+        *,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[Union[datetime, str], int]] = None,
+        include_archived: bool = False,
+    ) -> Iterator[Task]:
+        cursor = None if before is None else [_iso(before[0]), int(before[1])]
+        records = self.stream(
+            "list_tasks", completed=completed, limit=limit, before=cursor, include_archived=include_archived
+        )
+        for r in records:
+            yield Task(r["title"], r["due_at"], r["id"], r["created_at"], r["completed_at"])
+
+    def search(
+        self, query: str, *, limit: int = 20, kind: str = "all", include_archived: bool = False
+    ) -> List[SearchHit]:
+        hits = self.call("search", query=query, limit=limit, kind=kind, include_archived=include_archived)
+        return [SearchHit(h["kind"], h["id"], h["title"], h["snippet"], h["score"]) for h in hits]
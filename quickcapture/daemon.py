@@ -0,0 +1,282 @@
+"""``quickcapture daemon``: serve the store over a Unix domain socket.
+
+The daemon opens the database once and keeps that connection (and its page
+cache) warm; every write runs on the single thread of a ``CaptureWriter``,
+so concurrent captures from several clients share commits. Client
+connections are handled on their own threads, which answer searches and
+listings from a connection of their own instead of queueing behind writes.
+See ``quickcapture.client`` for the protocol.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import services
+from .client import DaemonClient
+from .db import Database
+from .models import Note, Task
+from .writer import CaptureWriter
+
+if not hasattr(socket, "AF_UNIX"):  # pragma: no cover - Windows builds without AF_UNIX
+    raise ImportError("quickcapture daemon needs Unix domain sockets")
+
+# rows per page when streaming a listing to the client
+_PAGE = 500
+# seconds a write waits for the writer before an error reply; below the client's socket timeout
+WRITE_TIMEOUT = 10.0
+
+
+def _dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _cursor(value: Optional[List[Any]]) -> Optional[Tuple[str, int]]:
+    return None if value is None else (str(value[0]), int(value[1]))
+
+
+def _note(n: Note) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": n.id, "title": n.title, "created_at": n.created_at.isoformat()}
+    # a preview stands in for content the client fetches with note_content
+    if n.preview is not None:
+        record["preview"] = n.preview
+    else:
+        record["content"] = n.content
+    return record
+
+
+def _task(t: Task) -> Dict[str, Any]:
+    return {
+        "id": t.id,
+        "title": t.title,
+        "due_at": t.due_at.isoformat() if t.due_at else None,
+        "completed_at": t.completed_at.isoformat() if t.completed_at else None,
+        "created_at": t.created_at.isoformat(),
+    }
+
+
+def _add_note(db: Database, req: Dict[str, Any]) -> int:
+    return services.add_note(db, req["title"], req.get("content"))
+
+
+def _add_task(db: Database, req: Dict[str, Any]) -> int:
+    return services.add_task(db, req["title"], _dt(req.get("due_at")))
+
+
+def _complete_task(db: Database, req: Dict[str, Any]) -> bool:
+    return services.complete_task(db, int(req["id"]))
+
+
+def _note_content(db: Database, req: Dict[str, Any]) -> Optional[str]:
+    return services.note_content(db, int(req["id"]))
+
+
+def _bulk_tasks(db: Database, req: Dict[str, Any]) -> int:
+    return services.bulk_tasks(
+        db,
+        req["action"],
+        ids=req.get("ids"),
+        due_at=_dt(req.get("due_at")),
+        completed=req.get("completed"),
+        overdue=bool(req.get("overdue")),
+        due_before=_dt(req.get("due_before")),
+        created_before=_dt(req.get("created_before")),
+        title=req.get("title"),
+    )
+
+
+def _search(db: Database, req: Dict[str, Any]) -> List[Dict[str, Any]]:
+    hits = services.search(
+        db,
+        req["query"],
+        limit=int(req.get("limit", 20)),
+        kind=req.get("kind", "all"),
+        include_archived=bool(req.get("include_archived")),
+    )
+    return [{"kind": h.kind, "id": h.id, "title": h.title, "snippet": h.snippet, "score": h.score} for h in hits]
+
+
+# op -> function run on the writer thread; its result is sent back as is
+_WRITES: Dict[str, Callable[[Database, Dict[str, Any]], Any]] = {
+    "add_note": _add_note,
+    "add_task": _add_task,
+    "complete_task": _complete_task,
+    "bulk_tasks": _bulk_tasks,
+}
+# op -> function run on the client's own connection
+_READS: Dict[str, Callable[[Database, Dict[str, Any]], Any]] = {
+    "note_content": _note_content,
+    "search": _search,
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            with self.server.reader.session():
+                self._serve()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _serve(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+                op = req.get("op")
+                if op in ("list_notes", "list_tasks"):
+                    count = 0
+                    for page in self.server.pages(op, req):
+                        self._write({"ok": True, "items": page})
+                        count += len(page)
+                    reply: Dict[str, Any] = {"ok": True, "result": count}
+                elif op == "ping":
+                    reply = {"ok": True, "result": "pong"}
+                elif op in _WRITES:
+                    reply = {"ok": True, "result": self.server.run(_WRITES[op], req)}
+                elif op in _READS:
+                    reply = {"ok": True, "result": _READS[op](self.server.reader, req)}
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as exc:  # noqa: BLE001
+                reply = {"ok": False, "type": type(exc).__name__, "error": str(exc)}
+            try:
+                self._write(reply)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def _write(self, reply: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server; every write runs on one ``CaptureWriter``.
+
+    Reads go through ``reader``, a second ``Database`` on the same file that
+    gives each client connection its own SQLite connection. A write that the
+    writer has not started within ``write_timeout`` seconds is cancelled and
+    gets an error reply; one it has started is waited for another
+    ``write_timeout``, after which the reply says it may still commit.
+    Binding removes a stale socket file but refuses to take over the socket
+    of a daemon that still answers. The socket is created readable and
+    writable by the owner only. ``server_close()`` commits pending writes and
+    removes the socket file.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, db: Database, *, write_timeout: float = WRITE_TIMEOUT) -> None:
+        self.path = Path(path)
+        self.write_timeout = float(write_timeout)
+        if os.path.exists(self.path):
+            probe = DaemonClient.connect(self.path, timeout=1.0)
+            if probe is not None:
+                probe.close()
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            self.path.unlink()
+        self.db = db
+        with db.connect():
+            pass  # surface open/migration errors here, not on the writer thread
+        self.reader = Database(db.path)
+        self.writer = CaptureWriter(db)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), _Handler)
+        except BaseException:
+            self.writer.close()
+            raise
+        finally:
+            os.umask(old_umask)
+
+    def run(self, fn: Callable[[Database, Dict[str, Any]], Any], req: Dict[str, Any]) -> Any:
+        """Run ``fn`` on the writer, waiting at most ``write_timeout`` seconds."""
+        future = self.writer.submit(fn, req)
+        try:
+            return future.result(self.write_timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise TimeoutError(
+                    f"Writer did not answer within {self.write_timeout:g}s; the write was cancelled"
+                ) from None
+        # the writer had already started it: its outcome is the batch's
+        try:
+            return future.result(self.write_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(
+                f"Writer did not finish within {2 * self.write_timeout:g}s; the write may still commit"
+            ) from None
+
+    def pages(self, op: str, req: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        """Yield a listing in keyset pages read on the client's connection."""
+        limit = req.get("limit")
+        remaining = None if limit is None else max(0, int(limit))
+        before = _cursor(req.get("before"))
+        completed = req.get("completed")
+        preview = req.get("preview")
+        include_archived = bool(req.get("include_archived"))
+        while remaining is None or remaining > 0:
+            n = _PAGE if remaining is None else min(_PAGE, remaining)
+
+            if op == "list_notes":
+                notes = services.list_notes(self.reader, limit=n, before=before, preview=preview)
+                page = [_note(x) for x in notes]
+            else:
+                tasks = services.list_tasks(
+                    self.reader, completed, limit=n, before=before, include_archived=include_archived
+                )
+                page = [_task(x) for x in tasks]
+            if page:
+                yield page
+            if len(page) < n:
+                return
+            before = (page[-1]["created_at"], page[-1]["id"])
+            if remaining is not None:
+                remaining -= len(page)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.writer.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def serve(db_path: Path, path: Path, *, ready: Optional[Callable[[], None]] = None) -> None:
+    """Run the daemon in the foreground until SIGINT or SIGTERM.
+
+    ``ready`` is called once the socket accepts connections.
+    """
+    db = Database(db_path, persistent=True)
+    try:
+        server = DaemonServer(path, db)
+    except BaseException:
+        db.close()
+        raise
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if ready is not None:
+        ready()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
@@ -1,84 +1,968 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
 
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 8
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_GZIP_MAGIC = b"\x1f\x8b"
+# note content over this many UTF-8 bytes is stored zlib-compressed in notes.content_z
+CONTENT_COMPRESS_BYTES = 2048
+# characters of a compressed note kept as text in notes.content, for listings
+CONTENT_PREVIEW_CHARS = 256
+
+
+def epoch_us_sql(column: str) -> str:
+    """SQL for the UTC epoch-microsecond value of an ISO-8601 text column.
+
+    Naive values are taken as UTC, matching ``services._epoch_us``. Whole
+    seconds, fraction and ``+HH:MM`` offset are read separately because
+    ``strftime`` rounds fractional input to milliseconds.
+    """
+    c = column
+    return (
+        f"(CASE WHEN {c} IS NULL OR {c} = '' THEN NULL ELSE "
+        f"CAST(strftime('%s', substr({c}, 1, 19)) AS INTEGER) * 1000000"
+        f" + CASE WHEN substr({c}, 20, 1) = '.' "
+        f"THEN CAST(round(CAST('0' || substr({c}, 20, 7) AS REAL) * 1000000) AS INTEGER) ELSE 0 END"
+        f" - CASE WHEN length({c}) > 19 AND substr({c}, -6, 1) IN ('+', '-') "
+        f"THEN (CASE substr({c}, -6, 1) WHEN '-' THEN -1 ELSE 1 END) "
+        f"* (CAST(substr({c}, -5, 2) AS INTEGER) * 3600 + CAST(substr({c}, -2, 2) AS INTEGER) * 60) * 1000000 "
+        f"ELSE 0 END END)"
+    )
+
+
+def pack_content(text: Optional[str]) -> Tuple[Optional[str], Optional[bytes]]:
+    """``(content, content_z)`` column values for the text of a note.
+
+    Text over ``CONTENT_COMPRESS_BYTES`` is compressed into ``content_z`` and
+    only its first ``CONTENT_PREVIEW_CHARS`` characters stay in ``content``,
+    unless compression would not save space.
+    """
+    if text is None:
+        return None, None
+    raw = text.encode("utf-8")
+    if len(raw) <= CONTENT_COMPRESS_BYTES:
+        return text, None
+    import zlib
+
+    packed = zlib.compress(raw, 6)
+    preview = text[:CONTENT_PREVIEW_CHARS]
+    if len(packed) + len(preview.encode("utf-8")) >= len(raw):
+        return text, None
+    return preview, packed
+
+
+def inflate_content(packed: Optional[bytes]) -> Optional[str]:
+    """Text of a ``content_z`` value; the ``qc_inflate`` SQL function."""
+    if packed is None:
+        return None
+    import zlib
+
+    return zlib.decompress(packed).decode("utf-8")
+
+
+def note_content_sql(prefix: str = "") -> str:
+    """SQL for the full text of a note; ``prefix`` qualifies the columns (``"n."``)."""
+    return f"coalesce(qc_inflate({prefix}content_z), {prefix}content)"
+
+
+def sync_note_index(conn: sqlite3.Connection) -> int:
+    """Bring the full-text index up to date for compressed notes.
+
+    The ``notes_fts`` triggers cannot inflate ``content_z``, so writes that
+    touch a compressed note are queued in ``notes_fts_pending`` with the
+    values the index holds for it; this removes those and indexes the
+    notes' current text. Returns the number of notes re-indexed.
+    """
+    if not Database.has_fts(conn):
+        return 0
+    done = 0
+    while True:
+        rows = conn.execute(
+            "SELECT p.id, p.title, p.content_z, n.title, n.content, n.content_z "
+            "FROM notes_fts_pending p LEFT JOIN notes n ON n.id = p.id ORDER BY p.id LIMIT 500"
+        ).fetchall()
+        if not rows:
+            return done
+        for note_id, old_title, old_z, title, content, content_z in rows:
+            if old_title is not None:
+                conn.execute(
+                    "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+                    (note_id, old_title, inflate_content(old_z)),
+                )
+            if title is not None:
+                text = content if content_z is None else inflate_content(content_z)
+                conn.execute("INSERT INTO notes_fts(rowid, title, content) VALUES (?, ?, ?)", (note_id, title, text))
+        conn.executemany("DELETE FROM notes_fts_pending WHERE id = ?", [(row[0],) for row in rows])
+        done += len(rows)
+
+
+_CHANGE_LOG_TRIGGERS = ("notes_log_ai", "notes_log_au", "notes_log_ad")
+_CHANGE_LOG_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_log_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO note_changes(note_id) VALUES (new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_log_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO note_changes(note_id) VALUES (new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_log_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO note_changes(note_id) VALUES (old.id);
+    END
+    """,
+)
+
+_COUNTER_TRIGGERS = (
+    "notes_count_ai",
+    "notes_count_ad",
+    "tasks_count_ai",
+    "tasks_count_ad",
+    "tasks_count_au",
+    "tasks_archive_count_ai",
+    "tasks_archive_count_ad",
+)
+_COUNTER_DDL = (
+    "CREATE TABLE IF NOT EXISTS item_counts (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID",
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_count_ai AFTER INSERT ON notes BEGIN
+        UPDATE item_counts SET value = value + 1 WHERE name = 'notes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_count_ad AFTER DELETE ON notes BEGIN
+        UPDATE item_counts SET value = value - 1 WHERE name = 'notes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_count_ai AFTER INSERT ON tasks BEGIN
+        UPDATE item_counts SET value = value + 1
+        WHERE name = 'tasks' OR (name = 'tasks_done' AND new.completed_at IS NOT NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_count_ad AFTER DELETE ON tasks BEGIN
+        UPDATE item_counts SET value = value - 1
+        WHERE name = 'tasks' OR (name = 'tasks_done' AND old.completed_at IS NOT NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_count_au AFTER UPDATE OF completed_at ON tasks
+    WHEN (new.completed_at IS NULL) IS NOT (old.completed_at IS NULL) BEGIN
+        UPDATE item_counts SET value = value + (CASE WHEN new.completed_at IS NULL THEN -1 ELSE 1 END)
+        WHERE name = 'tasks_done';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_count_ai AFTER INSERT ON tasks_archive BEGIN
+        UPDATE item_counts SET value = value + 1 WHERE name = 'archived';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_count_ad AFTER DELETE ON tasks_archive BEGIN
+        UPDATE item_counts SET value = value - 1 WHERE name = 'archived';
+    END
+    """,
+)
 
 
 class Database:
-    def __init__(self, path: Path) -> None:
+    """SQLite store.
+
+    By default every ``connect()`` opens a fresh connection and commits and
+    closes it on exit. With ``persistent=True`` each thread reuses one
+    connection for the lifetime of the ``Database`` (until ``close()``), and
+    WAL journaling with ``synchronous=NORMAL`` is enabled unless other values
+    are given. ``journal_mode``, ``synchronous``, ``cache_size`` and
+    ``mmap_size`` map to the SQLite pragmas of the same name.
+
+    ``transaction()`` groups several service calls into a single commit.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        persistent: bool = False,
+        journal_mode: Optional[str] = None,
+        synchronous: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        mmap_size: Optional[int] = None,
+    ) -> None:
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._ensure_initialized()
+        self.persistent = bool(persistent)
+        if self.persistent and journal_mode is None:
+            journal_mode = "WAL"
+        if journal_mode is not None and journal_mode.upper() == "WAL" and synchronous is None:
+            synchronous = "NORMAL"
+        self._pragmas = self._pragma_statements(journal_mode, synchronous, cache_size, mmap_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._schema_ready = False
+
+    @staticmethod
+    def _pragma_statements(
+        journal_mode: Optional[str],
+        synchronous: Optional[str],
+        cache_size: Optional[int],
+        mmap_size: Optional[int],
+    ) -> List[str]:
+        pragmas: List[str] = []
+        if journal_mode is not None:
+            if journal_mode.upper() not in _JOURNAL_MODES:
+                raise ValueError(f"Unsupported journal_mode: {journal_mode}")
+            pragmas.append(f"PRAGMA journal_mode={journal_mode.upper()};")
+        if synchronous is not None:
+            if str(synchronous).upper() not in _SYNCHRONOUS:
+                raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+            pragmas.append(f"PRAGMA synchronous={str(synchronous).upper()};")
+        if cache_size is not None:
+            pragmas.append(f"PRAGMA cache_size={int(cache_size)};")
+        if mmap_size is not None:
+            pragmas.append(f"PRAGMA mmap_size={int(mmap_size)};")
+        return pragmas
+
+    def _open(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # persistent connections may be closed by close() from another thread
+        conn = sqlite3.connect(str(self.path), check_same_thread=not self.persistent)
+        conn.row_factory = sqlite3.Row
+        self.register_functions(conn)
+        conn.execute("PRAGMA foreign_keys=ON;")
+        for pragma in self._pragmas:
+            conn.execute(pragma)
+        if not self._schema_ready:
+            try:
+                self._ensure_schema(conn)
+            except BaseException:
+                conn.close()
+                raise
+            self._schema_ready = True
+        return conn
+
+    def _thread_connection(self) -> Optional[sqlite3.Connection]:
+        """Return the connection bound to this thread, opening it in persistent mode."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None and self.persistent:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _rollback(conn: sqlite3.Connection) -> None:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
 
     @contextmanager
-    def connect(self):
-        conn = sqlite3.connect(str(self.path))
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        conn = self._thread_connection()
+        if conn is None:
+            conn = self._open()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                self._rollback(conn)
+                raise
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            return
+
+        if getattr(self._local, "depth", 0):
+            # inside transaction(): the outermost scope commits or rolls back
+            yield conn
+            return
         try:
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys=ON;")
             yield conn
             conn.commit()
-        except Exception:
+        except BaseException:
+            self._rollback(conn)
+            raise
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run every ``connect()`` of this thread inside one transaction.
+
+        Nested scopes join the outermost one, which commits on success and
+        rolls back if an exception escapes it.
+        """
+        local = self._local
+        conn = self._thread_connection()
+        pinned = conn is None
+        if conn is None:
+            conn = self._open()
+            local.conn = conn
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        try:
+            if depth == 0 and not conn.in_transaction:
+                conn.execute("BEGIN")
+            yield conn
+            if depth == 0:
+                conn.commit()
+        except BaseException:
+            if depth == 0:
+                self._rollback(conn)
+            raise
+        finally:
+            local.depth = depth
+            if pinned:
+                del local.conn
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    @contextmanager
+    def session(self) -> Iterator[sqlite3.Connection]:
+        """Pin one connection to this thread until the scope ends.
+
+        Every ``connect()`` and ``transaction()`` of the thread reuses it, also
+        when the database is not persistent. Long-lived workers use this to
+        own a single connection.
+        """
+        conn = self._thread_connection()
+        if conn is not None:
+            yield conn
+            return
+        conn = self._open()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            del self._local.conn
             try:
-                conn.rollback()
+                conn.close()
             except Exception:
                 pass
+
+    def backup(
+        self,
+        dest: Path,
+        *,
+        pages: int = 1024,
+        pause: float = 0.01,
+        compress: Optional[bool] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Snapshot the live store to ``dest`` with SQLite's online backup API.
+
+        Pages are copied ``pages`` at a time with a ``pause`` (seconds) after
+        each step. In WAL mode (persistent connections, the daemon) every step
+        reads the snapshot taken at the start while other connections keep
+        writing. Otherwise writers get the lock between steps and SQLite
+        restarts the copy when they change the store, so a store under
+        constant writes should use WAL. ``progress(copied, total)`` is called
+        after each step. With ``compress`` (default: when ``dest`` ends in
+        ``.gz``) the snapshot is gzipped. ``dest`` is replaced only once the
+        snapshot is complete. Returns the number of pages copied.
+        """
+        import shutil
+
+        dest = Path(dest)
+        if compress is None:
+            compress = dest.suffix == ".gz"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".tmp")
+        raw = tmp.with_name(tmp.name + ".db") if compress else tmp
+        total = 0
+
+        def step(status: int, remaining: int, count: int) -> None:
+            nonlocal total
+            total = count
+            if progress is not None:
+                progress(count - remaining, count)
+            if remaining and pause > 0:
+                time.sleep(pause)
+
+        try:
+            target = sqlite3.connect(str(raw))
+            try:
+                with self.connect() as conn:
+                    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                        # pin one read snapshot for every step; WAL writers carry on meanwhile
+                        if not conn.in_transaction:
+                            conn.execute("BEGIN")
+                        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                    conn.backup(target, pages=max(1, int(pages)), progress=step)
+                # a self-contained file: no -wal/-shm needed to open it
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+            if compress:
+                import gzip
+
+                with open(raw, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as out:
+                    shutil.copyfileobj(src, out, 1 << 20)
+                raw.unlink()
+            os.replace(tmp, dest)
+        except BaseException:
+            for path in {raw, tmp}:
+                path.unlink(missing_ok=True)
             raise
+        return total
+
+    def restore(
+        self,
+        src: Path,
+        *,
+        pages: int = 1024,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Replace the store's contents with the snapshot at ``src``.
+
+        Gzipped snapshots are recognised by their header and inflated next
+        to the store first. The snapshot must pass ``PRAGMA quick_check``
+        and look like a QuickCapture store; it is then copied in with the
+        backup API (``pages`` per step, ``progress(copied, total)`` after
+        each) and migrated if it comes from an older version. Returns the
+        number of pages copied.
+        """
+        import shutil
+
+        src = Path(src)
+        with open(src, "rb") as fp:
+            compressed = fp.read(2) == _GZIP_MAGIC
+        plain = src
+        if compressed:
+            import gzip
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            plain = self.path.with_name(self.path.name + ".restore.tmp")
+            with gzip.open(src, "rb") as zipped, open(plain, "wb") as out:
+                shutil.copyfileobj(zipped, out, 1 << 20)
+        total = 0
+
+        def step(status: int, remaining: int, count: int) -> None:
+            nonlocal total
+            total = count
+            if progress is not None:
+                progress(count - remaining, count)
+
+        try:
+            source = sqlite3.connect(f"{plain.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                self._check_snapshot(source, src)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                target = sqlite3.connect(str(self.path))
+                try:
+                    source.backup(target, pages=max(1, int(pages)), progress=step)
+                finally:
+                    target.close()
+            finally:
+                source.close()
         finally:
+            if compressed:
+                plain.unlink(missing_ok=True)
+        # the snapshot may predate the current schema
+        self._schema_ready = False
+        with self.connect():
+            pass
+        return total
+
+    @staticmethod
+    def _check_snapshot(conn: sqlite3.Connection, src: Path) -> None:
+        try:
+            check = conn.execute("PRAGMA quick_check").fetchone()[0]
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        except sqlite3.DatabaseError as exc:
+            raise ValueError(f"{src} is not a readable SQLite snapshot: {exc}") from exc
+        if check != "ok":
+            raise ValueError(f"Snapshot {src} is damaged: {check}")
+        if not {"notes", "tasks"} <= tables:
+            raise ValueError(f"{src} is not a QuickCapture database")
+
+    def close(self) -> None:
+        """Close the connections kept open in persistent mode."""
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
             try:
                 conn.close()
             except Exception:
                 pass
+        self._local = threading.local()
 
-    def _ensure_initialized(self) -> None:
-        with self.connect() as conn:
-            conn.execute("PRAGMA foreign_keys=ON;")
-            conn.execute(
-                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
-            )
+    def __enter__(self) -> "Database":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        """Migrate on the first connection this ``Database`` opens.
+
+        An up-to-date store costs one ``PRAGMA user_version`` read; migrations
+        run in a single write transaction, re-checking the version under the
+        lock in case another process got there first.
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
             current = self._get_schema_version(conn)
             if current < 1:
                 self._migrate_to_v1(conn)
-                self._set_schema_version(conn, 1)
+            if current < 2:
+                self._migrate_to_v2(conn)
+            if current < 3:
+                self._migrate_to_v3(conn)
+            if current < 4:
+                self._migrate_to_v4(conn)
+            if current < 5:
+                self._migrate_to_v5(conn)
+            if current < 6:
+                self._migrate_to_v6(conn)
+            if current < 7:
+                self._migrate_to_v7(conn)
+            if current < 8:
+                self._migrate_to_v8(conn)
+            self._set_schema_version(conn, SCHEMA_VERSION)
+            # the version now lives in user_version
+            conn.execute("DROP TABLE IF EXISTS meta")
+            conn.commit()
+        except BaseException:
+            self._rollback(conn)
+            raise
 
     @staticmethod
     def _get_schema_version(conn: sqlite3.Connection) -> int:
-        row = conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version:
+            return int(version)
+        # stores created before user_version was used keep it in a meta table
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+        except sqlite3.OperationalError:
+            return 0
         return int(row[0]) if row else 0
 
     @staticmethod
     def _set_schema_version(conn: sqlite3.Connection, version: int) -> None:
-        conn.execute(
-            "INSERT OR REPLACE INTO meta(key, value) VALUES('schema_version', ?)",
-            (str(version),),
-        )
+        conn.execute(f"PRAGMA user_version = {int(version)}")
 
     @staticmethod
     def _migrate_to_v1(conn: sqlite3.Connection) -> None:
-        conn.executescript(
+        # separate statements: executescript() would commit the migration transaction
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS notes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 title TEXT NOT NULL,
                 content TEXT,
                 created_at TEXT NOT NULL
-            );
-
+            )
+            """
+        )
+        conn.execute(
+            """
             CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 title TEXT NOT NULL,
                 due_at TEXT,
                 completed_at TEXT,
                 created_at TEXT NOT NULL
-            );
+            )
+            """
+        )
+
+
+    @staticmethod
+    def _migrate_to_v2(conn: sqlite3.Connection) -> None:
+        """Indexes for the list/filter queries, then fresh planner statistics."""
+        for statement in (
+            "CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at)",
+            # open tasks are the common listing; keep them in their own small index
+            "CREATE INDEX IF NOT EXISTS idx_tasks_open_created_at ON tasks(created_at) WHERE completed_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed_at) WHERE completed_at IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_due_at ON tasks(due_at) WHERE due_at IS NOT NULL",
+            "ANALYZE",
+        ):
+            conn.execute(statement)
+
+
+    @staticmethod
+    def _migrate_to_v3(conn: sqlite3.Connection) -> None:
+        """Full-text indexes over note titles/content and task titles.
+
+        External-content FTS5 tables kept in sync by triggers. Skipped when the
+        SQLite build lacks FTS5; ``has_fts`` then reports False.
+        """
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+                "title, content, content='notes', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+            "title, content='tasks', content_rowid='id')"
+        )
+        for statement in (
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+                INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, title, content)
+                VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+            END
+            """,
+            # index rows that existed before the migration
+            "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+            "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+        ):
+            conn.execute(statement)
+
+    @staticmethod
+    def _migrate_to_v4(conn: sqlite3.Connection) -> None:
+        """Integer epoch-microsecond copies of the creation/completion times.
+
+        ``created_us`` and ``completed_us`` let listings sort and filter on
+        integers; the ISO text columns stay authoritative. Services write both,
+        and triggers fill the integers for writers that only set the text.
+        The text-keyed listing indexes are replaced by integer ones.
+        """
+        conn.execute("ALTER TABLE notes ADD COLUMN created_us INTEGER")
+        conn.execute("ALTER TABLE tasks ADD COLUMN created_us INTEGER")
+        conn.execute("ALTER TABLE tasks ADD COLUMN completed_us INTEGER")
+        conn.execute(f"UPDATE notes SET created_us = {epoch_us_sql('created_at')}")
+        conn.execute(
+            f"UPDATE tasks SET created_us = {epoch_us_sql('created_at')}, "
+            f"completed_us = {epoch_us_sql('completed_at')}"
+        )
+        for statement in (
+            f"""
+            CREATE TRIGGER IF NOT EXISTS notes_us_ai AFTER INSERT ON notes
+            WHEN new.created_us IS NULL BEGIN
+                UPDATE notes SET created_us = {epoch_us_sql('new.created_at')} WHERE id = new.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS notes_us_au AFTER UPDATE OF created_at ON notes
+            WHEN new.created_at IS NOT old.created_at AND new.created_us IS old.created_us BEGIN
+                UPDATE notes SET created_us = {epoch_us_sql('new.created_at')} WHERE id = new.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_us_ai AFTER INSERT ON tasks
+            WHEN new.created_us IS NULL OR (new.completed_at IS NOT NULL AND new.completed_us IS NULL) BEGIN
+                UPDATE tasks SET created_us = {epoch_us_sql('new.created_at')},
+                                 completed_us = {epoch_us_sql('new.completed_at')}
+                WHERE id = new.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_created_us_au AFTER UPDATE OF created_at ON tasks
+            WHEN new.created_at IS NOT old.created_at AND new.created_us IS old.created_us BEGIN
+                UPDATE tasks SET created_us = {epoch_us_sql('new.created_at')} WHERE id = new.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_completed_us_au AFTER UPDATE OF completed_at ON tasks
+            WHEN new.completed_at IS NOT old.completed_at AND new.completed_us IS old.completed_us BEGIN
+                UPDATE tasks SET completed_us = {epoch_us_sql('new.completed_at')} WHERE id = new.id;
+            END
+            """,
+            "DROP INDEX IF EXISTS idx_notes_created_at",
+            "DROP INDEX IF EXISTS idx_tasks_created_at",
+            "DROP INDEX IF EXISTS idx_tasks_open_created_at",
+            "DROP INDEX IF EXISTS idx_tasks_completed_at",
+            "CREATE INDEX IF NOT EXISTS idx_notes_created_us ON notes(created_us)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_created_us ON tasks(created_us)",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_open_created_us ON tasks(created_us) WHERE completed_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS idx_tasks_completed_us ON tasks(completed_us) WHERE completed_us IS NOT NULL",
+            "ANALYZE",
+        ):
+            conn.execute(statement)
+
+    @staticmethod
+    def _migrate_to_v5(conn: sqlite3.Connection) -> None:
+        """Change log of note writes for incremental readers.
+
+        Only the table: its triggers are installed by ``enable_change_log``,
+        so stores without such a reader pay nothing per write.
+        """
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS note_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id INTEGER NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def _migrate_to_v6(conn: sqlite3.Connection) -> None:
+        """Index of open tasks by due date, so overdue counts never touch the table."""
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_open_due_at ON tasks(due_at) "
+            "WHERE completed_at IS NULL AND due_at IS NOT NULL"
+        )
+
+    @staticmethod
+    def _migrate_to_v7(conn: sqlite3.Connection) -> None:
+        """Cold storage for completed tasks.
+
+        ``tasks_archive`` has the columns of ``tasks`` and keeps the ids of the
+        rows moved into it (``tasks`` ids are AUTOINCREMENT and never reused),
+        with its own full-text index when FTS5 is available.
+        """
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks_archive (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                due_at TEXT,
+                completed_at TEXT,
+                created_at TEXT NOT NULL,
+                created_us INTEGER,
+                completed_us INTEGER
+            )
             """
         )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_archive_created_us ON tasks_archive(created_us)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_archive_completed_us ON tasks_archive(completed_us)")
+        if not Database.has_fts(conn):
+            return
+        for statement in (
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_archive_fts USING fts5("
+            "title, content='tasks_archive', content_rowid='id')",
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_ai AFTER INSERT ON tasks_archive BEGIN
+                INSERT INTO tasks_archive_fts(rowid, title) VALUES (new.id, new.title);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_ad AFTER DELETE ON tasks_archive BEGIN
+                INSERT INTO tasks_archive_fts(tasks_archive_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_au AFTER UPDATE OF title ON tasks_archive BEGIN
+                INSERT INTO tasks_archive_fts(tasks_archive_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO tasks_archive_fts(rowid, title) VALUES (new.id, new.title);
+            END
+            """,
+        ):
+            conn.execute(statement)
+
+    @staticmethod
+    def _migrate_to_v8(conn: sqlite3.Connection) -> None:
+        """Compressed storage for large note content.
+
+        ``content_z`` holds the zlib-compressed text of notes over
+        ``CONTENT_COMPRESS_BYTES`` and ``content`` only its start (see
+        ``pack_content``); existing notes are packed here. ``notes_fts``
+        keeps indexing whole notes without storing them: the plain-SQL
+        triggers handle uncompressed notes, and queue any write touching a
+        compressed one in ``notes_fts_pending``, together with the values the
+        index holds for it, for ``sync_note_index`` to apply. Writers that
+        only set ``content`` have ``content_z`` cleared.
+        """
+        fts = Database.has_fts(conn)
+        if fts:
+            # the index keeps the whole text of the notes packed below
+            for trigger in ("notes_fts_ai", "notes_fts_ad", "notes_fts_au"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("ALTER TABLE notes ADD COLUMN content_z BLOB")
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, content FROM notes WHERE id > ? AND length(CAST(content AS BLOB)) > ? ORDER BY id LIMIT 500",
+                (last_id, CONTENT_COMPRESS_BYTES),
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany(
+                "UPDATE notes SET content = ?, content_z = ? WHERE id = ?",
+                [pack_content(row[1]) + (row[0],) for row in rows],
+            )
+            last_id = rows[-1][0]
+        # content set without content_z: the compressed copy is stale
+        stale = "new.content_z IS NOT NULL AND new.content_z IS old.content_z AND new.content IS NOT old.content"
+        clear_stale = f"UPDATE notes SET content_z = NULL WHERE id = new.id AND {stale};"
+        if not fts:
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS notes_content_au AFTER UPDATE OF content ON notes
+                WHEN {stale} BEGIN
+                    {clear_stale}
+                END
+                """
+            )
+            return
+        # a pending row means the index is behind for that note and holds
+        # (title, inflated content_z) for it, or nothing when title is NULL
+        pending = "SELECT 1 FROM notes_fts_pending WHERE id = {}.id"
+        remove_old = f"""
+            INSERT INTO notes_fts(notes_fts, rowid, title, content)
+            SELECT 'delete', old.id, old.title, old.content
+            WHERE old.content_z IS NULL AND NOT EXISTS ({pending.format("old")});
+            INSERT INTO notes_fts_pending(id, title, content_z)
+            SELECT old.id, old.title, old.content_z
+            WHERE old.content_z IS NOT NULL AND NOT EXISTS ({pending.format("old")});
+        """
+        add_new = f"""
+            INSERT INTO notes_fts(rowid, title, content)
+            SELECT new.id, new.title, new.content
+            WHERE new.content_z IS NULL AND NOT EXISTS ({pending.format("new")});
+            INSERT OR IGNORE INTO notes_fts_pending(id) SELECT new.id WHERE new.content_z IS NOT NULL;
+        """
+        for statement in (
+            "CREATE TABLE IF NOT EXISTS notes_fts_pending (id INTEGER PRIMARY KEY, title TEXT, content_z BLOB)",
+            f"CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN {add_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN {remove_old} END",
+            # one trigger, so the old entry is queued before the stale copy is cleared
+            f"""
+            CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content, content_z ON notes BEGIN
+                {remove_old}
+                {add_new}
+                {clear_stale}
+            END
+            """,
+        ):
+            conn.execute(statement)
+
+    def enable_counters(self) -> None:
+        """Keep item totals in ``item_counts``, maintained by triggers.
+
+        ``notes``, ``tasks``, ``tasks_done`` and ``archived`` then cost one row read instead
+        of a count over an index, at the price of one extra row update per
+        insert, delete or completion. Counts are (re)filled from the tables,
+        so this is also the way to repair them.
+        """
+        with self.transaction() as conn:
+            for statement in _COUNTER_DDL:
+                conn.execute(statement)
+            conn.execute("DELETE FROM item_counts")
+            conn.execute(
+                "INSERT INTO item_counts(name, value) "
+                "SELECT 'notes', COUNT(*) FROM notes "
+                "UNION ALL SELECT 'tasks', COUNT(*) FROM tasks "
+                "UNION ALL SELECT 'tasks_done', COUNT(*) FROM tasks WHERE completed_at IS NOT NULL "
+                "UNION ALL SELECT 'archived', COUNT(*) FROM tasks_archive"
+            )
+
+    def disable_counters(self) -> None:
+        """Drop the counter table and its triggers."""
+        with self.transaction() as conn:
+            for trigger in _COUNTER_TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DROP TABLE IF EXISTS item_counts")
+
+    @staticmethod
+    def has_counters(conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='item_counts'").fetchone()
+        return row is not None
+
+    def enable_change_log(self) -> None:
+        """Log the id of every note insert, title/content update and delete.
+
+        Entries go to ``note_changes`` with an increasing ``seq``; readers
+        remember the last ``seq`` they applied and only re-read the notes
+        logged after it. The log is kept until ``prune_change_log`` drops it,
+        so every reader should prune what it has applied. Enabling again after
+        ``disable_change_log`` skips a ``seq`` value, so readers that followed
+        the old log see a gap and start over.
+        """
+        with self.transaction() as conn:
+            if self.has_change_log(conn):
+                return
+            for statement in _CHANGE_LOG_DDL:
+                conn.execute(statement)
+            conn.execute("INSERT INTO note_changes(note_id) VALUES (0), (0)")
+            conn.execute("DELETE FROM note_changes WHERE seq = (SELECT MIN(seq) FROM note_changes)")
+
+    def disable_change_log(self) -> None:
+        """Drop the change-log triggers and the entries logged so far."""
+        with self.transaction() as conn:
+            for trigger in _CHANGE_LOG_TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DELETE FROM note_changes")
+
+    @staticmethod
+    def prune_change_log(conn: sqlite3.Connection, seq: int) -> int:
+        """Delete change-log entries before ``seq``; return how many went.
+
+        The entry at ``seq`` stays, so a reader that stopped earlier still
+        sees that the log no longer reaches back to it.
+        """
+        return conn.execute("DELETE FROM note_changes WHERE seq < ?", (int(seq),)).rowcount
+
+    @staticmethod
+    def has_change_log(conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='notes_log_ai'").fetchone()
+        return row is not None
+
+    @staticmethod
+    def register_functions(conn: sqlite3.Connection) -> None:
+        """Register ``qc_inflate`` for queries built with ``note_content_sql``.
+
+        Connections opened by ``Database`` have it. The schema itself never
+        calls it, so other connections can read and write notes without it.
+        """
+        conn.create_function("qc_inflate", 1, inflate_content, deterministic=True)
+
+    @staticmethod
+    def has_fts(conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE name='notes_fts'").fetchone()
+        return row is not None
 
 
 def default_db_path() -> Path:
     home = Path.home()
     return home / ".quickcapture" / "quickcapture.db"
+
+
+def default_socket_path(db_path: Path) -> Path:
+    """Socket of the daemon serving ``db_path``: ``<db>.sock`` next to it."""
+    return db_path.with_name(db_path.name + ".sock")
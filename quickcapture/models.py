@@ -1,30 +1,107 @@
-from typing import Optional
+from typing import Callable, Optional, Union
 from datetime import datetime, timezone
 
+# rows read from the store pass their ISO timestamps through as text
+Timestamp = Union[datetime, str]
+# note text, its zlib-compressed UTF-8 bytes, or a loader called with the note id
+Content = Union[str, bytes, Callable[[int], Optional[str]], None]
+
+
+class _LazyDatetime:
+    """Datetime attribute kept as ISO text until it is first read."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = "_" + name
+
+    def __get__(self, obj: object, owner: Optional[type] = None) -> Optional[datetime]:
+        if obj is None:
+            return self  # type: ignore[return-value]
+        value = getattr(obj, self.slot)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: object, value: Optional[Timestamp]) -> None:
+        setattr(obj, self.slot, value)
+
+
+class _LazyContent:
+    """Note content kept compressed or unloaded until it is first read.
+
+    The slot may hold the text, the zlib-compressed bytes stored in
+    ``notes.content_z`` or a loader taking the note's id (shared by all
+    notes of a listing); either is replaced by the text on the first read.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = "_" + name
+
+    def __get__(self, obj: object, owner: Optional[type] = None) -> Optional[str]:
+        if obj is None:
+            return self  # type: ignore[return-value]
+        value = getattr(obj, self.slot)
+        if isinstance(value, bytes):
+            import zlib  # deferred: most commands never read compressed notes
+
+            value = zlib.decompress(value).decode("utf-8")
+            setattr(obj, self.slot, value)
+        elif callable(value):
+            value = value(obj.id)  # type: ignore[attr-defined]
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: object, value: Content) -> None:
+        setattr(obj, self.slot, value)
+
 
 class Note:
+    __slots__ = ("id", "title", "_content", "_created_at", "preview")
+
     id: Optional[int]
     title: str
-    content: Optional[str]
-    created_at: datetime
+    content = _LazyContent()
+    # start of the content when it was listed with a preview length and is longer
+    preview: Optional[str]
+    created_at = _LazyDatetime()
 
-    def __init__(self, title: str, content: Optional[str] = None, id: Optional[int] = None, created_at: Optional[datetime] = None):
+    def __init__(self, title: str, content: Content = None, id: Optional[int] = None, created_at: Optional[Timestamp] = None, preview: Optional[str] = None):
         self.id = id
         self.title = title
         self.content = content
-        self.created_at = created_at or datetime.now(timezone.utc)
+        self._created_at = created_at or datetime.now(timezone.utc)
+        self.preview = preview
 
 
 class Task:
+    __slots__ = ("id", "title", "_due_at", "_completed_at", "_created_at")
+
     id: Optional[int]
     title: str
-    due_at: Optional[datetime]
-    completed_at: Optional[datetime]
-    created_at: datetime
+    due_at = _LazyDatetime()
+    completed_at = _LazyDatetime()
+    created_at = _LazyDatetime()
+
+    def __init__(self, title: str, due_at: Optional[Timestamp] = None, id: Optional[int] = None, created_at: Optional[Timestamp] = None, completed_at: Optional[Timestamp] = None):
+        self.id = id
+        self.title = title
+        self._due_at = due_at
+        self._completed_at = completed_at
+        self._created_at = created_at or datetime.now(timezone.utc)
+
+
+class SearchHit:
+    __slots__ = ("kind", "id", "title", "snippet", "score")
+
+    kind: str
+    id: int
+    title: str
+    snippet: str
+    score: float
 
-    def __init__(self, title: str, due_at: Optional[datetime] = None, id: Optional[int] = None, created_at: Optional[datetime] = None, completed_at: Optional[datetime] = None):
+    def __init__(self, kind: str, id: int, title: str, snippet: str, score: float):
+        self.kind = kind
         self.id = id
         self.title = title
-        self.due_at = due_at
-        self.completed_at = completed_at
-        self.created_at = created_at or datetime.now(timezone.utc)
+        self.snippet = snippet
+        self.score = score
@@ -1,26 +1,62 @@
 from __future__ import annotations
 
-import json
+import heapq
+import io
+import re
+import sqlite3
 from datetime import datetime, timezone
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
-from .db import Database, default_db_path
-from .models import Note, Task
+from .db import Database, default_db_path, inflate_content, note_content_sql, pack_content, sync_note_index
+from .models import Note, SearchHit, Task
 
+_INSERT_NOTE = "INSERT INTO notes(title, content, content_z, created_at, created_us) VALUES (?, ?, ?, ?, ?)"
+_INSERT_TASK = (
+    "INSERT INTO tasks(title, due_at, completed_at, created_at, completed_us, created_us) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_NOTE = (
+    "INSERT INTO notes(id, title, content, content_z, created_at, created_us) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET title=excluded.title, content=excluded.content, content_z=excluded.content_z, "
+    "created_at=excluded.created_at, created_us=excluded.created_us"
+)
+_UPSERT_TASK = (
+    "INSERT INTO tasks(id, title, due_at, completed_at, created_at, completed_us, created_us) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET title=excluded.title, due_at=excluded.due_at, "
+    "completed_at=excluded.completed_at, created_at=excluded.created_at, "
+    "completed_us=excluded.completed_us, created_us=excluded.created_us"
+)
 
-def init_db(db_path: Optional[Path] = None) -> Database:
-    return Database(db_path or default_db_path())
+IMPORT_FORMATS = ("auto", "json", "ndjson", "csv")
+EXPORT_FORMATS = ("json", "ndjson")
+# rows fetched per round trip when streaming query results
+_FETCH_CHUNK = 500
+SEARCH_KINDS = ("all", "notes", "tasks")
+BULK_ACTIONS = ("complete", "reopen", "reschedule", "delete")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TASK_COLUMNS = "id, title, due_at, completed_at, created_at, created_us, completed_us"
+
+
+def init_db(db_path: Optional[Path] = None, *, persistent: bool = False) -> Database:
+    """Open the store; ``persistent=True`` reuses one WAL connection per thread."""
+    return Database(db_path or default_db_path(), persistent=persistent)
 
 
 def add_note(db: Database, title: str, content: Optional[str] = None) -> int:
     note = Note(title=title, content=content)
+    packed = pack_content(note.content)
     with db.connect() as conn:
         cur = conn.execute(
-            "INSERT INTO notes(title, content, created_at) VALUES (?, ?, ?)",
-            (note.title, note.content, note.created_at.isoformat()),
+            _INSERT_NOTE,
+            (note.title, *packed, note.created_at.isoformat(), _epoch_us(note.created_at)),
         )
         last_id = cur.lastrowid if cur.lastrowid is not None else 0
+        if packed[1] is not None:
+            sync_note_index(conn)
         return int(last_id)
 
 
@@ -28,92 +64,897 @@ def add_task(db: Database, title: str, due_at: Optional[datetime] = None) -> int
     task = Task(title=title, due_at=due_at)
     with db.connect() as conn:
         cur = conn.execute(
-            "INSERT INTO tasks(title, due_at, completed_at, created_at) VALUES (?, ?, ?, ?)",
+            _INSERT_TASK,
             (
                 task.title,
                 task.due_at.isoformat() if task.due_at else None,
                 None,
                 task.created_at.isoformat(),
+                None,
+                _epoch_us(task.created_at),
             ),
         )
         last_id = cur.lastrowid if cur.lastrowid is not None else 0
         return int(last_id)
 
 
-def list_notes(db: Database) -> List[Note]:
+def _epoch_us(value: Union[datetime, str, None]) -> Optional[int]:
+    """UTC epoch microseconds of a timestamp (naive values are taken as UTC).
+
+    Matches ``db.epoch_us_sql``, which fills the ``*_us`` columns in SQL.
+    """
+    if value is None or value == "":
+        return None
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _keyset(
+    query: str,
+    params: List[object],
+    before: Optional[Tuple[Union[datetime, str], int]],
+    limit: Optional[int],
+) -> str:
+    """Append the keyset condition, newest-first order and limit to a list query."""
+    query = _older_than(query, params, before)
+    query += " ORDER BY created_us DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(max(0, int(limit)))
+    return query
+
+
+def _older_than(query: str, params: List[object], before: Optional[Tuple[Union[datetime, str], int]]) -> str:
+    if before is not None:
+        query += " AND" if " WHERE " in query else " WHERE"
+        query += " (created_us, id) < (?, ?)"
+        params.extend([_epoch_us(before[0]), int(before[1])])
+    return query
+
+
+def _with_archive(hot: str, params: List[object], add_filter: Callable[[str, List[object]], str]) -> str:
+    """``hot`` (a query on ``tasks``) UNION ALL the same query on ``tasks_archive``.
+
+    ``add_filter`` appends each branch's conditions; with an ORDER BY on
+    ``created_us, id`` SQLite merges the two index scans instead of sorting.
+    """
+    branches = [add_filter(hot, params), add_filter(hot.replace(" FROM tasks", " FROM tasks_archive", 1), params)]
+    return " UNION ALL ".join(branches)
+
+
+def list_notes(
+    db: Database,
+    *,
+    limit: Optional[int] = None,
+    before: Optional[Tuple[Union[datetime, str], int]] = None,
+    preview: Optional[int] = None,
+) -> Iterator[Note]:
+    """Yield notes newest first, reading the cursor in chunks.
+
+    ``before`` is a keyset cursor ``(created_at, id)``: only notes strictly
+    older than that position are returned, which gives stable pages when
+    combined with ``limit``.
+
+    With ``preview`` at most that many characters of each note are read, in
+    SQL, without touching compressed content; ``Note.preview`` holds them
+    when the note is longer, and ``Note.content`` is then fetched with
+    ``note_content`` on first access. Otherwise compressed content is
+    inflated on first access.
+    """
+    params: List[object] = []
+    if preview is None:
+        columns = "id, title, content, created_at, content_z"
+    else:
+        # one character more than shown tells whether plain content goes on
+        preview = max(0, int(preview))
+        columns = "id, title, substr(content, 1, ?), created_at, content_z IS NOT NULL"
+        params.append(preview + 1)
+    query = _keyset(f"SELECT {columns} FROM notes", params, before, limit)
+    loader = partial(note_content, db)
     with db.connect() as conn:
-        rows = conn.execute("SELECT * FROM notes ORDER BY created_at DESC").fetchall()
-        return [
-            Note(
-                id=row["id"],
-                title=row["title"],
-                content=row["content"],
-                created_at=datetime.fromisoformat(row["created_at"]),
-            )
-            for row in rows
-        ]
+        cur = conn.execute(query, params)
+        cur.row_factory = None  # plain tuples; rows are read by position
+        while True:
+            rows = cur.fetchmany(_FETCH_CHUNK)
+            if not rows:
+                break
+            for row in rows:
+                # timestamps stay ISO text until the caller reads them
+                if preview is None:
+                    yield Note(row[1], row[2] if row[4] is None else row[4], row[0], row[3])
+                elif row[4] or (row[2] is not None and len(row[2]) > preview):
+                    yield Note(row[1], loader, row[0], row[3], row[2][:preview])
+                else:
+                    yield Note(row[1], row[2], row[0], row[3])
 
 
-def list_tasks(db: Database, completed: Optional[bool] = None) -> List[Task]:
-    query = "SELECT * FROM tasks"
-    params: Tuple[object, ...] = ()
+def note_content(db: Database, note_id: int) -> Optional[str]:
+    """Full content of a note, inflated in SQL (``None`` for unknown notes)."""
+    with db.connect() as conn:
+        row = conn.execute(f"SELECT {note_content_sql()} FROM notes WHERE id = ?", (int(note_id),)).fetchone()
+    return None if row is None else row[0]
+
+
+def list_tasks(
+    db: Database,
+    completed: Optional[bool] = None,
+    *,
+    limit: Optional[int] = None,
+    before: Optional[Tuple[Union[datetime, str], int]] = None,
+    include_archived: bool = False,
+) -> Iterator[Task]:
+    """Yield tasks newest first; see ``list_notes`` for ``limit``/``before``.
+
+    Only tasks in the hot table are listed unless ``include_archived``.
+    """
+    query = "SELECT id, title, due_at, completed_at, created_at, created_us FROM tasks"
+    params: List[object] = []
     if completed is True:
         query += " WHERE completed_at IS NOT NULL"
     elif completed is False:
         query += " WHERE completed_at IS NULL"
-    query += " ORDER BY created_at DESC"
+    if include_archived and completed is not False:
+        query = _with_archive(query, params, lambda q, p: _older_than(q, p, before))
+        before = None
+    query = _keyset(query, params, before, limit)
 
     with db.connect() as conn:
-        rows = conn.execute(query, params).fetchall()
-        return [
-            Task(
-                id=row["id"],
-                title=row["title"],
-                due_at=datetime.fromisoformat(row["due_at"]) if row["due_at"] else None,
-                completed_at=(
-                    datetime.fromisoformat(row["completed_at"]) if row["completed_at"] else None
-                ),
-                created_at=datetime.fromisoformat(row["created_at"]),
-            )
-            for row in rows
-        ]
+        cur = conn.execute(query, params)
+        cur.row_factory = None  # plain tuples; rows are read by position
+        while True:
+            rows = cur.fetchmany(_FETCH_CHUNK)
+            if not rows:
+                break
+            for row in rows:
+                yield Task(row[1], row[2] or None, row[0], row[4], row[3] or None)
 
 
 def complete_task(db: Database, task_id: int) -> bool:
     with db.connect() as conn:
-        now = datetime.now(timezone.utc).isoformat()
+        now = datetime.now(timezone.utc)
         cur = conn.execute(
-            "UPDATE tasks SET completed_at=? WHERE id=? AND completed_at IS NULL",
-            (now, task_id),
+            "UPDATE tasks SET completed_at=?, completed_us=? WHERE id=? AND completed_at IS NULL",
+            (now.isoformat(), _epoch_us(now), task_id),
         )
         return cur.rowcount > 0
 
 
-def export_all(db: Database) -> Dict[str, object]:
-    notes = list_notes(db)
-    tasks = list_tasks(db)
-    return {
-        "notes": [
-            {
-                "id": n.id,
-                "title": n.title,
-                "content": n.content,
-                "created_at": n.created_at.isoformat(),
-            }
-            for n in notes
-        ],
-        "tasks": [
-            {
-                "id": t.id,
-                "title": t.title,
-                "due_at": t.due_at.isoformat() if t.due_at else None,
-                "completed_at": t.completed_at.isoformat() if t.completed_at else None,
-                "created_at": t.created_at.isoformat(),
-            }
-            for t in tasks
-        ],
-    }
-
-
-def export_all_json(db: Database, indent: int = 2) -> str:
-    return json.dumps(export_all(db), indent=indent)
+def _like_pattern(text: str) -> str:
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def bulk_tasks(
+    db: Database,
+    action: str,
+    *,
+    ids: Optional[Iterable[int]] = None,
+    due_at: Optional[datetime] = None,
+    completed: Optional[bool] = None,
+    overdue: bool = False,
+    due_before: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    title: Optional[str] = None,
+) -> int:
+    """Apply ``action`` to every selected task in one statement; return the rows changed.
+
+    ``action`` is one of ``BULK_ACTIONS``: ``complete`` and ``reopen`` skip
+    tasks already in that state, ``reschedule`` sets ``due_at`` (``None``
+    clears it) and ``delete`` removes the rows. Tasks are selected by
+    ``ids`` and/or filters, all of which must match: ``completed``,
+    ``overdue`` (open and due before now, or before ``due_before``),
+    ``due_before``, ``created_before`` (naive values are taken as UTC) and
+    ``title`` (case-insensitive substring). Ids are loaded into a temporary
+    table, so any number of them costs one ``executemany`` and a join. At
+    least one id or filter is required; everything runs in one transaction.
+    Archived tasks are not touched.
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Unknown bulk action: {action}")
+    id_list = None if ids is None else [int(i) for i in ids]
+    where: List[str] = []
+    params: List[object] = []
+    if id_list is not None:
+        if not id_list:
+            return 0
+        where.append("id IN (SELECT id FROM temp.qc_bulk_ids)")
+    if completed is True:
+        where.append("completed_at IS NOT NULL")
+    elif completed is False:
+        where.append("completed_at IS NULL")
+    if overdue:
+        where.append("completed_at IS NULL")
+        if due_before is None:
+            due_before = datetime.now()
+    if due_before is not None:
+        # due dates are stored as given (ISO text), so compare them as text
+        where.append("due_at IS NOT NULL AND due_at < ?")
+        params.append(due_before.isoformat())
+    if created_before is not None:
+        where.append("created_us < ?")
+        params.append(_epoch_us(created_before))
+    if title:
+        where.append("title LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(title))
+    if not where:
+        raise ValueError("Select tasks by id or with at least one filter")
+
+    now = datetime.now(timezone.utc)
+    if action == "complete":
+        sql = "UPDATE tasks SET completed_at=?, completed_us=?"
+        params[:0] = [now.isoformat(), _epoch_us(now)]
+        where.insert(0, "completed_at IS NULL")
+    elif action == "reopen":
+        sql = "UPDATE tasks SET completed_at=NULL, completed_us=NULL"
+        where.insert(0, "completed_at IS NOT NULL")
+    elif action == "reschedule":
+        due = due_at.isoformat() if due_at else None
+        sql = "UPDATE tasks SET due_at=?"
+        params[:0] = [due, due]
+        where.insert(0, "due_at IS NOT ?")
+    else:
+        sql = "DELETE FROM tasks"
+    sql += " WHERE " + " AND ".join(f"({cond})" for cond in where)
+
+    with db.transaction() as conn:
+        if id_list is not None:
+            _stage_ids(conn, id_list)
+        changed = conn.execute(sql, params).rowcount
+        if id_list is not None:
+            conn.execute("DELETE FROM temp.qc_bulk_ids")
+    return changed
+
+
+def _stage_ids(conn: sqlite3.Connection, ids: Iterable[int]) -> None:
+    """Replace the contents of the connection's ``temp.qc_bulk_ids`` table with ``ids``."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS qc_bulk_ids(id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.qc_bulk_ids")
+    conn.executemany("INSERT OR IGNORE INTO temp.qc_bulk_ids(id) VALUES (?)", ((i,) for i in ids))
+
+
+def archive_tasks(db: Database, before: datetime, *, batch_size: int = 1000) -> int:
+    """Move tasks completed before ``before`` to ``tasks_archive``; return how many moved.
+
+    Tasks are taken oldest completion first from the completion index,
+    ``batch_size`` at a time: each batch is staged in a temporary table, copied
+    and deleted with one statement each. All batches share one transaction.
+    Archived tasks keep their ids and are left out of listings, search,
+    export and bulk operations unless those ask for them.
+    """
+    batch_size = max(1, int(batch_size))
+    cutoff = _epoch_us(before)
+    moved = 0
+    with db.transaction() as conn:
+        while True:
+            ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM tasks WHERE completed_us < ? ORDER BY completed_us LIMIT ?",
+                    (cutoff, batch_size),
+                )
+            ]
+            if not ids:
+                break
+            _stage_ids(conn, ids)
+            conn.execute(
+                f"INSERT INTO tasks_archive({_TASK_COLUMNS}) "
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE id IN (SELECT id FROM temp.qc_bulk_ids)"
+            )
+            conn.execute("DELETE FROM tasks WHERE id IN (SELECT id FROM temp.qc_bulk_ids)")
+            moved += len(ids)
+        if moved:
+            conn.execute("DELETE FROM temp.qc_bulk_ids")
+    return moved
+
+
+def stats(db: Database, *, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Count notes and open, done and overdue tasks without reading any rows.
+
+    Totals come from the ``item_counts`` table when counters are enabled
+    (``Database.enable_counters``), otherwise from ``COUNT`` aggregates that
+    SQLite answers from the indexes. ``overdue`` counts open tasks due before
+    ``now`` (default: the current local time, as due dates are stored as
+    given) from the open-tasks due-date index. ``tasks`` and its breakdown
+    cover the hot table; ``archived`` counts tasks moved by ``archive_tasks``.
+    """
+    now = now or datetime.now()
+    with db.transaction() as conn:
+        if Database.has_counters(conn):
+            counts = dict(conn.execute("SELECT name, value FROM item_counts").fetchall())
+            notes, tasks, done = counts["notes"], counts["tasks"], counts["tasks_done"]
+            archived = counts.get("archived")
+        else:
+            notes = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+            tasks = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            # completed_us mirrors completed_at and has a covering partial index
+            done = conn.execute("SELECT COUNT(*) FROM tasks WHERE completed_us IS NOT NULL").fetchone()[0]
+            archived = None
+        if archived is None:
+            # counters enabled before the archive existed lack this row
+            archived = conn.execute("SELECT COUNT(*) FROM tasks_archive").fetchone()[0]
+        overdue = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE due_at IS NOT NULL AND due_at < ? AND completed_at IS NULL",
+            (now.isoformat(),),
+        ).fetchone()[0]
+    return {"notes": notes, "tasks": tasks, "open": tasks - done, "done": done, "overdue": overdue, "archived": archived}
+
+
+def daily_counts(db: Database, days: int = 30, *, now: Optional[datetime] = None) -> List[Dict[str, object]]:
+    """Per-day histogram of notes created, tasks created and tasks completed.
+
+    Covers the last ``days`` UTC days up to ``now`` (oldest first, days
+    without activity included as zeros). Days are generated and rows grouped
+    in SQL, each branch reading only its ``*_us`` index range; archived tasks
+    are counted too, so ``archive_tasks`` leaves the history unchanged.
+    """
+    if days <= 0:
+        return []
+    end = _epoch_us(now or datetime.now(timezone.utc)) // 1_000_000
+    start = end - (days - 1) * 86400
+    start_us = (start - start % 86400) * 1_000_000
+    rows = []
+    with db.connect() as conn:
+        cur = conn.execute(
+            """
+            WITH RECURSIVE day(d) AS (
+                SELECT date(:start, 'unixepoch')
+                UNION ALL SELECT date(d, '+1 day') FROM day WHERE d < date(:end, 'unixepoch')
+            ),
+            events(d, kind) AS (
+                SELECT date(created_us / 1000000, 'unixepoch'), 0 FROM notes WHERE created_us >= :start_us
+                UNION ALL
+                SELECT date(created_us / 1000000, 'unixepoch'), 1 FROM tasks WHERE created_us >= :start_us
+                UNION ALL
+                SELECT date(completed_us / 1000000, 'unixepoch'), 2 FROM tasks WHERE completed_us >= :start_us
+                UNION ALL
+                SELECT date(created_us / 1000000, 'unixepoch'), 1 FROM tasks_archive WHERE created_us >= :start_us
+                UNION ALL
+                SELECT date(completed_us / 1000000, 'unixepoch'), 2 FROM tasks_archive WHERE completed_us >= :start_us
+            ),
+            per_day(d, notes, created, completed) AS (
+                SELECT d, SUM(kind = 0), SUM(kind = 1), SUM(kind = 2) FROM events GROUP BY d
+            )
+            SELECT day.d, COALESCE(notes, 0), COALESCE(created, 0), COALESCE(completed, 0)
+            FROM day LEFT JOIN per_day USING (d) ORDER BY day.d
+            """,
+            {"start": start, "end": end, "start_us": start_us},
+        )
+        cur.row_factory = None
+        for d, notes, created, completed in cur:
+            rows.append({"day": d, "notes": notes, "tasks_created": created, "tasks_completed": completed})
+    return rows
+
+
+def _export_chunks(
+    conn: sqlite3.Connection, table: str, since: Optional[int], include_archived: bool = False
+) -> Iterator[List[Dict[str, object]]]:
+    """Yield export records of ``table`` newest first, one fetch chunk at a time."""
+    if table == "notes":
+        query = f"SELECT id, title, {note_content_sql()}, created_at FROM notes"
+        params: Tuple[object, ...] = ()
+        if since is not None:
+            query += " WHERE created_us > ?"
+            params = (since,)
+    else:
+        query = "SELECT id, title, due_at, completed_at, created_at, created_us FROM tasks"
+
+        def since_filter(q: str, p: List[object]) -> str:
+            if since is None:
+                return q
+            p.extend([since, since])
+            return q + " WHERE (created_us > ? OR completed_us > ?)"
+
+        task_params: List[object] = []
+        if include_archived:
+            query = _with_archive(query, task_params, since_filter)
+        else:
+            query = since_filter(query, task_params)
+        params = tuple(task_params)
+    query += " ORDER BY created_us DESC, id DESC"
+
+    cur = conn.execute(query, params)
+    cur.row_factory = None
+    while True:
+        rows = cur.fetchmany(_FETCH_CHUNK)
+        if not rows:
+            break
+        if table == "notes":
+            yield [
+                {"id": row[0], "title": row[1], "content": row[2], "created_at": row[3]}
+                for row in rows
+            ]
+        else:
+            yield [
+                {
+                    "id": row[0],
+                    "title": row[1],
+                    "due_at": row[2] or None,
+                    "completed_at": row[3] or None,
+                    "created_at": row[4],
+                }
+                for row in rows
+            ]
+
+
+def export_all(
+    db: Database, *, since: Optional[datetime] = None, include_archived: bool = False
+) -> Dict[str, object]:
+    """Return every note and task as plain dicts; see ``export_stream`` for the options."""
+    cutoff = _epoch_us(since)
+    with db.transaction() as conn:
+        return {
+            table: [record for chunk in _export_chunks(conn, table, cutoff, include_archived) for record in chunk]
+            for table in ("notes", "tasks")
+        }
+
+
+def export_stream(
+    db: Database,
+    out: TextIO,
+    fmt: str = "json",
+    *,
+    since: Optional[datetime] = None,
+    indent: Optional[int] = 2,
+    include_archived: bool = False,
+) -> Dict[str, int]:
+    """Write notes and tasks to ``out`` straight from the cursor.
+
+    ``json`` produces the same document as ``export_all_json``; ``ndjson``
+    writes one record per line with a ``type`` field, as ``import_items``
+    reads it. With ``since`` only notes created after it and tasks created or
+    completed after it are written (naive datetimes are taken as UTC).
+    Archived tasks are written only with ``include_archived``. All tables
+    are read in one transaction so the export is a consistent snapshot.
+    Returns the number of notes and tasks written.
+    """
+    import json  # deferred: only export and import need it, keep CLI startup lean
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    cutoff = _epoch_us(since)
+    counts = {"notes": 0, "tasks": 0}
+    # mirror json.dumps(..., indent=indent) one record at a time
+    sep = "," if indent is not None else ", "
+    outer = "\n" + " " * indent if indent is not None else ""
+    encode = json.JSONEncoder(indent=indent if fmt == "json" else None).encode
+
+    with db.transaction() as conn:
+        if fmt == "json":
+            out.write("{")
+        for i, table in enumerate(("notes", "tasks")):
+            kind = table[:-1]
+            if fmt == "json":
+                out.write(f"{sep if i else ''}{outer}{json.dumps(table)}: [")
+            for chunk in _export_chunks(conn, table, cutoff, include_archived):
+                if fmt == "json":
+                    # encode the chunk as a list, then drop its brackets and shift it one level in
+                    text = encode(chunk)
+                    body = text[1:-2] if indent is not None else text[1:-1]
+                    out.write((sep if counts[table] else "") + body.replace("\n", outer))
+                    counts[table] += len(chunk)
+                else:
+                    out.write("".join(encode({"type": kind, **record}) + "\n" for record in chunk))
+                    counts[table] += len(chunk)
+            if fmt == "json":
+                out.write(f"{outer}]" if counts[table] else "]")
+        if fmt == "json":
+            out.write(outer[:1] + "}")
+    return counts
+
+
+def export_all_json(
+    db: Database, indent: int = 2, *, since: Optional[datetime] = None, include_archived: bool = False
+) -> str:
+    buf = io.StringIO()
+    export_stream(db, buf, "json", since=since, indent=indent, include_archived=include_archived)
+    return buf.getvalue()
+
+
+# characters read at a time when parsing a JSON document incrementally
+_JSON_CHUNK = 1 << 16
+# longest first line examined when detecting the input format
+_SNIFF_CHARS = 1 << 16
+_JSON_SPACE = re.compile(r"[ \t\r\n]*").match
+
+
+class _JSONStream:
+    """Reads JSON values one at a time from text chunks.
+
+    ``raw_decode`` runs over a buffer that holds the unread rest of the
+    current chunk plus as many further chunks as the next value needs, so
+    memory is bounded by the largest single value, not the document.
+    """
+
+    def __init__(self, chunks: Iterable[str], chunk_chars: int = _JSON_CHUNK) -> None:
+        import json
+
+        self._chunks = iter(chunks)
+        self._chunk_chars = max(1, int(chunk_chars))
+        self._decode = json.JSONDecoder().raw_decode
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append at least one chunk to the buffer, dropping what was consumed."""
+        if self._eof:
+            return False
+        want = max(self._chunk_chars, len(self._buf) - self._pos)
+        parts: List[str] = []
+        size = 0
+        for chunk in self._chunks:
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= want:
+                break
+        else:
+            self._eof = True
+        if not parts:
+            return False
+        self._buf = self._buf[self._pos :] + "".join(parts)
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next character that is not whitespace, or ``""`` at the end."""
+        while True:
+            buf = self._buf
+            pos = self._pos = _JSON_SPACE(buf, self._pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume and return the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if not char or char not in chars:
+            wanted = " or ".join(repr(c) for c in chars)
+            raise ValueError(f"Invalid JSON document: expected {wanted}, found {char or 'end of input'!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> object:
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decode(self._buf, self._pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            if end == len(self._buf) and self._fill():
+                continue  # a number or literal may go on in the next chunk
+            self._pos = end
+            return obj
+
+    def items(self) -> Iterator[object]:
+        """Yield the elements of the array whose ``[`` was just consumed."""
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        decode = self._decode
+        while True:
+            buf = self._buf
+            pos = _JSON_SPACE(buf, self._pos).end()
+            try:
+                obj, end = decode(buf, pos)
+            except ValueError:
+                obj, end = None, len(buf)
+            end = _JSON_SPACE(buf, end).end()
+            if end < len(buf) and buf[end] in ",]":
+                # fast path: the value and its separator are both buffered
+                self._pos = end + 1
+                yield obj
+                if buf[end] == "]":
+                    return
+                continue
+            self._pos = pos
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _iter_json_document(chunks: Iterable[str], chunk_chars: int = _JSON_CHUNK) -> Iterator[Dict[str, object]]:
+    """Yield the records of an ``export`` document or a JSON array, one at a time.
+
+    Records under the ``notes``/``tasks`` keys get their ``type`` filled in;
+    other keys are skipped.
+    """
+    stream = _JSONStream(chunks, chunk_chars)
+    if stream.expect("[{") == "[":
+        for rec in stream.items():
+            if not isinstance(rec, dict):
+                raise ValueError("Invalid JSON document: records must be objects")
+            yield rec
+    elif stream.peek() == "}":
+        stream.expect("}")
+    else:
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            kind = {"notes": "note", "tasks": "task"}.get(key) if isinstance(key, str) else None
+            if kind is not None and stream.peek() == "[":
+                stream.expect("[")
+                for rec in stream.items():
+                    if not isinstance(rec, dict):
+                        raise ValueError(f"Invalid JSON document: {key} entries must be objects")
+                    yield {"type": kind, **rec}
+            else:
+                stream.value()
+            if stream.expect(",}") == "}":
+                break
+    if stream.peek():
+        raise ValueError("Invalid JSON document: extra data after the end")
+
+
+def _first_key(text: str) -> Optional[str]:
+    """First key of the JSON object that ``text`` starts, if it is complete in ``text``."""
+    import json
+
+    rest = text.lstrip()[1:].lstrip()
+    try:
+        key, _ = json.JSONDecoder().raw_decode(rest)
+    except ValueError:
+        return None
+    return key if isinstance(key, str) else None
+
+
+def _read_records(fp: TextIO, fmt: str = "auto") -> Iterator[Dict[str, object]]:
+    """Yield raw records from JSON, NDJSON or CSV text.
+
+    NDJSON and CSV are read one line at a time. A JSON document (the output of
+    ``export``, or an array of records) is parsed incrementally, one record
+    at a time; records found under its ``notes``/``tasks`` keys get their
+    ``type`` filled in.
+    """
+    import csv
+    import json
+
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    lines: Iterable[str] = fp
+    first = ""
+    if fmt == "auto":
+        # bounded reads: a compact export is a single line
+        first = fp.readline(_SNIFF_CHARS)
+        while first and not first.strip():
+            first = fp.readline(_SNIFF_CHARS)
+        head = first.lstrip()
+        if head.startswith("["):
+            fmt = "json"
+        elif head.startswith("{"):
+            try:
+                obj = json.loads(first)
+            except ValueError:
+                obj = None
+            if obj is not None:
+                is_document = not isinstance(obj, dict) or "notes" in obj or "tasks" in obj
+            elif first.endswith("\n"):
+                is_document = True  # an indented document opens with a line of its own
+            else:
+                # a line longer than the sniff limit: compact document or a large record
+                is_document = _first_key(first) in ("notes", "tasks")
+            fmt = "json" if is_document else "ndjson"
+        else:
+            fmt = "csv"
+        if fmt != "json" and first and not first.endswith("\n"):
+            first += fp.readline()
+        lines = chain([first], fp)
+
+    if fmt == "ndjson":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "csv":
+        for row in csv.DictReader(lines):
+            yield {k: (v if v != "" else None) for k, v in row.items() if k}
+    else:
+        blocks = iter(partial(fp.read, _JSON_CHUNK), "")
+        yield from _iter_json_document(chain([first], blocks))
+
+
+def _record_kind(rec: Dict[str, object], n: int) -> str:
+    kind = rec.get("type")
+    if kind in ("note", "task"):
+        return str(kind)
+    if kind is None:
+        if "content" in rec:
+            return "note"
+        if "due_at" in rec or "completed_at" in rec:
+            return "task"
+    raise ValueError(f"Record {n}: cannot tell a note from a task; add a 'type' field ('note' or 'task')")
+
+
+def _utc_iso(value: object) -> Optional[str]:
+    """Normalize a timestamp to an aware UTC ISO string (naive values are taken as UTC)."""
+    if value is None or value == "":
+        return None
+    dt = datetime.fromisoformat(str(value))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _plain_iso(value: object) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    return datetime.fromisoformat(str(value)).isoformat()
+
+
+def _opt_int(value: object) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)  # type: ignore[call-overload]
+
+
+def import_items(
+    db: Database,
+    fp: TextIO,
+    fmt: str = "auto",
+    *,
+    batch_size: int = 5000,
+    upsert: bool = False,
+) -> Dict[str, int]:
+    """Bulk-load notes and tasks from ``fp`` in a single transaction.
+
+    ``fmt`` is one of ``json``, ``ndjson``, ``csv`` or ``auto`` (detected from
+    the first line); the output of ``export`` is accepted as is. Records are
+    inserted with ``executemany`` in batches of ``batch_size``. Without
+    ``upsert`` incoming ids are ignored and new ids assigned; with it, records
+    keep their ids and replace existing rows with the same id.
+
+    Returns the number of notes and tasks written.
+    """
+    batch_size = max(1, int(batch_size))
+    now = datetime.now(timezone.utc).isoformat()
+    counts = {"notes": 0, "tasks": 0}
+    notes: List[Tuple[object, ...]] = []
+    tasks: List[Tuple[object, ...]] = []
+    note_sql = _UPSERT_NOTE if upsert else _INSERT_NOTE
+    task_sql = _UPSERT_TASK if upsert else _INSERT_TASK
+
+    with db.transaction() as conn:
+
+        def flush() -> None:
+            if notes:
+                conn.executemany(note_sql, notes)
+                counts["notes"] += len(notes)
+                notes.clear()
+            if tasks:
+                conn.executemany(task_sql, tasks)
+                counts["tasks"] += len(tasks)
+                tasks.clear()
+
+        for n, rec in enumerate(_read_records(fp, fmt), 1):
+            kind = _record_kind(rec, n)
+            title = rec.get("title")
+            if not title:
+                raise ValueError(f"Record {n}: missing title")
+            created = _utc_iso(rec.get("created_at")) or now
+            if kind == "note":
+                content = rec.get("content")
+                text = None if content is None else str(content)
+                row: Tuple[object, ...] = (str(title), *pack_content(text), created, _epoch_us(created))
+                notes.append((_opt_int(rec.get("id")),) + row if upsert else row)
+            else:
+                completed = _utc_iso(rec.get("completed_at"))
+                row = (
+                    str(title),
+                    _plain_iso(rec.get("due_at")),
+                    completed,
+                    created,
+                    _epoch_us(completed),
+                    _epoch_us(created),
+                )
+                tasks.append((_opt_int(rec.get("id")),) + row if upsert else row)
+            if len(notes) + len(tasks) >= batch_size:
+                flush()
+        flush()
+        sync_note_index(conn)
+    return counts
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word quoted, all required.
+
+    A trailing ``*`` on a word is kept as a prefix match.
+    """
+    parts: List[str] = []
+    for word in text.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*") if prefix else word
+        parts.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _snippet(text: str, query: str, highlight: Tuple[str, str], size: int = 12) -> Optional[str]:
+    """``snippet()`` for text the index does not store: ``size`` words around
+    the most query terms, or None when no word of ``text`` matches.
+    """
+    terms: List[Tuple[str, bool]] = []
+    for word in query.split():
+        tokens = _WORD_RE.findall(word.lower())
+        terms.extend((tok, word.endswith("*") and i == len(tokens) - 1) for i, tok in enumerate(tokens))
+    words = list(_WORD_RE.finditer(text))
+    hits: List[Optional[int]] = []
+    for w in words:
+        tok = w.group().lower()
+        matches = (i for i, (term, prefix) in enumerate(terms) if tok == term or prefix and tok.startswith(term))
+        hits.append(next(matches, None))
+    if not any(hit is not None for hit in hits):
+        return None
+    first = max(range(max(1, len(words) - size + 1)), key=lambda i: len(set(hits[i : i + size]) - {None}))
+    matched = [i for i in range(first, min(len(words), first + size)) if hits[i] is not None]
+    first = max(0, min(len(words) - size, matched[0] - (size - (matched[-1] - matched[0] + 1)) // 2))
+    last = min(len(words), first + size) - 1
+    start, end = highlight
+    out = ["…" if first else ""]
+    pos = words[first].start()
+    for i in range(first, last + 1):
+        w = words[i]
+        out.append(text[pos : w.start()])
+        out.append(start + w.group() + end if hits[i] is not None else w.group())
+        pos = w.end()
+    out.append("…" if last < len(words) - 1 else text[pos:])
+    return "".join(out)
+
+
+def search(
+    db: Database,
+    query: str,
+    *,
+    limit: int = 20,
+    kind: str = "all",
+    highlight: Tuple[str, str] = ("[", "]"),
+    include_archived: bool = False,
+) -> List[SearchHit]:
+    """Full-text search over note titles/content and task titles.
+
+    Results are ranked by bm25 (best first; lower scores are better) and carry
+    a snippet with matches wrapped in ``highlight``. ``kind`` restricts the
+    search to ``notes`` or ``tasks``; archived tasks are only searched with
+    ``include_archived``.
+    """
+    if kind not in SEARCH_KINDS:
+        raise ValueError(f"Unknown search kind: {kind}")
+    match = _fts_query(query)
+    if not match or limit <= 0:
+        return []
+    start, end = highlight
+    per_kind: List[List[SearchHit]] = []
+    with db.connect() as conn:
+        if not Database.has_fts(conn):
+            raise RuntimeError("Full-text search needs an SQLite build with FTS5")
+        if conn.execute("SELECT 1 FROM notes_fts_pending LIMIT 1").fetchone():
+            # notes written by other connections wait here to be indexed
+            sync_note_index(conn)
+        sources = [("note", "notes_fts", "notes"), ("task", "tasks_fts", "tasks")]
+        if include_archived:
+            sources.append(("task", "tasks_archive_fts", "tasks"))
+        for label, table, plural in sources:
+            if kind not in ("all", plural):
+                continue
+            # notes_fts reads snippets from notes, where compressed notes keep only a preview
+            packed = "(SELECT content_z FROM notes WHERE id = notes_fts.rowid)" if table == "notes_fts" else "NULL"
+            rows = conn.execute(
+                f"SELECT rowid, title, snippet({table}, -1, ?, ?, '…', 12) AS snip, rank, {packed} AS z "
+                f"FROM {table} WHERE {table} MATCH ? ORDER BY rank LIMIT ?",
+                (start, end, match, limit),
+            ).fetchall()
+            hits = []
+            for row in rows:
+                snip = row["snip"]
+                if row["z"] is not None:
+                    text = inflate_content(row["z"])
+                    snip = _snippet(text, query, highlight) or _snippet(row["title"], query, highlight) or snip
+                hits.append(SearchHit(label, row["rowid"], row["title"], snip, row["rank"]))
+            per_kind.append(hits)
+    merged = heapq.merge(*per_kind, key=lambda h: h.score)
+    return [hit for _, hit in zip(range(limit), merged)]
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+
+from .db import Database
+from . import services
+
+logger = logging.getLogger(__name__)
+
+
+class _Op:
+    __slots__ = ("fn", "args", "future")
+
+    def __init__(self, fn: Optional[Callable[..., Any]], args: tuple, future: Future) -> None:
+        self.fn = fn  # None marks a flush/close barrier
+        self.args = args
+        self.future = future
+
+
+_STOP = object()
+
+
+class CaptureWriter:
+    """Background writer that coalesces captures into batched transactions.
+
+    ``add_note``/``add_task`` only enqueue the write and return a ``Future``
+    that resolves to the new id once the batch holding it has committed. One
+    thread owns a single connection and drains the bounded queue: it commits
+    whatever is pending, up to ``max_batch`` operations, waiting at most
+    ``max_delay`` seconds after the first one for more to arrive. A failing
+    operation is rolled back to its own savepoint, so only its future gets
+    the exception. When the queue is full, callers block until there is room
+    (backpressure).
+
+    If the thread itself fails (the store cannot be opened, say), every
+    queued write gets the exception and later calls raise ``RuntimeError``.
+
+    Writes are durable once their future is done; ``flush()`` waits for
+    everything submitted so far and ``close()`` additionally stops the thread.
+    Use it as a context manager to close on exit.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        max_queue: int = 10000,
+        max_batch: int = 500,
+        max_delay: float = 0.0,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.db = db
+        self.max_batch = int(max_batch)
+        self.max_delay = float(max_delay)
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(0, int(max_queue)))
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="quickcapture-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue ``fn(db, *args)`` to run in the writer's transaction."""
+        future: Future = Future()
+        with self._close_lock:
+            self._check_alive()
+            if self._closed:
+                raise RuntimeError("CaptureWriter is closed")
+            # under the lock, so nothing lands behind the stop marker
+            self._queue.put(_Op(fn, args, future))
+        return future
+
+    def add_note(self, title: str, content: Optional[str] = None) -> Future:
+        return self.submit(services.add_note, title, content)
+
+    def add_task(self, title: str, due_at: Optional[datetime] = None) -> Future:
+        return self.submit(services.add_task, title, due_at)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every write submitted before this call has committed."""
+        future: Future = Future()
+        with self._close_lock:
+            self._check_alive()
+            if self._closed:
+                # close() already drains the queue
+                self._thread.join(timeout)
+                return
+            self._queue.put(_Op(None, (), future))
+        future.result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Commit pending writes, then stop the writer thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _check_alive(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"CaptureWriter stopped: {self._error}") from self._error
+
+    def _next_batch(self) -> List[object]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        batch: List[object] = []
+        try:
+            with self.db.session():
+                while True:
+                    batch = self._next_batch()
+                    ops = [item for item in batch if isinstance(item, _Op)]
+                    self._commit(ops)
+                    if batch[-1] is _STOP:
+                        return
+        except BaseException as exc:  # noqa: BLE001
+            logger.exception("Capture writer stopped")
+            self._error = exc
+            self._fail(batch, exc)
+            # drain first: a submit() blocked on a full queue holds the lock
+            self._fail(self._drain(), exc)
+            with self._close_lock:
+                self._fail(self._drain(), exc)
+
+    def _drain(self) -> List[object]:
+        items: List[object] = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    @staticmethod
+    def _fail(items: List[object], exc: BaseException) -> None:
+        for item in items:
+            if isinstance(item, _Op) and not item.future.done():
+                item.future.set_exception(exc)
+
+    def _commit(self, ops: List[_Op]) -> None:
+        results: List[Any] = []
+        try:
+            with self.db.transaction() as conn:
+                for op in ops:
+                    if op.fn is None or not op.future.set_running_or_notify_cancel():
+                        results.append(None)
+                        continue
+                    conn.execute("SAVEPOINT capture_op")
+                    try:
+                        results.append(op.fn(self.db, *op.args))
+                    except Exception as exc:  # noqa: BLE001
+                        conn.execute("ROLLBACK TO capture_op")
+                        results.append(None)
+                        op.future.set_exception(exc)
+                    finally:
+                        conn.execute("RELEASE capture_op")
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Capture batch of %d writes failed", len(ops))
+            for op in ops:
+                if not op.future.done():
+                    op.future.set_exception(exc)
+            return
+        for op, result in zip(ops, results):
+            if not op.future.done():
+                op.future.set_result(result)
@@ -0,0 +1,35 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from alpha_evolve.bench import compare, main
+
+
+class BenchTest(unittest.TestCase):
+    def test_small_run_writes_results_and_compares(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "bench.json"
+            args = ["--docs", "40", "--vocab", "300", "--queries", "5", "--asks", "3", "--eval-questions", "4"]
+            self.assertEqual(main(args + ["--corpus-dir", tmp, "--out", str(out)]), 0)
+            result = json.loads(out.read_text(encoding="utf-8"))
+
+        metrics = result["scales"]["40"]
+        self.assertEqual(metrics["docs"], 40)
+        for key in ("build_s", "peak_mb", "eval_qps"):
+            self.assertGreater(metrics[key], 0.0)
+        self.assertEqual(set(metrics["ask_phase_ms"]), {"retrieve", "verify", "synthesize"})
+
+        slower = json.loads(json.dumps(result))
+        slower["scales"]["40"]["search_ms"]["p50"] *= 3
+        slower["scales"]["40"]["eval_qps"] /= 3
+        regressed = {r["metric"] for r in compare(slower, result, tolerance=0.5)}
+        self.assertEqual(regressed, {"search_ms.p50", "eval_qps"})
+        other = json.loads(json.dumps(result))
+        other["params"]["vocab"] = 500
+        with self.assertRaises(ValueError):
+            compare(other, result, tolerance=0.5)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
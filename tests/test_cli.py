@@ -1,6 +1,12 @@
+import contextlib
+import io
+import logging
 import subprocess
 import sys
+import tempfile
+import time
 import unittest
+from pathlib import Path
 
 
 class CLITestCase(unittest.TestCase):
@@ -11,6 +17,63 @@ class CLITestCase(unittest.TestCase):
         self.assertEqual(proc.returncode, 0)
         self.assertIn("quickcapture", proc.stdout.lower())
 
+    def test_info_lines_match_logging_format(self):
+        # the CLI writes these itself to keep `logging` out of its imports
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = subprocess.run(
+                [sys.executable, "-m", "quickcapture", "--db", str(Path(tmp) / "t.db"), "--no-daemon", "add-note", "x"],
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        line = proc.stderr.strip()
+        stamp = line[:23]
+        record = logging.makeLogRecord(
+            {"msg": "Added note %s", "args": (1,), "levelname": "INFO", "name": "quickcapture.cli"}
+        )
+        record.created = time.mktime(time.strptime(stamp[:19], "%Y-%m-%d %H:%M:%S"))
+        record.msecs = int(stamp[20:])
+        self.assertEqual(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s").format(record), line)
+
+    def test_backup_warns_outside_wal_and_restore_reports_missing_snapshot(self):
+        from quickcapture.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db = ["--db", str(Path(tmp) / "t.db"), "--no-daemon"]
+            snap = str(Path(tmp) / "snap.db")
+            for extra, warned in (([], True), (["--wal"], False)):
+                err = io.StringIO()
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+                    self.assertEqual(main(db + ["backup", snap, "--sleep", "0"] + extra), 0)
+                self.assertEqual("journal_mode=delete" in err.getvalue(), warned, err.getvalue())
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err):
+                self.assertEqual(main(db + ["restore", str(Path(tmp) / "missing.db")]), 1)
+            self.assertIn("missing.db", err.getvalue())
+
+    def test_list_cursor_needs_a_single_type(self):
+        from quickcapture.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db = ["--db", str(Path(tmp) / "t.db"), "--no-daemon"]
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                for i in range(3):
+                    main(db + ["add-note", f"n{i}"])
+                    main(db + ["add-task", f"t{i}"])
+            err = io.StringIO()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+                self.assertEqual(main(db + ["list", "--limit", "2"]), 0)
+            hints = [line.split(": ", 1)[1].split() for line in err.getvalue().splitlines() if line.startswith("more ")]
+            self.assertEqual([h[:2] for h in hints], [["--type", "notes"], ["--type", "tasks"]])
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(db + ["list", "--type", "tasks", "--after", hints[1][3].strip("'")]), 0)
+            self.assertEqual([line.split(": ")[1] for line in out.getvalue().splitlines()], ["t0"])
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as exit_:
+                main(db + ["list", "--after", hints[0][3].strip("'")])
+            self.assertEqual(exit_.exception.code, 2)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import socket
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from quickcapture.cli import main
+from quickcapture.client import DaemonClient, DaemonError
+from quickcapture.services import init_db, list_notes
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        from quickcapture.daemon import DaemonServer
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.db = init_db(self.dir / "served.db", persistent=True)
+        self.sock = self.dir / "qc.sock"
+        self.server = DaemonServer(self.sock, self.db)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_client_mirrors_services(self):
+        with DaemonClient.connect(self.sock) as client:
+            self.assertTrue(client.ping())
+            note_id = client.add_note("Meeting", "Discuss roadmap")
+            task_ids = [client.add_task(f"task {i}", datetime(2020, 1, i + 1)) for i in range(3)]
+            self.assertTrue(client.complete_task(task_ids[0]))
+            self.assertFalse(client.complete_task(task_ids[0]))
+            self.assertEqual(client.bulk_tasks("reschedule", ids=task_ids[1:], due_at=datetime(2031, 1, 1)), 2)
+
+            self.assertEqual([(n.id, n.content) for n in client.list_notes()], [(note_id, "Discuss roadmap")])
+            previews = list(client.list_notes(preview=7))
+            self.assertEqual([n.preview for n in previews], ["Discuss"])
+            self.assertEqual(previews[0].content, "Discuss roadmap")  # one request, after the listing
+            tasks = list(client.list_tasks(completed=False, limit=1))
+            self.assertEqual([(t.id, t.due_at.year) for t in tasks], [(task_ids[2], 2031)])
+            older = list(client.list_tasks(before=(tasks[0].created_at, tasks[0].id)))
+            self.assertEqual([t.id for t in older], task_ids[1::-1])
+            hits = client.search("roadmap")
+            self.assertEqual([(h.kind, h.id, h.snippet) for h in hits], [("note", note_id, "Discuss [roadmap]")])
+
+            with self.assertRaises(ValueError):
+                client.bulk_tasks("archive", ids=[1])
+            with self.assertRaises(DaemonError):
+                client.call("add_note")  # no title
+            self.assertTrue(client.ping())  # errors leave the connection usable
+
+    def test_reads_skip_a_stalled_writer_and_writes_time_out(self):
+        release = threading.Event()
+        self.server.write_timeout = 0.2
+        stalled = self.server.writer.submit(lambda db: release.wait(5))
+        try:
+            with DaemonClient.connect(self.sock) as client:
+                with self.assertRaisesRegex(DaemonError, "TimeoutError.*cancelled"):
+                    client.add_note("queued")
+                self.assertEqual(client.search("queued"), [])
+                self.assertEqual(list(client.list_notes()), [])
+                self.assertIsNone(client.note_content(1))
+        finally:
+            release.set()
+        stalled.result(5)
+        self.server.writer.flush(5)
+        # the timed-out write was cancelled, so a retry cannot duplicate it
+        self.assertEqual(list(list_notes(self.db)), [])
+
+    def test_cli_uses_daemon_and_falls_back(self):
+        direct_db = self.dir / "direct.db"
+        args = ["--db", str(direct_db), "--socket", str(self.sock)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(args + ["add-note", "via daemon"]), 0)
+            self.server.shutdown()
+            self.server.server_close()
+            self.sock.touch()  # stale socket file
+            self.assertEqual(main(args + ["add-note", "direct"]), 0)
+        self.assertEqual([n.title for n in list_notes(self.db)], ["via daemon"])
+        self.assertEqual([n.title for n in list_notes(init_db(direct_db))], ["direct"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,259 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from quickcapture.db import SCHEMA_VERSION, Database
+from quickcapture.services import (
+    _epoch_us,
+    add_note,
+    add_task,
+    archive_tasks,
+    bulk_tasks,
+    complete_task,
+    init_db,
+    list_notes,
+    list_tasks,
+    search,
+    stats,
+)
+
+
+class DatabaseConnectionTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "t.db"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _count(self, table: str) -> int:
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_persistent_reuses_connection_per_thread_with_wal(self):
+        with init_db(self.db_path, persistent=True) as db:
+            with db.connect() as c1, db.connect() as c2:
+                self.assertIs(c1, c2)
+                self.assertEqual(c1.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(c1.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+            other = []
+
+            def worker() -> None:
+                with db.connect() as conn:
+                    other.append(conn)
+
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join()
+            with db.connect() as mine:
+                self.assertIsNot(other[0], mine)
+
+    def test_transaction_shares_one_commit(self):
+        for persistent in (False, True):
+            db = Database(self.db_path, persistent=persistent)
+            with db.connect():
+                pass  # the schema is created by the first connection
+            before = self._count("notes")
+            with db.transaction():
+                add_note(db, "A")
+                add_task(db, "B")
+                # nothing is visible to other connections before the scope ends
+                self.assertEqual(self._count("notes"), before)
+            self.assertEqual(self._count("notes"), before + 1)
+            db.close()
+        self.assertEqual(self._count("tasks"), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        db = Database(self.db_path, persistent=True)
+        with self.assertRaises(RuntimeError):
+            with db.transaction():
+                add_note(db, "lost")
+                raise RuntimeError("boom")
+        add_note(db, "kept")
+        self.assertEqual([n.title for n in list_notes(db)], ["kept"])
+        # the rolled-back note never reached the full-text index
+        self.assertEqual([h.title for h in search(db, "kept")], ["kept"])
+        self.assertEqual(list(list_tasks(db)), [])
+        db.close()
+
+    def test_rejects_unknown_pragma_values(self):
+        with self.assertRaises(ValueError):
+            Database(self.db_path, journal_mode="fast")
+        with self.assertRaises(ValueError):
+            Database(self.db_path, synchronous="sometimes")
+
+
+class SchemaTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "t.db"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _plan(self, db: Database, sql: str) -> str:
+        with db.connect() as conn:
+            return " | ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+
+    def test_list_queries_use_indexes_without_sorting(self):
+        db = Database(self.db_path)
+        for i in range(20):
+            add_task(db, f"T{i}")
+            add_note(db, f"N{i}")
+        cases = {
+            "SELECT * FROM notes ORDER BY created_us DESC, id DESC": "idx_notes_created_us",
+            "SELECT * FROM tasks ORDER BY created_us DESC, id DESC": "idx_tasks_created_us",
+            "SELECT * FROM tasks WHERE completed_at IS NULL ORDER BY created_us DESC, id DESC": "idx_tasks_open_created_us",
+            "SELECT * FROM notes WHERE (created_us, id) < (1, 1) ORDER BY created_us DESC, id DESC": "idx_notes_created_us",
+            "SELECT * FROM tasks WHERE due_at < '2025-01-01'": "idx_tasks_due_at",
+            # stats: overdue open tasks
+            "SELECT COUNT(*) FROM tasks WHERE due_at IS NOT NULL AND due_at < '2025-01-01' AND completed_at IS NULL": "idx_tasks_open_due_at",
+        }
+        for sql, index in cases.items():
+            plan = self._plan(db, sql)
+            self.assertIn(f"USING INDEX {index}", plan, sql)
+            self.assertNotIn("TEMP B-TREE", plan, sql)
+
+    def test_upgrades_v1_database_in_place(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            INSERT INTO meta VALUES ('schema_version', '1');
+            CREATE TABLE notes (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                                content TEXT, created_at TEXT NOT NULL);
+            CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, due_at TEXT,
+                                completed_at TEXT, created_at TEXT NOT NULL);
+            INSERT INTO notes(title, content, created_at) VALUES ('kept', NULL, '2025-01-01T00:00:00+00:00');
+            INSERT INTO tasks(title, completed_at, created_at)
+            VALUES ('done', '2025-01-02T03:04:05.000006+02:00', '2025-01-01T00:00:00.250000');
+            """
+        )
+        log = "pasted log line\n" * 1000 + "tail"
+        conn.execute("INSERT INTO notes(title, content, created_at) VALUES ('log', ?, '2024-01-01T00:00:00')", (log,))
+        conn.commit()
+        conn.close()
+
+        db = Database(self.db_path)
+        with db.connect() as conn:
+            self.assertEqual(Database._get_schema_version(conn), SCHEMA_VERSION)
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+            self.assertIn("sqlite_stat1", {r[0] for r in conn.execute("SELECT name FROM sqlite_master")})
+        self.assertTrue({"idx_notes_created_us", "idx_tasks_open_created_us", "idx_tasks_due_at"} <= indexes)
+        self.assertNotIn("idx_notes_created_at", indexes)
+        self.assertEqual([(n.title, n.content) for n in list_notes(db)], [("kept", None), ("log", log)])
+        # rows from before the upgrade are in the full-text index, large ones compressed
+        self.assertEqual([h.title for h in search(db, "kept")], ["kept"])
+        self.assertEqual([h.title for h in search(db, "tail")], ["log"])
+        with db.connect() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(content_z) FROM notes").fetchone()[0], 1)
+        # and carry integer timestamps
+        with db.connect() as conn:
+            row = conn.execute("SELECT created_at, completed_at, created_us, completed_us FROM tasks").fetchone()
+        self.assertEqual(row["created_us"], _epoch_us(row["created_at"]))
+        self.assertEqual(row["completed_us"], _epoch_us(row["completed_at"]))
+        self.assertEqual(row["completed_us"] % 1_000_000, 6)
+
+    def test_schema_version_is_read_from_user_version(self):
+        db = Database(self.db_path)
+        self.assertFalse(self.db_path.exists())  # nothing is opened until the first command
+        add_note(db, "first")
+        # a current store that still records its version in the legacy meta table
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executescript(
+            f"""
+            PRAGMA user_version = 0;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            INSERT INTO meta VALUES ('schema_version', '{SCHEMA_VERSION}');
+            """
+        )
+        conn.close()
+        for _ in range(2):
+            db = Database(self.db_path)
+            add_note(db, "again")
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+            self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name='meta'").fetchone())
+        finally:
+            conn.close()
+        self.assertEqual(len(list(list_notes(db))), 3)
+
+    def test_epoch_columns_follow_plain_sql_writes(self):
+        db = Database(self.db_path)
+        add_note(db, "via service")
+        with db.connect() as conn:
+            # writers that only know the text columns
+            conn.execute("INSERT INTO notes(title, created_at) VALUES ('older', '2001-01-01T00:00:00+00:00')")
+            conn.execute("INSERT INTO notes(title, created_at) VALUES ('newest', '2999-01-01T00:00:00+00:00')")
+            conn.execute("UPDATE notes SET created_at = '2000-06-01T12:00:00.5+00:00' WHERE title = 'newest'")
+            tid = conn.execute("INSERT INTO tasks(title, created_at) VALUES ('t', '2001-01-01T00:00:00+00:00')").lastrowid
+            conn.execute("UPDATE tasks SET completed_at = '2001-01-02T00:00:00+00:00' WHERE id = ?", (tid,))
+            stamps = conn.execute("SELECT created_at, created_us FROM notes").fetchall()
+            completed_us = conn.execute("SELECT completed_us FROM tasks WHERE id = ?", (tid,)).fetchone()[0]
+        self.assertEqual([us for _, us in stamps], [_epoch_us(at) for at, _ in stamps])
+        self.assertEqual(completed_us, _epoch_us("2001-01-02T00:00:00+00:00"))
+        self.assertEqual([n.title for n in list_notes(db)], ["via service", "older", "newest"])
+
+
+    def test_counters_track_writes(self):
+        db = Database(self.db_path)
+        add_note(db, "before counters")
+        done = add_task(db, "done")
+        complete_task(db, done)
+        db.enable_counters()
+        ids = [add_task(db, f"T{i}") for i in range(5)]
+        add_note(db, "after")
+        complete_task(db, ids[0])
+        bulk_tasks(db, "complete", ids=ids[1:3])
+        bulk_tasks(db, "reopen", ids=[done])
+        bulk_tasks(db, "delete", ids=[ids[1], ids[3]])
+        self.assertEqual(archive_tasks(db, datetime.now() + timedelta(days=1)), 2)
+        with db.connect() as conn:
+            conn.execute("UPDATE tasks SET title = 'renamed' WHERE id = ?", (ids[0],))
+            self.assertTrue(Database.has_counters(conn))
+        counted = stats(db)
+        db.disable_counters()
+        with db.connect() as conn:
+            self.assertFalse(Database.has_counters(conn))
+        self.assertEqual(counted, stats(db))
+        self.assertEqual((counted["notes"], counted["tasks"], counted["done"], counted["open"]), (2, 2, 0, 2))
+        self.assertEqual(counted["archived"], 2)
+
+    def test_backup_and_restore_snapshot(self):
+        db = Database(self.db_path)
+        add_note(db, "kept", "in the snapshot")
+        add_task(db, "task")
+        plain, zipped = Path(self.tmp.name) / "snap.db", Path(self.tmp.name) / "snap.db.gz"
+        steps = []
+        pages = db.backup(plain, pages=1, pause=0, progress=lambda done, total: steps.append((done, total)))
+        db.backup(zipped, pause=0)
+        self.assertGreater(len(steps), 1)
+        self.assertEqual(steps[-1], (pages, pages))
+        with open(zipped, "rb") as fp:
+            self.assertEqual(fp.read(2), b"\x1f\x8b")
+        self.assertEqual(sorted(p.name for p in plain.parent.glob("snap*")), ["snap.db", "snap.db.gz"])
+
+        add_note(db, "lost")
+        for snapshot in (plain, zipped):
+            db.restore(snapshot)
+            self.assertEqual([n.title for n in list_notes(db)], ["kept"])
+            self.assertEqual([h.title for h in search(db, "snapshot")], ["kept"])
+            add_note(db, "lost")
+
+        junk = Path(self.tmp.name) / "junk"
+        junk.write_bytes(b"not a database" * 100)
+        with self.assertRaises(ValueError):
+            db.restore(junk)
+        self.assertEqual(len(list(list_notes(db))), 2)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
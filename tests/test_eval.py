@@ -0,0 +1,108 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from alpha_evolve.cli import build_agent
+from alpha_evolve.eval import _load_dataset, evaluate, evaluate_parallel, evaluate_sweep
+
+
+class EvalRunnerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.corpus = Path("data/corpus")
+        self.data = _load_dataset(Path("data/eval.jsonl"))
+
+    def test_parallel_report_matches_serial(self):
+        agent = build_agent(self.corpus, max_iters=4, ideas=3, accept_threshold=0.7)
+        serial = evaluate(agent, self.data, threshold=0.7)
+        seen = []
+        parallel = evaluate_parallel(
+            self.data,
+            0.7,
+            corpus=self.corpus,
+            max_iters=4,
+            ideas=3,
+            workers=2,
+            chunk_size=3,
+            progress=seen.append,
+        )
+        self.assertEqual(parallel, serial)
+        self.assertEqual(seen[-1], len(self.data))
+
+    def test_sweep_matches_per_threshold_runs(self):
+        thresholds = [0.2, 0.45, 0.7, 0.95]
+        agent = build_agent(self.corpus, max_iters=3, ideas=2)
+        sweep = evaluate_sweep(agent, self.data, thresholds)
+        for th, rpt in zip(thresholds, sweep):
+            fresh = build_agent(self.corpus, max_iters=3, ideas=2, accept_threshold=th)
+            self.assertEqual(rpt, evaluate(fresh, self.data, threshold=th))
+
+    def test_streamed_run_resumes_after_interruption(self):
+        agent = build_agent(self.corpus, max_iters=4, ideas=3, accept_threshold=0.7)
+        expected = evaluate(agent, self.data, threshold=0.7)
+
+        def interrupted():
+            for i, row in enumerate(self.data):
+                if i == 5:
+                    raise KeyboardInterrupt
+                yield row
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "examples.jsonl"
+            with self.assertRaises(KeyboardInterrupt):
+                evaluate(agent, interrupted(), threshold=0.7, examples_out=out, checkpoint_every=2)
+            report = evaluate(agent, self.data, threshold=0.7, examples_out=out, resume=True, checkpoint_every=2)
+            lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(report.pop("examples_path"), str(out))
+        examples = expected.pop("examples")
+        self.assertEqual(report, expected)
+        self.assertEqual([r.pop("index") for r in lines], list(range(len(self.data))))
+        self.assertEqual([{k: v for k, v in r.items() if k != "threshold"} for r in lines], examples)
+
+
+    def test_fresh_run_drops_stale_checkpoint_and_resume_checks_dataset(self):
+        agent = build_agent(self.corpus, max_iters=3, ideas=2, accept_threshold=0.7)
+        expected = evaluate(agent, self.data, threshold=0.7)
+
+        def interrupted():
+            for i, row in enumerate(self.data):
+                if i == 2:
+                    raise KeyboardInterrupt
+                yield row
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out, dataset = Path(tmp) / "examples.jsonl", Path(tmp) / "eval.jsonl"
+            dataset.write_text("".join(json.dumps(row) + "\n" for row in self.data), encoding="utf-8")
+            opts = {"examples_out": out, "checkpoint_every": 4, "dataset": dataset}
+            evaluate(agent, self.data, threshold=0.7, **opts)
+            # interrupted before its first checkpoint: the finished run's checkpoint must not survive
+            with self.assertRaises(KeyboardInterrupt):
+                evaluate(agent, interrupted(), threshold=0.7, **opts)
+            report = evaluate(agent, self.data, threshold=0.7, resume=True, **opts)
+            content = out.read_bytes()
+
+            with self.assertRaises(KeyboardInterrupt):
+                evaluate(agent, interrupted(), threshold=0.7, examples_out=out, checkpoint_every=1, dataset=dataset)
+            dataset.write_text(json.dumps(self.data[0]) + "\n", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                evaluate(agent, self.data, threshold=0.7, resume=True, **opts)
+
+        report.pop("examples_path")
+        expected.pop("examples")
+        self.assertEqual(report, expected)
+        self.assertNotIn(b"\x00", content)
+        self.assertEqual(len(content.splitlines()), len(self.data))
+
+    def test_resume_refuses_truncated_examples_file(self):
+        agent = build_agent(self.corpus, max_iters=3, ideas=2, accept_threshold=0.7)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "examples.jsonl"
+            evaluate(agent, self.data, threshold=0.7, examples_out=out)
+            out.write_bytes(b"")
+            with self.assertRaises(ValueError):
+                evaluate(agent, self.data, threshold=0.7, examples_out=out, resume=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
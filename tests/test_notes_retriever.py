@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from alpha_evolve.notes import QuickCaptureRetriever
+from alpha_evolve.retrieval import SimpleFSRetriever
+from quickcapture.db import Database
+from quickcapture.services import add_note, init_db
+
+NOTES = [
+    ("Alpha evolve", "The agent iterates plan retrieve propose verify refine"),
+    ("Refusal policy", "The agent refuses when evidence coverage is below the threshold"),
+    ("Groceries", "milk eggs bread coffee"),
+    ("Retrieval", "BM25 ranks evidence passages by term frequency and rarity"),
+]
+
+
+class QuickCaptureRetrieverTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = init_db(Path(self.tmp.name) / "notes.db")
+        self.ids = [add_note(self.db, title, content) for title, content in NOTES]
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _ranking(self, retriever: QuickCaptureRetriever, query: str):
+        return [(e.source, round(e.score, 9)) for e in retriever.search(query, k=10)]
+
+    def test_scores_match_file_retriever(self):
+        corpus = Path(self.tmp.name) / "corpus"
+        corpus.mkdir()
+        for note_id, (title, content) in zip(self.ids, NOTES):
+            (corpus / f"{note_id}.txt").write_text(f"{title}\n{content}", encoding="utf-8")
+        files = SimpleFSRetriever(corpus)
+        notes = QuickCaptureRetriever(self.db)
+        for query in ("agent evidence threshold", "coffee", "bm25 term rarity"):
+            expected = {Path(e.source).stem: e.score for e in files.search(query, k=10)}
+            got = {e.source.split(":")[1]: e.score for e in notes.search(query, k=10)}
+            self.assertEqual(got.keys(), expected.keys(), query)
+            for key, score in expected.items():
+                self.assertAlmostEqual(got[key], score, places=9)
+        self.assertTrue(all(e.source.startswith("note:") for e in notes.search("agent")))
+
+    def test_only_changed_notes_are_reindexed(self):
+        retriever = QuickCaptureRetriever(self.db)
+        self.assertEqual(retriever.refresh(), 0)
+        new_id = add_note(self.db, "Mangoes", "mangoes need warm weather")
+        with self.db.connect() as conn:
+            conn.execute("UPDATE notes SET content = 'tea and biscuits' WHERE id = ?", (self.ids[2],))
+            conn.execute("DELETE FROM notes WHERE id = ?", (self.ids[3],))
+        self.assertEqual(retriever.refresh(), 3)
+        self.assertEqual([e.source for e in retriever.search("mangoes")], [f"note:{new_id}"])
+        self.assertEqual(retriever.search("coffee"), [])
+        self.assertEqual(retriever.search("bm25"), [])
+        fresh = QuickCaptureRetriever(self.db)
+        for query in ("agent evidence", "tea biscuits", "warm mangoes weather"):
+            self.assertEqual(self._ranking(retriever, query), self._ranking(fresh, query))
+
+    def test_change_log_is_opt_in_and_pruned(self):
+        with self.db.connect() as conn:
+            self.assertFalse(Database.has_change_log(conn))
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM note_changes").fetchone()[0], 0)
+        retriever = QuickCaptureRetriever(self.db)
+        for i in range(5):
+            add_note(self.db, f"extra {i}", "pruned log")
+        self.assertEqual(len(retriever.search("pruned")), 5)
+        with self.db.connect() as conn:
+            # only the entry at the watermark is kept
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM note_changes").fetchone()[0], 1)
+
+        # a second, non-pruning reader rebuilds once the first prunes past it
+        other = QuickCaptureRetriever(self.db, prune=False)
+        add_note(self.db, "Kiwis", "kiwis")
+        retriever.refresh()
+        add_note(self.db, "Figs", "figs")
+        self.assertEqual(len(other.search("kiwis figs")), 2)
+
+        # writes while the log is off are picked up after it is enabled again
+        self.db.disable_change_log()
+        add_note(self.db, "Plums", "plums")
+        self.db.enable_change_log()
+        self.assertEqual([e.snippet for e in retriever.search("plums")], ["Plums plums"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from pathlib import Path
+
+from alpha_evolve.retrieval import SimpleFSRetriever
+
+
+QUERIES = [
+    "What is alpha evolve?",
+    "What phases does the agent iterate?",
+    "Explain the anti-hallucination principle.",
+    "evidence coverage refusal threshold",
+    "How to grow mangoes on Mars with lasers?",
+]
+
+
+class ImpactIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.corpus = Path("data/corpus")
+        self.exact = SimpleFSRetriever(self.corpus)
+
+    def test_impact_ranking_matches_exact_bm25(self):
+        impact = SimpleFSRetriever(self.corpus, impact=True)
+        for q in QUERIES:
+            exact = self.exact.search(q, k=5)
+            hits = impact.search(q, k=5)
+            self.assertEqual([e.source for e in hits], [e.source for e in exact], q)
+            # dequantized scores stay within the quantization step of the exact sum
+            for h, e in zip(hits, exact):
+                self.assertAlmostEqual(h.score, e.score, delta=0.05 * e.score + 1e-9)
+
+    def test_early_termination_does_not_change_results(self):
+        full = SimpleFSRetriever(self.corpus, impact=True, impact_bits=4, early_termination=False)
+        early = SimpleFSRetriever(self.corpus, impact=True, impact_bits=4)
+        for q in QUERIES:
+            for k in (1, 3, 6):
+                self.assertEqual(
+                    [e.source for e in early.search(q, k=k)],
+                    [e.source for e in full.search(q, k=k)],
+                )
+
+    def test_rejects_invalid_bits(self):
+        with self.assertRaises(ValueError):
+            SimpleFSRetriever(self.corpus, impact=True, impact_bits=0)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -1,15 +1,30 @@
+from datetime import datetime
 from pathlib import Path
+import io
+import json
+import sqlite3
 import tempfile
 import unittest
+from unittest import mock
 
 from quickcapture.services import (
+    _iter_json_document,
     add_note,
     add_task,
+    archive_tasks,
+    bulk_tasks,
     complete_task,
+    daily_counts,
     export_all,
+    export_all_json,
+    export_stream,
+    import_items,
     init_db,
     list_notes,
     list_tasks,
+    note_content,
+    search,
+    stats,
 )
 
 
@@ -38,6 +53,105 @@ class ServicesTestCase(unittest.TestCase):
         tasks_done = list_tasks(self.db, completed=True)
         self.assertTrue(any(t.id == tid for t in tasks_done))
 
+    def test_bulk_tasks_by_ids_and_filters(self):
+        rows = [
+            {"type": "task", "title": "Sprint 1: API", "due_at": "2020-01-01", "created_at": "2024-01-01T00:00:00"},
+            {"type": "task", "title": "Sprint 1: docs", "due_at": "2999-01-01", "created_at": "2024-01-02T00:00:00"},
+            {"type": "task", "title": "Sprint 2: 100%_done", "created_at": "2024-03-01T00:00:00"},
+            {"type": "task", "title": "Backlog", "due_at": "2020-06-01", "created_at": "2024-03-02T00:00:00"},
+        ]
+        import_items(self.db, io.StringIO(json.dumps(rows)))
+        ids = {t.title: t.id for t in list_tasks(self.db)}
+
+        self.assertEqual(bulk_tasks(self.db, "complete", overdue=True, title="sprint 1"), 1)
+        self.assertEqual(bulk_tasks(self.db, "complete", ids=list(ids.values()) * 2), 3)  # one was done already
+        self.assertEqual(bulk_tasks(self.db, "reopen", created_before=datetime(2024, 2, 1)), 2)
+        self.assertEqual(bulk_tasks(self.db, "reschedule", ids=[ids["Sprint 1: API"]], due_at=datetime(2030, 1, 1)), 1)
+        self.assertEqual(bulk_tasks(self.db, "delete", completed=True, title="%_"), 1)
+        self.assertEqual(bulk_tasks(self.db, "delete", ids=[]), 0)
+        self.assertEqual(
+            {(t.title, t.completed_at is not None, t.due_at and t.due_at.year) for t in list_tasks(self.db)},
+            {("Sprint 1: API", False, 2030), ("Sprint 1: docs", False, 2999), ("Backlog", True, 2020)},
+        )
+        with self.assertRaises(ValueError):
+            bulk_tasks(self.db, "delete")  # neither ids nor a filter
+
+    def test_stats_and_daily_counts(self):
+        rows = [
+            {"type": "note", "title": "a", "created_at": "2025-03-01T10:00:00+00:00"},
+            {"type": "note", "title": "b", "created_at": "2025-03-03T23:59:59+00:00"},
+            {"type": "task", "title": "late", "due_at": "2025-03-02", "created_at": "2025-03-01T00:00:00+00:00"},
+            {"type": "task", "title": "later", "due_at": "2025-04-01", "created_at": "2025-03-01T01:00:00+00:00"},
+            {"type": "task", "title": "done", "due_at": "2025-03-02", "created_at": "2025-02-01T00:00:00+00:00",
+             "completed_at": "2025-03-03T01:00:00+02:00"},
+        ]
+        import_items(self.db, io.StringIO(json.dumps(rows)))
+        now = datetime(2025, 3, 4, 12, 0)
+        self.assertEqual(stats(self.db, now=now), {"notes": 2, "tasks": 3, "open": 2, "done": 1, "overdue": 1, "archived": 0})
+        histogram = [("2025-03-01", 1, 2, 0), ("2025-03-02", 0, 0, 1), ("2025-03-03", 1, 0, 0), ("2025-03-04", 0, 0, 0)]
+        self.assertEqual(
+            [(d["day"], d["notes"], d["tasks_created"], d["tasks_completed"]) for d in daily_counts(self.db, 4, now=now)],
+            histogram,
+        )
+        self.assertEqual(daily_counts(self.db, 0), [])
+        # archiving moves tasks, not history
+        self.assertEqual(archive_tasks(self.db, datetime(2025, 3, 4)), 1)
+        self.assertEqual(
+            [(d["day"], d["notes"], d["tasks_created"], d["tasks_completed"]) for d in daily_counts(self.db, 4, now=now)],
+            histogram,
+        )
+        self.assertEqual(sum(d["tasks_created"] for d in daily_counts(self.db, 40, now=now)), 3)
+
+    def test_archive_moves_old_completed_tasks(self):
+        rows = [
+            {"type": "task", "title": f"old report {i}", "created_at": f"2024-01-0{i + 1}T00:00:00+00:00",
+             "completed_at": f"2024-02-0{i + 1}T00:00:00+00:00"}
+            for i in range(5)
+        ] + [
+            {"type": "task", "title": "recent report", "created_at": "2025-01-01T00:00:00+00:00",
+             "completed_at": "2025-06-01T00:00:00+00:00"},
+            {"type": "task", "title": "open report", "created_at": "2024-01-01T12:00:00+00:00"},
+        ]
+        import_items(self.db, io.StringIO(json.dumps(rows)))
+        everything = [t.id for t in list_tasks(self.db)]
+        open_ids = [t.id for t in list_tasks(self.db, completed=False)]
+
+        self.assertEqual(archive_tasks(self.db, datetime(2025, 1, 1), batch_size=2), 5)
+        self.assertEqual(archive_tasks(self.db, datetime(2025, 1, 1)), 0)
+        self.assertEqual({t.title for t in list_tasks(self.db)}, {"recent report", "open report"})
+        self.assertEqual([t.id for t in list_tasks(self.db, include_archived=True)], everything)
+        self.assertEqual([t.id for t in list_tasks(self.db, completed=False, include_archived=True)], open_ids)
+        pages, cursor = [], None
+        while True:
+            page = list(list_tasks(self.db, limit=3, before=cursor, include_archived=True))
+            if not page:
+                break
+            pages.extend(t.id for t in page)
+            cursor = (page[-1].created_at, page[-1].id)
+        self.assertEqual(pages, everything)
+
+        self.assertEqual(len(search(self.db, "report")), 2)
+        self.assertEqual(len(search(self.db, "report", include_archived=True)), 7)
+        self.assertEqual(len(export_all(self.db)["tasks"]), 2)
+        self.assertEqual(len(export_all(self.db, include_archived=True)["tasks"]), 7)
+        self.assertEqual(bulk_tasks(self.db, "delete", title="old report"), 0)  # archived rows stay put
+        self.assertEqual(stats(self.db)["archived"], 5)
+
+    def test_list_keyset_pages(self):
+        # same timestamp for every row: the id breaks the tie
+        rows = [{"type": "note", "title": f"N{i}", "created_at": "2024-01-01T00:00:00"} for i in range(7)]
+        import_items(self.db, io.StringIO(json.dumps(rows)))
+        seen, cursor = [], None
+        while True:
+            page = list(list_notes(self.db, limit=3, before=cursor))
+            if not page:
+                break
+            seen.extend(n.id for n in page)
+            cursor = (page[-1].created_at.isoformat(), page[-1].id)
+        self.assertEqual(seen, [n.id for n in list_notes(self.db)])
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
     def test_export(self):
         add_note(self.db, "N1")
         add_task(self.db, "T1")
@@ -45,6 +159,161 @@ class ServicesTestCase(unittest.TestCase):
         self.assertIn("notes", data)
         self.assertIn("tasks", data)
 
+    def test_import_export_roundtrip(self):
+        add_note(self.db, "N1", "body")
+        tid = add_task(self.db, "T1")
+        complete_task(self.db, tid)
+        exported = export_all_json(self.db)
+
+        other = init_db(Path(self.tmp.name) / "other.db")
+        counts = import_items(other, io.StringIO(exported))
+        self.assertEqual(counts, {"notes": 1, "tasks": 1})
+        self.assertEqual(export_all(other), export_all(self.db))
+
+    def test_json_document_is_parsed_across_chunks(self):
+        add_note(self.db, "N1", "body with \"quotes\", [brackets] and {braces}")
+        add_task(self.db, "T1", due_at=datetime(2025, 1, 2))
+        data = export_all(self.db)
+        expected = [{"type": "note", **n} for n in data["notes"]] + [{"type": "task", **t} for t in data["tasks"]]
+        for text in (json.dumps(data), json.dumps(data, indent=2)):
+            for size in (1, 3, 64):
+                chunks = [text[i : i + size] for i in range(0, len(text), size)]
+                self.assertEqual(list(_iter_json_document(chunks, size)), expected)
+
+        other = init_db(Path(self.tmp.name) / "other.db")
+        self.assertEqual(import_items(other, io.StringIO(json.dumps(data, indent=2))), {"notes": 1, "tasks": 1})
+        self.assertEqual(export_all(other), data)
+        for bad in ('{"notes": [1]}', '[{"a": 1} {"b": 2}]', '{"notes": []} x'):
+            with self.assertRaises(ValueError):
+                list(_iter_json_document([bad]))
+
+    def test_export_stream_ndjson_since(self):
+        rows = [
+            {"type": "note", "title": "old", "created_at": "2025-01-01T00:00:00"},
+            {"type": "task", "title": "old open", "created_at": "2025-01-01T00:00:00"},
+            {"type": "task", "title": "old done", "created_at": "2025-01-01T00:00:00", "completed_at": "2025-03-01T00:00:00"},
+            {"type": "note", "title": "new", "created_at": "2025-03-01T00:00:00"},
+        ]
+        import_items(self.db, io.StringIO(json.dumps(rows)))
+        buf = io.StringIO()
+        self.assertEqual(export_stream(self.db, buf, "json"), {"notes": 2, "tasks": 2})
+        self.assertEqual(buf.getvalue(), export_all_json(self.db))
+
+        buf = io.StringIO()
+        counts = export_stream(self.db, buf, "ndjson", since=datetime(2025, 2, 1))
+        self.assertEqual(counts, {"notes": 1, "tasks": 1})
+        records = [json.loads(line) for line in buf.getvalue().splitlines()]
+        self.assertEqual([(r["type"], r["title"]) for r in records], [("note", "new"), ("task", "old done")])
+
+        other = init_db(Path(self.tmp.name) / "other.db")
+        self.assertEqual(import_items(other, io.StringIO(buf.getvalue()), upsert=True), counts)
+
+    def test_import_ndjson_upsert_and_csv(self):
+        nid = add_note(self.db, "old title")
+        lines = [
+            {"type": "note", "id": nid, "title": "new title", "content": "c", "created_at": "2025-01-01T10:00:00"},
+            {"type": "task", "title": "fresh", "due_at": "2025-02-01"},
+        ]
+        ndjson = "\n".join(json.dumps(r) for r in lines) + "\n"
+        counts = import_items(self.db, io.StringIO(ndjson), upsert=True)
+        self.assertEqual(counts, {"notes": 1, "tasks": 1})
+        notes = list(list_notes(self.db))
+        self.assertEqual([(n.id, n.title) for n in notes], [(nid, "new title")])
+        self.assertEqual(notes[0].created_at.isoformat(), "2025-01-01T10:00:00+00:00")
+
+        csv_text = "type,title,content,due_at\nnote,from csv,hello,\ntask,csv task,,2025-03-01\n"
+        counts = import_items(self.db, io.StringIO(csv_text), "csv", batch_size=1)
+        self.assertEqual(counts, {"notes": 1, "tasks": 1})
+        self.assertEqual(len(list(list_tasks(self.db))), 2)
+
+    def test_import_is_all_or_nothing(self):
+        bad = '{"type": "note", "title": "ok"}\n{"type": "note", "content": "no title"}\n'
+        with self.assertRaises(ValueError):
+            import_items(self.db, io.StringIO(bad), batch_size=1)
+        self.assertEqual(list(list_notes(self.db)), [])
+
+    def test_search_ranks_and_highlights(self):
+        add_note(self.db, "Roadmap", "roadmap roadmap planning")
+        add_note(self.db, "Groceries", "milk and a roadmap atlas")
+        tid = add_task(self.db, "Share roadmap")
+        hits = search(self.db, "roadmap")
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0].title, "Roadmap")
+        self.assertIn("[roadmap]", hits[0].snippet.lower())
+        self.assertEqual([h.id for h in search(self.db, "roadmap", kind="tasks")], [tid])
+        self.assertEqual(len(search(self.db, "roadmap", limit=1)), 1)
+        self.assertEqual(search(self.db, "road*", kind="notes")[0].kind, "note")
+        # FTS syntax in user input is matched literally
+        self.assertEqual(search(self.db, 'roadmap OR "x'), [])
+
+    def test_search_follows_updates(self):
+        nid = add_note(self.db, "Old title", "alpha")
+        import_items(self.db, io.StringIO(json.dumps({"type": "note", "id": nid, "title": "New", "content": "beta"})), upsert=True)
+        self.assertEqual(search(self.db, "alpha"), [])
+        self.assertEqual([h.id for h in search(self.db, "beta")], [nid])
+
+
+    def test_large_notes_are_compressed_and_listed_by_preview(self):
+        log = "".join(f"line {i} ok\n" for i in range(2000)) + "needle"
+        big = add_note(self.db, "log", log)
+        small = add_note(self.db, "short", "tiny")
+        with self.db.connect() as conn:
+            stored = conn.execute("SELECT length(content), length(content_z) FROM notes WHERE id = ?", (big,)).fetchone()
+        self.assertLess(stored[0] + stored[1], len(log) // 5)
+
+        listed = {n.id: n for n in list_notes(self.db, preview=10)}
+        self.assertEqual((listed[big].preview, listed[small].preview), ("line 0 ok\n", None))
+        self.assertEqual((listed[big].content, listed[small].content), (log, "tiny"))
+        self.assertEqual([n.content for n in list_notes(self.db)], ["tiny", log])
+        self.assertEqual(note_content(self.db, big), log)
+        self.assertEqual([h.id for h in search(self.db, "needle")], [big])
+        self.assertEqual(export_all(self.db)["notes"][1]["content"], log)
+
+        # plain SQL writers need no functions of ours; setting content drops the compressed copy
+        conn = sqlite3.connect(str(self.db_path))
+        with conn:
+            conn.execute("UPDATE notes SET content = 'rewritten' WHERE id = ?", (big,))
+            conn.execute("INSERT INTO notes(title, content, created_at) VALUES ('plain', 'from sql', '2025-01-01T00:00:00')")
+            conn.execute("DELETE FROM notes WHERE id = ?", (small,))
+            conn.execute("INSERT INTO notes_fts(notes_fts) VALUES ('integrity-check')")
+        conn.close()
+        self.assertEqual(note_content(self.db, big), "rewritten")
+        self.assertEqual(search(self.db, "needle"), [])
+        self.assertEqual(search(self.db, "tiny"), [])
+        self.assertEqual([h.id for h in search(self.db, "rewritten")], [big])
+        self.assertEqual([h.title for h in search(self.db, "sql")], ["plain"])
+
+        import_items(self.db, io.StringIO(json.dumps([{"id": small, "title": "back", "content": log}])), upsert=True)
+        self.assertEqual([h.id for h in search(self.db, "needle")], [small])
+
+    def test_title_update_keeps_compressed_note_indexed(self):
+        big = add_note(self.db, "log", "x" * 5000 + " needle")
+        conn = sqlite3.connect(str(self.db_path))
+        with conn:
+            conn.execute("UPDATE notes SET title = 'renamed' WHERE id = ?", (big,))
+        conn.close()
+        hits = search(self.db, "needle")
+        self.assertEqual([(h.id, h.title) for h in hits], [(big, "renamed")])
+        self.assertTrue(hits[0].snippet.endswith(" [needle]"), hits[0].snippet)
+        self.assertEqual([h.id for h in search(self.db, "renamed")], [big])
+        self.assertEqual(search(self.db, "log"), [])
+
+    def test_compressed_notes_shrink_the_database(self):
+        logs = [
+            {"title": f"log {i}", "content": "".join(f"{i}:{j} GET /api/items 200 {j * 7 % 97}ms\n" for j in range(250))}
+            for i in range(200)
+        ]
+
+        def size(db):
+            import_items(db, io.StringIO(json.dumps(logs)))
+            with db.connect() as conn:
+                return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+        with mock.patch("quickcapture.db.CONTENT_COMPRESS_BYTES", 1 << 30):
+            plain = size(init_db(Path(self.tmp.name) / "plain.db"))
+        self.assertLess(size(self.db), plain * 0.8)
+        self.assertEqual(len(search(self.db, "items", limit=500)), 200)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,45 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from quickcapture.bench import compare, main, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       250 |        250 |   encodings.aliases
+import time:        50 |        300 | encodings
+some other stderr line
+import time:       500 |        500 |     quickcapture.db
+import time:       200 |        700 |   quickcapture.services
+import time:       800 |       1500 | quickcapture.cli
+"""
+
+
+class StartupBenchTest(unittest.TestCase):
+    def test_importtime_sums_top_level_modules(self):
+        self.assertEqual(parse_importtime(IMPORTTIME), {"import_ms": 1.8, "modules": 5})
+        self.assertEqual(parse_importtime("Traceback (most recent call last):\n"), {"import_ms": 0.0, "modules": 0})
+
+    def test_only_command_metrics_are_compared(self):
+        baseline = {"interpreter_ms": {"p50": 10.0}, "commands": {"list": {"wall_ms": {"p50": 50.0}, "modules": 90}}}
+        current = {"interpreter_ms": {"p50": 40.0}, "commands": {"list": {"wall_ms": {"p50": 55.0}, "modules": 140}}}
+        self.assertEqual(compare(current, baseline, 0.2), [{"metric": "list.modules", "baseline": 90.0, "current": 140.0}])
+
+    def test_small_run_profiles_each_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "startup.json"
+            self.assertEqual(main(["--runs", "1", "--items", "10", "--commands", "list", "--out", str(out)]), 0)
+            result = json.loads(out.read_text(encoding="utf-8"))
+
+        self.assertEqual(list(result["commands"]), ["list"])
+        metrics = result["commands"]["list"]
+        self.assertGreater(metrics["wall_ms"]["p50"], 0.0)
+        # the CLI imports the package and the modules it uses on every run
+        self.assertGreater(metrics["import_ms"], 0.0)
+        self.assertGreater(metrics["modules"], 3)
+        self.assertGreater(result["interpreter_ms"]["p50"], 0.0)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+from pathlib import Path
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from quickcapture.services import init_db, list_notes, list_tasks
+from quickcapture.writer import CaptureWriter
+
+
+class CaptureWriterTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = init_db(Path(self.tmp.name) / "t.db")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_concurrent_captures_are_committed_on_flush(self):
+        futures = []
+        lock = threading.Lock()
+        with CaptureWriter(self.db, max_batch=64, max_delay=0.01) as writer:
+
+            def producer(n: int) -> None:
+                for i in range(50):
+                    f = writer.add_note(f"n{n}-{i}") if i % 2 else writer.add_task(f"t{n}-{i}")
+                    with lock:
+                        futures.append(f)
+
+            threads = [threading.Thread(target=producer, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            writer.flush()
+            self.assertTrue(all(f.done() for f in futures))
+            ids = [f.result() for f in futures]
+            self.assertEqual(len(list(list_notes(self.db))), 100)
+            self.assertEqual(len(list(list_tasks(self.db))), 100)
+        self.assertTrue(all(isinstance(i, int) for i in ids))
+
+    def test_failed_write_does_not_sink_its_batch(self):
+        with CaptureWriter(self.db, max_batch=10, max_delay=0.05) as writer:
+            before = writer.add_note("before")
+            bad = writer.add_note(None)  # type: ignore[arg-type]  # violates NOT NULL
+            after = writer.add_note("after")
+            writer.flush()
+        self.assertIsInstance(bad.exception(), sqlite3.IntegrityError)
+        self.assertEqual(sorted(n.title for n in list_notes(self.db)), ["after", "before"])
+        self.assertEqual({before.result(), after.result()}, {n.id for n in list_notes(self.db)})
+
+    def test_close_drains_queue_and_rejects_new_writes(self):
+        writer = CaptureWriter(self.db)
+        futures = [writer.add_task(f"t{i}") for i in range(20)]
+        writer.close()
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(len(list(list_tasks(self.db))), 20)
+        with self.assertRaises(RuntimeError):
+            writer.add_note("late")
+        writer.flush()  # no-op once closed
+
+    def test_writer_failure_fails_queued_and_later_writes(self):
+        opened = threading.Event()
+        db = init_db(Path(self.tmp.name) / "t.db")
+
+        @contextmanager
+        def broken_session():
+            opened.wait(5)
+            raise sqlite3.OperationalError("unable to open database file")
+            yield  # pragma: no cover
+
+        db.session = broken_session  # type: ignore[method-assign]
+        with self.assertLogs("quickcapture.writer", "ERROR"):
+            writer = CaptureWriter(db)
+            queued = writer.add_note("queued")
+            opened.set()
+            with self.assertRaises(sqlite3.OperationalError):
+                queued.result(timeout=5)
+            writer._thread.join(5)
+        with self.assertRaises(RuntimeError):
+            writer.add_note("late")
+        with self.assertRaises(RuntimeError):
+            writer.flush(timeout=5)
+        writer.close(timeout=5)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()